@@ -1,65 +1,83 @@
+import time
+import uuid
+
 import streamlit as st
-import pandas as pd
 
-from modules.data_loader import load_all_data
-from modules.data_analysis import prepare_metrics, compute_kpis
-from modules.delay_predictor import train_delay_model, train_delay_classifier, delay_feature_importance
-from modules.cost_intelligence import train_cost_model, cost_feature_importance, detect_cost_anomalies
-from modules.optimization import compute_route_risk, recommend_alternatives
+from modules.compute_service import get_compute_service
+from modules.delay_predictor import delay_feature_importance
+from modules.cost_intelligence import cost_feature_importance
+from modules.training import fit_reports
+from modules.route_risk import GRANULARITIES, NORMALIZATIONS
+from modules.inventory import REORDER_POLICIES
 from modules.visualization import (
     show_kpi_summary,
+    show_daily_trend,
     show_delivery_performance,
     show_route_efficiency,
     show_vehicle_status,
     show_cost_breakdown,
     show_customer_feedback,
     show_warehouse_status,
+    show_inventory_projection,
     show_route_risk_scatter,
-    show_cost_model_insights
+    show_cost_model_insights,
+    show_performance_panel,
+    show_serving_panel
 )
-from modules.utils import estimate_co2_per_order
+from modules.utils import estimate_co2, co2_rollup
+from modules.feedback_index import get_feedback_index
+from modules import instrumentation
+
+# First paint is timed from here; import cost is measured separately by benchmarks/startup.py
+_run_started = time.perf_counter()
 
 st.set_page_config(page_title="Predictive Delivery & Cost Intelligence", layout="wide")
 st.title("🚚 NexGen — Predictive Delivery & Cost Intelligence")
 
-# Load data
-data = load_all_data(data_dir="data")
+# Per-stage timings for this rerun (sidebar toggle, or NEXGEN_PROFILE=1 / memory)
+instrumentation.reset()
+with st.sidebar.expander("Profiling"):
+    profile = st.checkbox("Record stage timings", value=instrumentation.is_enabled())
+    profile_memory = st.checkbox("Track peak memory (slower)", value=False, disabled=not profile)
+if profile:
+    instrumentation.enable(memory=profile_memory)
+else:
+    instrumentation.disable()
+
+# One shared copy of data, metrics and models serves every session; queries are cached and deduplicated
+service = get_compute_service(data_dir="data")
+session_id = st.session_state.setdefault("session_id", uuid.uuid4().hex[:8])
+snapshot = service.snapshot()
+data = snapshot.data
 
 # Basic validation
 if data["orders"].empty:
     st.error("Orders data not loaded or empty. Check data files in /data.")
     st.stop()
 
-# Prepare and merge data
-metrics = prepare_metrics(data)  # returns merged dataframe with derived fields
+metrics = snapshot.metrics  # merged dataframe with derived fields
+filter_index = snapshot.filter_index
 
 # Sidebar filters
 st.sidebar.header("Filters")
-date_min = pd.to_datetime(metrics["Order_Date"]).min()
-date_max = pd.to_datetime(metrics["Order_Date"]).max()
+date_min = filter_index["date_min"]
+date_max = filter_index["date_max"]
 date_range = st.sidebar.date_input("Order Date Range", value=(date_min.date(), date_max.date()))
 region_choices = ["All"] + sorted(metrics["Origin"].dropna().unique().tolist())
 selected_origin = st.sidebar.selectbox("Origin (or All)", options=region_choices, index=0)
 vehicle_choices = ["All"] + sorted(data["vehicle_fleet"]["Vehicle_Type"].dropna().unique().tolist())
 selected_vehicle = st.sidebar.selectbox("Vehicle Type (or All)", options=vehicle_choices, index=0)
 
-# Apply filters
-start_date, end_date = date_range
-metrics["Order_Date"] = pd.to_datetime(metrics["Order_Date"], errors="coerce")
-filtered = metrics[
-    (metrics["Order_Date"].dt.date >= pd.to_datetime(start_date).date()) &
-    (metrics["Order_Date"].dt.date <= pd.to_datetime(end_date).date())
-].copy()
-if selected_origin != "All":
-    filtered = filtered[filtered["Origin"] == selected_origin]
-if selected_vehicle != "All":
-    # vehicle matching via joined Vehicle_Type if present
-    if "Vehicle_Type" in filtered.columns:
-        filtered = filtered[filtered["Vehicle_Type"] == selected_vehicle]
-
-# KPI summary
-kpis = compute_kpis(filtered)
+# Apply filters (index lookups; vehicle matching via joined Vehicle_Type if present)
+start_date, end_date = date_range if len(date_range) == 2 else (date_range[0], date_range[0])
+selection = dict(start_date=start_date, end_date=end_date, origin=selected_origin, vehicle=selected_vehicle)
+filtered = metrics.take(service.query("rows", session=session_id, snapshot=snapshot, selection=selection))
+
+# KPI summary (rolled up from the pre-aggregated cube)
+kpis = service.query("kpis", session=session_id, snapshot=snapshot, selection=selection)
 show_kpi_summary(kpis)
+show_daily_trend(service.query("trend", session=session_id, snapshot=snapshot, selection=selection))
+st.session_state["first_paint_seconds"] = time.perf_counter() - _run_started
 
 # Left column: main analytics
 st.markdown("## Operational Insights")
@@ -77,41 +95,111 @@ with col2:
 
 # Route Risk and Optimization
 st.markdown("## Route Risk & Recommendations")
-route_risk_df = compute_route_risk(filtered)
+route_risk_df = service.query("route_risk", session=session_id, snapshot=snapshot, selection=selection)
 show_route_risk_scatter(route_risk_df)
+risk_col1, risk_col2 = st.columns(2)
+risk_granularity = risk_col1.selectbox("Risk granularity", options=list(GRANULARITIES), index=0,
+                                       format_func={"route": "Route", "carrier": "Route x Carrier",
+                                                    "week": "Route x Week", "weather": "Route x Weather"}.get)
+risk_normalization = risk_col2.selectbox("Risk normalization", options=list(NORMALIZATIONS), index=0,
+                                         format_func={"minmax": "Min-max", "robust": "Robust (median/MAD)"}.get)
+risk_engine = service.query("risk_engine", session=session_id, snapshot=snapshot, selection=selection)
 st.write("Top risky routes (highest composite risk):")
-st.dataframe(route_risk_df.sort_values("Route_Risk", ascending=False).head(10))
-alt_recs = recommend_alternatives(route_risk_df, data["vehicle_fleet"])
-st.write("Suggested lower-risk route/vehicle alternatives (heuristic):")
+st.dataframe(risk_engine.top_k(10, risk_granularity, normalization=risk_normalization))
+alt_recs, assign_stats = service.query("assignments", session=session_id, snapshot=snapshot, selection=selection)
+st.write("Suggested vehicle assignments for the riskiest routes (" +
+         ("capacity and location aware):" if assign_stats["capacity_checked"] else
+          "location aware; the orders carry no weights, so vehicle capacity is not checked):"))
 st.dataframe(alt_recs.head(10))
+st.caption(
+    f"{assign_stats['assigned']} of {assign_stats['routes']} routes assigned from {assign_stats['vehicles']} available vehicles "
+    f"({assign_stats['solver']} solver, {assign_stats['solve_seconds']:.3f}s, objective {assign_stats['objective']:.3f})"
+)
+
+# Fitted models come from the on-disk registry; retrain only on new data or on request
+with st.sidebar.expander("Model training"):
+    retrain = st.button("Retrain models")
+    background = st.checkbox("Retrain in background", value=True)
+    warm_start = st.checkbox("Warm-start from last models", value=False)
+    backend = st.selectbox("Backend", options=["auto", "forest", "hist"], index=0)
+    st.caption("Models are fitted on all orders; the filters above do not retrain them.")
 
-# Cost Model (predictive)
-st.markdown("## Cost Model & Insights")
-cost_model, X_test_cost, y_test_cost = train_cost_model(filtered)
-show_cost_model_insights(cost_model, X_test_cost, y_test_cost)
-st.write("Top cost feature importances:")
-st.dataframe(cost_feature_importance(cost_model))
-
-# Delay predictor (regression) and classifier
-st.markdown("## Delay Predictor")
-delay_model = train_delay_model(filtered)
-st.write("Delay regression model trained on historical data (simple linear/regression).")
-clf, X_test_clf, y_test_clf = train_delay_classifier(filtered)
-st.write("Delay classification model (Delayed vs On-time).")
-st.dataframe(delay_feature_importance(clf))
+# Placeholder keeps the model sections in place; they are filled after the cheaper panels below
+model_area = st.container()
 
 # Sustainability
 st.markdown("## Sustainability Insights")
-if {"Fuel_Cost","Fuel_Consumption_L","Distance_KM"}.issubset(filtered.columns):
-    filtered["CO2_kg_est"] = filtered.apply(estimate_co2_per_order, axis=1)
+if {"Fuel_Consumption_L","Distance_KM"}.issubset(filtered.columns):
+    filtered = filtered.assign(CO2_kg_est=estimate_co2(filtered, data["vehicle_fleet"]))
     st.metric("Estimated Total CO2 (kg)", f"{filtered['CO2_kg_est'].sum():,.0f}")
     st.write("Per-order CO2 sample:")
     st.dataframe(filtered[["Order_ID","Distance_KM","Fuel_Consumption_L","CO2_kg_est"]].head())
+    st.write("Highest-emission routes:")
+    st.dataframe(co2_rollup(filtered, by=("Route",), co2=filtered["CO2_kg_est"].to_numpy()).head(10))
 
 # Customer feedback and warehouse
 st.markdown("## Customer & Warehouse")
-show_customer_feedback(data["customer_feedback"])
+feedback_index = get_feedback_index()
+feedback_index.update(data["customer_feedback"])  # only unseen feedback is tokenized
+show_customer_feedback(data["customer_feedback"], feedback_index)
 show_warehouse_status(data["warehouse_inventory"])
+inv_col1, inv_col2, inv_col3 = st.columns(3)
+inventory_horizon = inv_col1.slider("Projection horizon (days)", min_value=7, max_value=365, value=90, step=7)
+inventory_policy = inv_col2.selectbox("Reorder policy", options=list(REORDER_POLICIES), index=1,
+                                      format_func={"none": "No reorders", "min_max": "Order up to level",
+                                                   "fixed_qty": "Fixed quantity"}.get)
+inventory_lead = inv_col3.number_input("Lead time (days)", min_value=0, max_value=30, value=3)
+show_inventory_projection(*service.query(
+    "inventory", session=session_id, snapshot=snapshot, horizon_days=inventory_horizon, policy=inventory_policy,
+    lead_time_days=int(inventory_lead)
+))
 
 st.markdown("---")
 st.write("Download processed metrics or models from individual visualizations where available.")
+
+# Model sections last: the registry load (and any retrain) no longer delays the panels above
+with model_area:
+    models = service.query(
+        "models", session=session_id, snapshot=snapshot, backend=backend, warm_start=warm_start,
+        force=retrain, background=background and not retrain
+    )
+
+    # Cost Model (predictive)
+    st.markdown("## Cost Model & Insights")
+    cost_model, X_test_cost, y_test_cost = models["cost_model"]
+    show_cost_model_insights(cost_model, X_test_cost, y_test_cost)
+    st.write("Top cost feature importances:")
+    cost_importance = cost_feature_importance(cost_model)
+    if cost_importance.empty:
+        st.caption("Feature importances are not available for this model.")
+    else:
+        st.dataframe(cost_importance)
+
+    # Cost anomalies against per-route running statistics; the shared detector ingests each data version once
+    anomaly_method = st.selectbox("Anomaly baseline", options=["welford", "ewma", "mad"], index=0,
+                                  format_func={"welford": "Mean/std (all time)", "ewma": "Time-decayed mean/std",
+                                               "mad": "Median/MAD (recent orders)"}.get)
+    anomalies = service.query("cost_anomalies", session=session_id, snapshot=snapshot, selection=selection,
+                              method=anomaly_method)
+    st.write(f"Cost anomalies: {len(anomalies)} orders more than 2 std above their route's usual cost per km.")
+    st.dataframe(anomalies.head(10))
+
+    # Delay predictor (regression) and classifier
+    st.markdown("## Delay Predictor")
+    delay_model = models["delay_model"][0]
+    st.write("Delay regression model trained on historical data (simple linear/regression).")
+    clf, X_test_clf, y_test_clf = models["delay_classifier"]
+    st.write("Delay classification model (Delayed vs On-time).")
+    delay_importance = delay_feature_importance(clf)
+    if delay_importance.empty:
+        st.caption("Feature importances are not available for this model.")
+    else:
+        st.dataframe(delay_importance)
+    st.write("Model fit report:")
+    st.dataframe(fit_reports(models))
+    if service.registry.is_training():
+        st.caption("Retraining in the background; showing the last good models until it finishes.")
+
+show_serving_panel(service.latency_stats(), session_id, service.active_sessions())
+if instrumentation.is_enabled():
+    show_performance_panel(instrumentation.records_frame(), instrumentation.export_json())
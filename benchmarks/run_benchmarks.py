@@ -0,0 +1,187 @@
+"""
+Time and memory-profile the pipeline on synthetic datasets of several sizes.
+
+    python -m benchmarks.run_benchmarks --sizes 100000 1000000
+    python -m benchmarks.run_benchmarks --sizes 100000 --compare benchmarks/results/<previous>.json
+
+Each run writes benchmarks/results/<timestamp>.json; --compare prints the
+time ratio per stage against an earlier result file.
+"""
+import os
+import gc
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tracemalloc
+import subprocess
+
+import pandas as pd
+import scipy.optimize  # noqa: F401  preloaded so stage timings exclude import cost
+
+from modules.data_loader import load_all_data
+from modules.data_analysis import prepare_metrics, compute_kpis, clear_metrics_cache
+from modules.optimization import compute_route_risk, recommend_alternatives
+from modules.cost_intelligence import detect_cost_anomalies, train_cost_model
+from modules.cost_anomaly import CostAnomalyDetector
+from modules.inventory import simulate_inventory
+from modules.delay_predictor import train_delay_model, train_delay_classifier
+from benchmarks.synthetic_data import generate_dataset, append_orders
+
+DEFAULT_SIZES = [100_000, 1_000_000]
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+DATA_ROOT = os.path.join(os.path.dirname(__file__), ".data")
+APPEND_FRACTION = 0.01
+
+def _rows(obj):
+    if isinstance(obj, pd.DataFrame):
+        return len(obj)
+    if isinstance(obj, dict) and any(isinstance(v, pd.DataFrame) for v in obj.values()):
+        return sum(len(v) for v in obj.values() if isinstance(v, pd.DataFrame))
+    if isinstance(obj, tuple) and obj and isinstance(obj[-1], (pd.Series, pd.DataFrame)):
+        return len(obj[-1])
+    return None
+
+def measure(fn, *args, memory=True, **kwargs):
+    """Run fn once; return (result, {seconds, peak_mb, rows_out})."""
+    gc.collect()
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    peak = None
+    if memory:
+        peak = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    return result, {"seconds": round(elapsed, 4), "peak_mb": round(peak, 2) if peak is not None else None,
+                    "rows_out": _rows(result)}
+
+def dataset_dir(n_orders, seed=42):
+    path = os.path.join(DATA_ROOT, f"orders_{n_orders}_seed{seed}")
+    if not os.path.exists(os.path.join(path, "orders.csv")):
+        generate_dataset(n_orders, path, seed=seed)
+    return path
+
+def benchmark_append(data_dir, n_orders, memory=True):
+    """
+    Load a copy of the dataset, append APPEND_FRACTION new orders to its CSVs,
+    reload, and time the prepare_metrics call that folds in just the new rows.
+    """
+    work_dir = data_dir + "_append"
+    shutil.rmtree(work_dir, ignore_errors=True)
+    shutil.copytree(data_dir, work_dir, ignore=shutil.ignore_patterns(".cache"))
+    try:
+        clear_metrics_cache()
+        prepare_metrics(load_all_data(work_dir))
+        append_orders(work_dir, n_orders, max(1, int(n_orders * APPEND_FRACTION)))
+        appended = load_all_data(work_dir)
+        _, stage = measure(prepare_metrics, appended, memory=memory)
+        stage["rows_in"] = len(appended["orders"])
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return stage
+
+def benchmark_size(n_orders, memory=True, train=True):
+    data_dir = dataset_dir(n_orders)
+    shutil.rmtree(os.path.join(data_dir, ".cache"), ignore_errors=True)
+    stages = {}
+
+    data, stages["load_all_data_cold"] = measure(load_all_data, data_dir, memory=memory)
+    data, stages["load_all_data_cached"] = measure(load_all_data, data_dir, memory=memory)
+    stages["load_all_data_cached"]["rows_in"] = _rows(data)
+
+    clear_metrics_cache()
+    metrics, stages["prepare_metrics"] = measure(prepare_metrics, data, memory=memory)
+    _, stages["prepare_metrics_memoized"] = measure(prepare_metrics, data, memory=memory)
+    stages["prepare_metrics_append"] = benchmark_append(data_dir, n_orders, memory=memory)
+    _, stages["compute_kpis"] = measure(compute_kpis, metrics, memory=memory)
+    route_risk, stages["compute_route_risk"] = measure(compute_route_risk, metrics, memory=memory)
+    _, stages["recommend_alternatives"] = measure(recommend_alternatives, route_risk, data["vehicle_fleet"], memory=memory)
+    _, stages["detect_cost_anomalies"] = measure(detect_cost_anomalies, metrics, memory=memory)
+    detector = CostAnomalyDetector()
+    _, stages["cost_anomaly_update"] = measure(detector.update, metrics, memory=memory)
+    _, stages["cost_anomaly_update_seen"] = measure(detector.update, metrics, memory=memory)
+    _, stages["cost_anomaly_score"] = measure(detector.score, metrics, memory=memory)
+    _, stages["simulate_inventory_365d"] = measure(simulate_inventory, data["warehouse_inventory"], data["orders"],
+                                                   horizon_days=365, policy="min_max", memory=memory)
+    stages["simulate_inventory_365d"]["rows_in"] = len(data["warehouse_inventory"])
+    if train:
+        _, stages["train_cost_model"] = measure(train_cost_model, metrics, memory=memory)
+        _, stages["train_delay_model"] = measure(train_delay_model, metrics, memory=memory)
+        _, stages["train_delay_classifier"] = measure(train_delay_classifier, metrics, memory=memory)
+    for name, stage in stages.items():
+        if name not in ("load_all_data_cold", "load_all_data_cached"):
+            stage.setdefault("rows_in", len(metrics))
+    return stages
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(current, previous):
+    """Per-stage time ratio current/previous for sizes present in both runs."""
+    rows = []
+    for size, stages in current["sizes"].items():
+        for stage, m in stages.items():
+            before = previous.get("sizes", {}).get(size, {}).get(stage)
+            if before and before.get("seconds"):
+                rows.append({"size": size, "stage": stage, "before_s": before["seconds"],
+                             "after_s": m["seconds"], "ratio": round(m["seconds"] / before["seconds"], 3)})
+    return pd.DataFrame(rows)
+
+def check_incremental(result):
+    """Sizes where folding in an append or a memoized call was not faster than the full build."""
+    slow = []
+    for size, stages in result["sizes"].items():
+        full = stages["prepare_metrics"]["seconds"]
+        for stage in ("prepare_metrics_append", "prepare_metrics_memoized"):
+            if stages[stage]["seconds"] >= full:
+                slow.append(f"{size}: {stage} took {stages[stage]['seconds']}s, full build {full}s")
+    return slow
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the logistics pipeline on synthetic data.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="order counts to benchmark")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc (faster, no peak_mb)")
+    parser.add_argument("--no-train", action="store_true", help="skip the three model trainers")
+    parser.add_argument("--output", help="result JSON path (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier result JSON to compare against")
+    args = parser.parse_args(argv)
+
+    result = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "cpu_count": os.cpu_count(),
+        "sizes": {},
+    }
+    for n in args.sizes:
+        print(f"benchmarking {n:,} orders...", file=sys.stderr)
+        result["sizes"][str(n)] = benchmark_size(n, memory=not args.no_memory, train=not args.no_train)
+
+    output = args.output or os.path.join(RESULTS_DIR, time.strftime("%Y%m%d_%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"results written to {output}", file=sys.stderr)
+
+    table = pd.DataFrame([dict(size=size, stage=stage, **m) for size, stages in result["sizes"].items()
+                          for stage, m in stages.items()])
+    print(table.to_string(index=False))
+    if args.compare:
+        with open(args.compare) as f:
+            print(compare(result, json.load(f)).to_string(index=False))
+    slow = check_incremental(result)
+    for line in slow:
+        print(f"incremental build not faster than the full build: {line}", file=sys.stderr)
+    return 1 if slow else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
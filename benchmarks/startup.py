@@ -0,0 +1,80 @@
+"""
+Measure dashboard cold start against the startup budget.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --budget 1.5 --runs 3
+
+Each run starts a fresh interpreter, so import costs are paid again. It
+reports the import time of everything app.py imports, which heavy
+dependencies that pulled in eagerly, the time from the end of the app's
+imports to the KPI panels, and the full run time. First paint is the sum
+of the import time and the render time; the script exits non-zero when
+the median first paint exceeds the budget.
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+STARTUP_BUDGET_SECONDS = 2.0
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+# Dependencies that should only load once the panel needing them is drawn
+HEAVY_MODULES = ["sklearn", "plotly.express", "wordcloud", "matplotlib", "scipy.optimize"]
+
+# Imports app.py's dependencies in a fresh process (so the app run below finds them
+# loaded), then runs the app; first_paint_seconds is recorded by app.py after the KPIs
+_APP_PROBE = """
+import ast, sys, time, json, importlib
+tree = ast.parse(open(%(app)r, encoding="utf-8").read())
+names = [a.name for n in tree.body if isinstance(n, ast.Import) for a in n.names]
+names += [n.module for n in tree.body if isinstance(n, ast.ImportFrom)]
+start = time.perf_counter()
+for name in names:
+    importlib.import_module(name)
+imports = time.perf_counter() - start
+eager = [m for m in %(heavy)r if m in sys.modules]
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+at = AppTest.from_file(%(app)r, default_timeout=300).run()
+total = time.perf_counter() - start
+print(json.dumps({"imports": imports, "eager": eager, "render": at.session_state["first_paint_seconds"],
+                  "total": total, "exceptions": [str(e.value) for e in at.exception]}))
+"""
+
+def _probe(code, cwd):
+    out = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def measure_startup(runs=1):
+    cwd = os.path.dirname(APP_PATH)
+    runs = [_probe(_APP_PROBE % {"app": APP_PATH, "heavy": HEAVY_MODULES}, cwd) for _ in range(runs)]
+    return {
+        "import_seconds": round(statistics.median(r["imports"] for r in runs), 3),
+        "eager_heavy_modules": sorted({m for r in runs for m in r["eager"]}),
+        "render_seconds": round(statistics.median(r["render"] for r in runs), 3),
+        "first_paint_seconds": round(statistics.median(r["imports"] + r["render"] for r in runs), 3),
+        "full_run_seconds": round(statistics.median(r["imports"] + r["total"] for r in runs), 3),
+        "exceptions": [e for r in runs for e in r["exceptions"]],
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_SECONDS,
+                        help="first-paint budget in seconds")
+    parser.add_argument("--runs", type=int, default=1, help="fresh-process runs; the median is reported")
+    args = parser.parse_args(argv)
+    result = measure_startup(args.runs)
+    result["budget_seconds"] = args.budget
+    print(json.dumps(result, indent=2))
+    if result["exceptions"]:
+        print("app raised exceptions during the run", file=sys.stderr)
+        return 1
+    if result["first_paint_seconds"] > args.budget:
+        print(f"first paint {result['first_paint_seconds']}s exceeds the {args.budget}s budget", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
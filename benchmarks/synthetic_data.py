@@ -0,0 +1,200 @@
+"""
+Synthetic NexGen dataset generator.
+
+Writes all seven CSVs with the same columns as data/ and join cardinalities
+close to the bundled sample: ~75% of orders have delivery, cost and route
+rows, ~40% have feedback, the fleet and warehouse network grow with volume.
+
+    python -m benchmarks.synthetic_data --orders 1000000 --out /tmp/nexgen_1m
+"""
+import os
+import argparse
+
+import numpy as np
+import pandas as pd
+
+CITIES = ["Mumbai", "Delhi", "Bangalore", "Chennai", "Kolkata", "Hyderabad", "Pune", "Ahmedabad"]
+INTERNATIONAL = ["Dubai", "Singapore", "Bangkok", "Hong Kong"]
+SEGMENTS = ["Individual", "SMB", "Enterprise"]
+PRIORITIES = ["Express", "Standard", "Economy"]
+CATEGORIES = ["Electronics", "Fashion", "Food & Beverage", "Healthcare", "Industrial", "Books", "Home Goods"]
+HANDLING = ["None", "Fragile", "Temperature_Controlled", "Hazmat"]
+CARRIERS = ["SpeedyLogistics", "QuickShip", "GlobalTransit", "ReliableExpress", "EcoDeliver"]
+STATUSES = ["On-Time", "Slightly-Delayed", "Severely-Delayed"]
+QUALITY = ["Perfect", "Minor_Damage", "Major_Damage", "Lost"]
+WEATHER = ["None", "Light_Rain", "Heavy_Rain", "Fog"]
+ISSUES = ["None", "Timing", "Damage", "Wrong_Item", "Communication", "Other"]
+FEEDBACK_TEXT = [
+    "Great service, very fast delivery!", "Perfect condition, thank you",
+    "Delivery was late and nobody called", "Package arrived damaged",
+    "Wrong item delivered, very disappointed", "Average experience, could be faster",
+    "Driver was polite and helpful", "Tracking information was not updated",
+]
+VEHICLE_TYPES = {  # type -> (capacity kg range, km per litre range, kg CO2 per km)
+    "Express_Bike": ((20, 60), (35, 50), 0.05),
+    "Small_Van": ((500, 900), (9, 13), 0.26),
+    "Medium_Truck": ((2000, 5000), (6, 9), 0.40),
+    "Large_Truck": ((8000, 15000), (3, 6), 0.60),
+    "Refrigerated": ((1000, 3000), (5, 8), 0.46),
+}
+
+def _choice(rng, values, n, p=None):
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size=n, p=p)]
+
+def fleet_size(n_orders):
+    return int(np.clip(n_orders // 200, 50, 5000))
+
+def warehouse_count(n_orders):
+    return int(np.clip(n_orders // 20000, 5, 500))
+
+def _orders_chunk(rng, ids, start_day, days):
+    n = len(ids)
+    origin = _choice(rng, CITIES, n)
+    dest = _choice(rng, CITIES + INTERNATIONAL, n)
+    dates = np.datetime64(start_day) + rng.integers(0, days, n).astype("timedelta64[D]")
+    orders = pd.DataFrame({
+        "Order_ID": ids,
+        "Order_Date": pd.to_datetime(dates).strftime("%Y-%m-%d"),
+        "Customer_Segment": _choice(rng, SEGMENTS, n),
+        "Priority": _choice(rng, PRIORITIES, n),
+        "Product_Category": _choice(rng, CATEGORIES, n),
+        "Order_Value_INR": np.round(rng.lognormal(7, 1.2, n), 2),
+        "Origin": origin,
+        "Destination": dest,
+        "Special_Handling": _choice(rng, HANDLING, n, p=[0.7, 0.15, 0.1, 0.05]),
+    })
+    return orders
+
+def _side_chunks(rng, orders):
+    # delivery, cost and route rows exist for ~75% of orders, feedback for ~40%
+    shipped = orders[rng.random(len(orders)) < 0.75]
+    n = len(shipped)
+    promised = rng.integers(1, 8, n)
+    actual = promised + np.maximum(rng.poisson(1.0, n) - rng.integers(0, 2, n), 0)
+    delay = actual - promised
+    international = np.isin(shipped["Destination"].to_numpy(), INTERNATIONAL)
+    distance = np.round(np.where(international, rng.uniform(2500, 5000, n), rng.uniform(50, 2000, n)), 2)
+    perf = pd.DataFrame({
+        "Order_ID": shipped["Order_ID"].to_numpy(),
+        "Carrier": _choice(rng, CARRIERS, n),
+        "Promised_Delivery_Days": promised,
+        "Actual_Delivery_Days": actual,
+        "Delivery_Status": np.where(delay <= 0, STATUSES[0], np.where(delay <= 2, STATUSES[1], STATUSES[2])),
+        "Quality_Issue": _choice(rng, QUALITY, n, p=[0.8, 0.12, 0.06, 0.02]),
+        "Customer_Rating": rng.integers(1, 6, n),
+        "Delivery_Cost_INR": np.round(rng.uniform(100, 900, n), 2),
+    })
+    cost = pd.DataFrame({
+        "Order_ID": shipped["Order_ID"].to_numpy(),
+        "Fuel_Cost": np.round(distance * rng.uniform(0.08, 0.2, n) + rng.uniform(20, 80, n), 2),
+        "Labor_Cost": np.round(rng.uniform(50, 250, n), 2),
+        "Vehicle_Maintenance": np.round(rng.uniform(15, 80, n), 2),
+        "Insurance": np.round(rng.uniform(10, 45, n), 2),
+        "Packaging_Cost": np.round(rng.uniform(5, 60, n), 2),
+        "Technology_Platform_Fee": np.round(rng.uniform(10, 60, n), 2),
+        "Other_Overhead": np.round(rng.uniform(10, 50, n), 2),
+    })
+    routes = pd.DataFrame({
+        "Order_ID": shipped["Order_ID"].to_numpy(),
+        "Route": shipped["Origin"].to_numpy() + "-" + shipped["Destination"].to_numpy(),
+        "Distance_KM": distance,
+        "Fuel_Consumption_L": np.round(distance / rng.uniform(5, 12, n), 2),
+        "Toll_Charges_INR": np.round(distance * rng.uniform(0.3, 0.9, n), 2),
+        "Traffic_Delay_Minutes": rng.integers(0, 120, n),
+        "Weather_Impact": _choice(rng, WEATHER, n, p=[0.7, 0.16, 0.1, 0.04]),
+    })
+    rated = orders[rng.random(len(orders)) < 0.4]
+    m = len(rated)
+    feedback_dates = pd.to_datetime(rated["Order_Date"]) + pd.to_timedelta(rng.integers(1, 10, m), unit="D")
+    feedback = pd.DataFrame({
+        "Order_ID": rated["Order_ID"].to_numpy(),
+        "Feedback_Date": feedback_dates.dt.strftime("%Y-%m-%d").to_numpy(),
+        "Rating": rng.integers(1, 6, m),
+        "Feedback_Text": _choice(rng, FEEDBACK_TEXT, m),
+        "Would_Recommend": _choice(rng, ["Yes", "No"], m),
+        "Issue_Category": _choice(rng, ISSUES, m),
+    })
+    return {"delivery_performance": perf, "cost_breakdown": cost, "routes_distance": routes, "customer_feedback": feedback}
+
+def _fleet(rng, n):
+    types = _choice(rng, list(VEHICLE_TYPES), n)
+    cap = np.empty(n)
+    eff = np.empty(n)
+    co2 = np.empty(n)
+    for t, ((c_lo, c_hi), (e_lo, e_hi), factor) in VEHICLE_TYPES.items():
+        sel = types == t
+        cap[sel] = rng.uniform(c_lo, c_hi, sel.sum())
+        eff[sel] = rng.uniform(e_lo, e_hi, sel.sum())
+        co2[sel] = factor * rng.uniform(0.9, 1.1, sel.sum())
+    return pd.DataFrame({
+        "Vehicle_ID": [f"VEH{i:05d}" for i in range(1, n + 1)],
+        "Vehicle_Type": types,
+        "Capacity_KG": np.round(cap, 2),
+        "Fuel_Efficiency_KM_per_L": np.round(eff, 2),
+        "Current_Location": _choice(rng, CITIES, n),
+        "Status": _choice(rng, ["Available", "In_Transit", "Maintenance"], n, p=[0.55, 0.38, 0.07]),
+        "Age_Years": rng.uniform(0.5, 10, n),
+        "CO2_Emissions_Kg_per_KM": np.round(co2, 3),
+    })
+
+def _warehouses(rng, n_warehouses, end_day):
+    cities = np.resize(np.asarray(CITIES, dtype=object), n_warehouses)
+    ids = [f"WH{i:03d}_{c}" for i, c in enumerate(cities, start=1)]
+    wh = pd.DataFrame({"Warehouse_ID": np.repeat(ids, len(CATEGORIES)),
+                       "Location": np.repeat(cities, len(CATEGORIES)),
+                       "Product_Category": np.tile(CATEGORIES, n_warehouses)})
+    n = len(wh)
+    wh["Current_Stock_Units"] = rng.integers(200, 5000, n)
+    wh["Reorder_Level"] = rng.integers(100, 1000, n)
+    wh["Storage_Cost_per_Unit"] = np.round(rng.uniform(2, 25, n), 2)
+    restocked = np.datetime64(end_day) - rng.integers(0, 30, n).astype("timedelta64[D]")
+    wh["Last_Restocked_Date"] = pd.to_datetime(restocked).strftime("%Y-%m-%d")
+    return wh
+
+def _paths(out_dir):
+    return {name: os.path.join(out_dir, name + ".csv") for name in [
+        "orders", "delivery_performance", "cost_breakdown", "routes_distance", "customer_feedback",
+        "vehicle_fleet", "warehouse_inventory"]}
+
+def _write_orders(rng, paths, start, stop, start_day, days, first):
+    ids = np.char.add("ORD", np.char.zfill(np.arange(start + 1, stop + 1).astype(str), 8)).astype(object)
+    orders = _orders_chunk(rng, ids, start_day, days)
+    tables = {"orders": orders, **_side_chunks(rng, orders)}
+    for name, df in tables.items():
+        df.to_csv(paths[name], mode="w" if first else "a", header=first, index=False)
+
+def generate_dataset(n_orders, out_dir, seed=42, start_day="2025-01-01", days=365, chunk_rows=1_000_000):
+    """
+    Write the seven CSVs for `n_orders` orders into out_dir, `chunk_rows`
+    orders at a time so 10^7-row datasets fit in memory. Returns file paths.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    paths = _paths(out_dir)
+    for start in range(0, n_orders, chunk_rows):
+        _write_orders(rng, paths, start, min(start + chunk_rows, n_orders), start_day, days, first=start == 0)
+    _fleet(rng, fleet_size(n_orders)).to_csv(paths["vehicle_fleet"], index=False)
+    end_day = np.datetime64(start_day) + np.timedelta64(days, "D")
+    _warehouses(rng, warehouse_count(n_orders), end_day).to_csv(paths["warehouse_inventory"], index=False)
+    return paths
+
+def append_orders(out_dir, n_existing, n_new, seed=43, start_day="2025-01-01", days=365):
+    """
+    Append `n_new` orders (ids continuing after `n_existing`) and their
+    delivery, cost, route and feedback rows to a generated dataset.
+    """
+    _write_orders(np.random.default_rng(seed), _paths(out_dir), n_existing, n_existing + n_new,
+                  start_day, days, first=False)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic NexGen dataset.")
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args(argv)
+    for name, path in generate_dataset(args.orders, args.out, args.seed, days=args.days).items():
+        print(f"{name}: {path}")
+
+if __name__ == "__main__":
+    main()
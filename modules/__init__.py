@@ -0,0 +1,40 @@
+"""
+Modules package for the NexGen Predictive Delivery & Cost Intelligence Platform.
+
+This package contains:
+- data_loader: for importing all raw CSV datasets.
+- data_analysis: for merging, cleaning, and deriving metrics.
+- filtering: for the filter index and pre-aggregated KPI cube.
+- cost_intelligence / cost_anomaly: for cost models and cost anomaly detection.
+- delay_predictor / training / model_registry: for predictive models and their storage.
+- optimization / route_risk: for route risk scoring and vehicle assignment.
+- inventory: for warehouse stock projection and reorder simulation.
+- feedback_index: for customer feedback term counts and word clouds.
+- compute_service: for the compute layer shared by dashboard sessions.
+- visualization / render: for the Streamlit panels and bounded chart payloads.
+- streaming / batch_scoring: for out-of-core metrics and headless scoring.
+- instrumentation: for per-stage timings.
+- utils: for CO2 estimates and shared helpers.
+
+Submodules are imported lazily on first attribute access (PEP 562), so
+`import modules` is cheap and heavy dependencies (scikit-learn, plotly,
+wordcloud) load only when the code that needs them runs.
+"""
+import importlib
+
+__all__ = [
+    "data_loader", "data_analysis", "filtering", "cost_intelligence", "cost_anomaly",
+    "delay_predictor", "training", "model_registry", "optimization", "route_risk",
+    "inventory", "feedback_index", "compute_service", "visualization", "render",
+    "streaming", "batch_scoring", "instrumentation", "utils"
+]
+
+def __getattr__(name):
+    if name in __all__:
+        module = importlib.import_module(f".{name}", __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,191 @@
+import os
+import sys
+import time
+import json
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import numpy as np
+
+from .data_loader import SCHEMAS
+from .model_registry import REGISTRY_DIR, FULL_DATA_PIN, ModelRegistry
+
+SCORED_MODELS = ["cost_model", "delay_model", "delay_classifier"]
+ID_COLUMNS = ["Order_ID", "Order_Date", "Origin", "Destination"]
+
+# Models loaded once per worker process
+_models = {}
+
+def pinned_keys(models_dir=REGISTRY_DIR, pin=FULL_DATA_PIN):
+    """Registry key pinned as `pin` for each scored model (None when missing)."""
+    registry = ModelRegistry(models_dir)
+    return {name: registry.pinned_key(name, pin) for name in SCORED_MODELS}
+
+def load_models(models_dir=REGISTRY_DIR, pin=FULL_DATA_PIN):
+    """
+    The model pinned as `pin` for each scored name (bare estimators).
+    Raises LookupError when any of them is missing, rather than scoring
+    with whatever a dashboard session fitted last.
+    """
+    registry = ModelRegistry(models_dir)
+    models, missing = {}, []
+    for name in SCORED_MODELS:
+        model = registry.pinned(name, pin)
+        if model is None:
+            missing.append(name)
+        else:
+            models[name] = model
+    if missing:
+        raise LookupError(f"No model pinned as '{pin}' for {', '.join(missing)} in '{models_dir}'; "
+                          "open the dashboard once to fit the full-data models, or pin a key with ModelRegistry.pin.")
+    return models
+
+def _init_worker(models_dir, pin):
+    _models.update(load_models(models_dir, pin))
+
+def _features(chunk, model):
+    """Model inputs in training column order, float32 with gaps filled by 0."""
+    names = list(getattr(model, "feature_names_in_", []))
+    X = np.nan_to_num(chunk.reindex(columns=names).to_numpy(dtype=np.float32, na_value=np.nan), nan=0.0)
+    return pd.DataFrame(X, columns=names, copy=False)
+
+def score_chunk(chunk, models=None):
+    """
+    Vectorized predictions for one chunk of orders:
+    Predicted_Cost_INR, Expected_Delay_Days and Delay_Probability.
+    Missing features are filled with 0, as in training; when Total_Cost_INR
+    is unknown the classifier uses the predicted cost.
+    """
+    models = models if models is not None else _models
+    out = chunk[[c for c in ID_COLUMNS if c in chunk.columns]].copy()
+    chunk = chunk.copy()
+    if "cost_model" in models:
+        out["Predicted_Cost_INR"] = models["cost_model"].predict(_features(chunk, models["cost_model"]))
+        if "Total_Cost_INR" not in chunk.columns:
+            chunk["Total_Cost_INR"] = out["Predicted_Cost_INR"].to_numpy()
+    if "delay_model" in models:
+        out["Expected_Delay_Days"] = models["delay_model"].predict(_features(chunk, models["delay_model"]))
+    if "delay_classifier" in models:
+        clf = models["delay_classifier"]
+        proba = clf.predict_proba(_features(chunk, clf))
+        classes = list(clf.classes_)
+        out["Delay_Probability"] = proba[:, classes.index(1)] if 1 in classes else 0.0
+    return out
+
+def _read_lookup(path, columns):
+    if not path:
+        return None
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [c for c in ["Order_ID"] + columns if c in header]
+    df = pd.read_csv(path, usecols=usecols, dtype={"Order_ID": "string"})
+    return df.drop_duplicates("Order_ID").set_index("Order_ID")
+
+def iter_input_chunks(orders_path, chunksize, routes_path=None, performance_path=None):
+    """Typed order chunks joined with the route and promised-days features they need."""
+    routes = _read_lookup(routes_path, ["Route", "Distance_KM", "Traffic_Delay_Minutes"])
+    perf = _read_lookup(performance_path, ["Promised_Delivery_Days"])
+    header = pd.read_csv(orders_path, nrows=0).columns
+    schema = SCHEMAS["orders"]
+    dtypes = {c: t for c, t in schema["dtypes"].items() if c in header}
+    for chunk in pd.read_csv(orders_path, dtype=dtypes, chunksize=chunksize):
+        for lookup in (routes, perf):
+            if lookup is not None:
+                chunk = chunk.join(lookup[lookup.columns.difference(chunk.columns)], on="Order_ID")
+        yield chunk
+
+class _Writer:
+    """Append scored chunks to one Parquet or CSV file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.endswith(".parquet")
+        self._writer = None
+        self._first = True
+
+    def write(self, df):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table.cast(self._writer.schema))
+        else:
+            df.to_csv(self.path, mode="w" if self._first else "a", header=self._first, index=False)
+        self._first = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+def run_batch_scoring(orders_path, output_path, models_dir=REGISTRY_DIR, routes_path=None,
+                      performance_path=None, chunksize=100_000, workers=None, pin=FULL_DATA_PIN):
+    """
+    Stream `orders_path` in chunks, score them on a process pool and write
+    results in input order. Uses the models pinned as `pin` (by default the
+    ones fitted on the full dataset). Returns a summary with rows, seconds,
+    rows/sec and the model keys used.
+    """
+    models = load_models(models_dir, pin)
+    workers = workers or os.cpu_count() or 1
+    chunks = iter_input_chunks(orders_path, chunksize, routes_path, performance_path)
+    writer = _Writer(output_path)
+    rows = 0
+    start = time.perf_counter()
+    try:
+        if workers == 1:
+            for chunk in chunks:
+                scored = score_chunk(chunk, models)
+                writer.write(scored)
+                rows += len(scored)
+        else:
+            # keep a bounded number of chunks in flight so memory stays flat
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(models_dir, pin)) as pool:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(pool.submit(score_chunk, chunk))
+                    if len(pending) >= 2 * workers:
+                        scored = pending.popleft().result()
+                        writer.write(scored)
+                        rows += len(scored)
+                while pending:
+                    scored = pending.popleft().result()
+                    writer.write(scored)
+                    rows += len(scored)
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(rows / elapsed, 1) if elapsed > 0 else None,
+        "workers": workers,
+        "models": sorted(models),
+        "model_keys": pinned_keys(models_dir, pin),
+        "output": output_path,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score orders with the persisted delay and cost models.")
+    parser.add_argument("orders", help="orders CSV to score")
+    parser.add_argument("-o", "--output", default="scored_orders.parquet", help=".parquet or .csv output path")
+    parser.add_argument("--routes", help="routes_distance CSV providing Distance_KM / Traffic_Delay_Minutes")
+    parser.add_argument("--performance", help="delivery_performance CSV providing Promised_Delivery_Days")
+    parser.add_argument("--models-dir", default=REGISTRY_DIR)
+    parser.add_argument("--pin", default=FULL_DATA_PIN, help="registry pin label of the models to score with")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+    try:
+        summary = run_batch_scoring(args.orders, args.output, args.models_dir, args.routes,
+                                    args.performance, args.chunksize, args.workers, args.pin)
+    except LookupError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    print(json.dumps(summary, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
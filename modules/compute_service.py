@@ -0,0 +1,293 @@
+import os
+import time
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import numpy as np
+
+from .data_loader import FILES, load_all_data
+from .data_analysis import prepare_metrics, metrics_version
+from .filtering import get_filter_index, filter_rows, kpis_from_cube, daily_trend
+from .optimization import assign_vehicles, route_demand
+from .route_risk import build_route_risk_engine
+from .model_registry import REGISTRY_DIR, FULL_DATA_PIN, get_registry
+from .training import train_registered_models
+from .inventory import simulate_inventory, compare_policies
+from .cost_anomaly import ANOMALY_STATE_PATH, CostAnomalyDetector
+from . import instrumentation
+from .instrumentation import stage
+
+DEFAULT_WORKERS = 4
+RESULT_CACHE_SIZE = 256
+LATENCY_WINDOW = 500  # calls kept per session
+SESSION_TTL_SECONDS = 3600
+
+def _freeze(value):
+    """Hashable, order-independent form of (nested) query parameters."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return str(value)
+
+class Snapshot:
+    """One loaded version of the data: raw tables, enriched metrics and the filter index."""
+
+    def __init__(self, version, data, metrics, filter_index):
+        self.version = version
+        self.data = data
+        self.metrics = metrics
+        self.filter_index = filter_index
+
+class ComputeService:
+    """
+    Shared compute layer for every dashboard session in the process.
+
+    Holds a single copy of the data, metrics and filter index (reloaded only
+    when the source CSVs change) and answers named queries on a thread pool.
+    Identical queries share one in-flight computation, finished results are
+    kept in an LRU keyed by data version and parameters, and the latency of
+    every call is recorded per session.
+    Results are shared between sessions and must be treated as read-only.
+    """
+
+    def __init__(self, data_dir="data", registry_root=REGISTRY_DIR, max_workers=DEFAULT_WORKERS):
+        self.data_dir = data_dir
+        self.registry = get_registry(registry_root)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="compute")
+        self._lock = threading.RLock()  # re-entered when a future completes inside submit()
+        self._snapshot_lock = threading.Lock()
+        self._snapshot = None
+        self._source = None
+        self._results = OrderedDict()
+        self._inflight = {}
+        self._latency = {}    # session -> deque of (kind, seconds, source)
+        self._last_seen = {}  # session -> time of last call
+        # one cost anomaly detector for all sessions; its persisted state is loaded once
+        self.anomaly_state_path = os.path.join(self.registry.root, os.path.basename(ANOMALY_STATE_PATH))
+        self._anomaly = None
+        self._anomaly_version = None
+        self._anomaly_lock = threading.Lock()  # detector updates and scoring must not overlap
+        self._model_sets = {}  # (data version, backend, warm_start) -> models of the current snapshot
+        self.queries = {
+            "rows": self._rows,
+            "kpis": self._kpis,
+            "trend": self._trend,
+            "risk_engine": self._risk_engine,
+            "route_risk": self._route_risk,
+            "assignments": self._assignments,
+            "models": self._models,
+            "inventory": self._inventory,
+            "cost_anomalies": self._cost_anomalies,
+        }
+        # fits go through the model registry and are memoized per data version in _models
+        self.uncached = {"models"}
+
+    def _source_signature(self):
+        sig = []
+        for name in FILES.values():
+            try:
+                st = os.stat(os.path.join(self.data_dir, name))
+                sig.append((name, st.st_mtime_ns, st.st_size))
+            except OSError:
+                sig.append((name, None, None))
+        return tuple(sig)
+
+    def snapshot(self):
+        """Current data snapshot, reloading when a source file's mtime or size changed."""
+        sig = self._source_signature()
+        with self._snapshot_lock:
+            if self._snapshot is None or sig != self._source:
+                data = load_all_data(self.data_dir)
+                metrics = prepare_metrics(data)
+                version = metrics_version()
+                self._snapshot = Snapshot(version, data, metrics, get_filter_index(metrics, key=version))
+                self._source = sig
+            return self._snapshot
+
+    # query implementations: (snapshot, params) -> result, may reuse other cached queries
+
+    def _rows(self, snap, params):
+        return filter_rows(snap.filter_index, **params["selection"])
+
+    def _kpis(self, snap, params):
+        return kpis_from_cube(snap.filter_index["cube"], **params["selection"])
+
+    def _trend(self, snap, params):
+        return daily_trend(snap.filter_index["cube"], **params["selection"])
+
+    def filtered(self, snap, selection):
+        return snap.metrics.take(self._get(snap, "rows", {"selection": selection}))
+
+    def _risk_engine(self, snap, params):
+        return build_route_risk_engine(self.filtered(snap, params["selection"]))
+
+    def _route_risk(self, snap, params):
+        engine = self._get(snap, "risk_engine", {"selection": params["selection"]})
+        route_risk = engine.scores("route")
+        return route_risk if not route_risk.empty else pd.DataFrame(columns=["Route","Route_Risk"])
+
+    def _assignments(self, snap, params):
+        route_risk = self._get(snap, "route_risk", {"selection": params["selection"]})
+        demand = route_demand(self.filtered(snap, params["selection"]))
+        if not demand.empty:
+            route_risk = route_risk.merge(demand, on="Route", how="left")
+        return assign_vehicles(route_risk, snap.data["vehicle_fleet"])
+
+    def _models(self, snap, params):
+        # fitted on the whole snapshot: one model set per data version, whatever the session's filters
+        key = (snap.version, params.get("backend", "auto"), params.get("warm_start", False))
+        if not params.get("force", False):
+            with self._lock:
+                if key in self._model_sets:
+                    return self._model_sets[key]
+        result = train_registered_models(self.registry, snap.metrics,
+                                         backend=key[1], warm_start=key[2],
+                                         force=params.get("force", False), background=params.get("background", False),
+                                         pin=FULL_DATA_PIN)
+        # while a background retrain runs the last good models are served; ask the registry again next time
+        if not self.registry.is_training():
+            with self._lock:
+                self._model_sets = {k: v for k, v in self._model_sets.items() if k[0] == snap.version}
+                self._model_sets[key] = result
+        return result
+
+    def _inventory(self, snap, params):
+        """(summary, daily stock, policy comparison) for the whole network."""
+        wh, orders = snap.data["warehouse_inventory"], snap.data["orders"]
+        summary, daily = simulate_inventory(wh, orders, **params)
+        options = {k: v for k, v in params.items() if k != "policy"}
+        return summary, daily, compare_policies(wh, orders, **options)
+
+    def anomaly_detector(self, snap):
+        """
+        The shared CostAnomalyDetector, fed the snapshot's orders once per data
+        version. Call with `_anomaly_lock` held: updates and scoring must not overlap.
+        """
+        if self._anomaly is None:
+            self._anomaly = CostAnomalyDetector.load(self.anomaly_state_path)
+        if self._anomaly_version != snap.version:
+            if self._anomaly.update(snap.metrics):
+                self._anomaly.save(self.anomaly_state_path)
+            self._anomaly_version = snap.version
+        return self._anomaly
+
+    def _cost_anomalies(self, snap, params):
+        """Flagged orders of the selection with their Cost_Z, highest first."""
+        filtered = self.filtered(snap, params["selection"])
+        with self._anomaly_lock:
+            _, z, flags = self.anomaly_detector(snap).score(filtered, method=params.get("method", "welford"),
+                                                             threshold=params.get("threshold", 2.0))
+        anomalies = filtered.loc[flags, ["Order_ID","Order_Date","Route","Cost_per_KM"]].assign(Cost_Z=z[flags])
+        return anomalies.sort_values("Cost_Z", ascending=False)
+
+    def _key(self, snap, kind, params):
+        return (snap.version, kind, _freeze(params))
+
+    def _get(self, snap, kind, params):
+        """Cached result or compute in the calling thread (used inside workers)."""
+        key = self._key(snap, kind, params)
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+        result = self.queries[kind](snap, params)
+        if kind not in self.uncached:
+            with self._lock:
+                self._results[key] = result
+                while len(self._results) > RESULT_CACHE_SIZE:
+                    self._results.popitem(last=False)
+        return result
+
+    def _compute(self, snap, kind, params, profile):
+        """Pool entry point: run the query with the caller's profiling settings and return its stages."""
+        with instrumentation.capture(*profile) as records:
+            result = self._get(snap, kind, params)
+        return result, records
+
+    def query(self, kind, session=None, snapshot=None, **params):
+        """
+        Run query `kind` with keyword params on the pool and wait for it.
+        Cache hits return at once; a request identical to one already running
+        waits on that computation instead of starting another. Pass the
+        `snapshot` a rerun started from so all of its queries (and row
+        positions) refer to the same data version; defaults to the current one.
+        """
+        if kind not in self.queries:
+            raise ValueError(f"Unknown query '{kind}'; expected one of {sorted(self.queries)}")
+        start = time.perf_counter()
+        with stage(f"compute_service.{kind}") as info:
+            snap = snapshot if snapshot is not None else self.snapshot()
+            key = self._key(snap, kind, params)
+            with self._lock:
+                cached = key in self._results
+                if cached:
+                    self._results.move_to_end(key)
+                    result = self._results[key]
+                else:
+                    future = self._inflight.get(key)
+                    shared = future is not None
+                    if not shared:
+                        future = self._executor.submit(self._compute, snap, kind, params, instrumentation.settings())
+                        self._inflight[key] = future
+                        future.add_done_callback(lambda f, key=key: self._done(key, f))
+            if not cached:
+                result, records = future.result()
+                if not shared:
+                    instrumentation.merge(records)
+            source = "cache" if cached else ("shared" if shared else "computed")
+            info["rows_out"] = instrumentation.count_rows(result)
+            info["source"] = source
+        self._record(session, kind, time.perf_counter() - start, source)
+        return result
+
+    def _done(self, key, future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _record(self, session, kind, seconds, source):
+        session = session or "anonymous"
+        now = time.time()
+        with self._lock:
+            self._latency.setdefault(session, deque(maxlen=LATENCY_WINDOW)).append((kind, seconds, source))
+            self._last_seen[session] = now
+            for stale in [s for s, t in self._last_seen.items() if now - t > SESSION_TTL_SECONDS]:
+                self._latency.pop(stale, None)
+                self._last_seen.pop(stale, None)
+
+    def latency_stats(self, session=None):
+        """Per session and query: calls, cache/shared hit rate and p50/p95/max latency in ms."""
+        with self._lock:
+            calls = [(s, k, sec, src) for s, log in self._latency.items() if session in (None, s)
+                     for k, sec, src in log]
+        if not calls:
+            return pd.DataFrame(columns=["session","query","calls","hit_rate","p50_ms","p95_ms","max_ms"])
+        df = pd.DataFrame(calls, columns=["session","query","seconds","source"])
+        df["ms"] = df["seconds"] * 1000
+        df["hit"] = df["source"] != "computed"
+        out = df.groupby(["session","query"]).agg(
+            calls=("ms", "size"), hit_rate=("hit", "mean"),
+            p50_ms=("ms", "median"), p95_ms=("ms", lambda s: np.percentile(s, 95)), max_ms=("ms", "max"),
+        ).reset_index()
+        return out.round({"hit_rate": 3, "p50_ms": 2, "p95_ms": 2, "max_ms": 2})
+
+    def active_sessions(self, within_seconds=300):
+        now = time.time()
+        with self._lock:
+            return sum(1 for t in self._last_seen.values() if now - t <= within_seconds)
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+            self._model_sets.clear()
+
+_services = {}
+_services_lock = threading.Lock()
+
+def get_compute_service(data_dir="data", registry_root=REGISTRY_DIR, max_workers=DEFAULT_WORKERS):
+    """Process-wide compute service per data directory, shared by all sessions."""
+    with _services_lock:
+        if data_dir not in _services:
+            _services[data_dir] = ComputeService(data_dir, registry_root, max_workers)
+        return _services[data_dir]
@@ -0,0 +1,228 @@
+import os
+
+import pandas as pd
+import numpy as np
+import joblib
+
+from .model_registry import REGISTRY_DIR
+from .instrumentation import instrument
+from .utils import day_numbers, IngestWatermark
+
+ANOMALY_STATE_PATH = os.path.join(REGISTRY_DIR, "cost_anomaly_state.joblib")
+DEFAULT_GROUP_BY = ("Route", "Vehicle_Type")
+METHODS = ("welford", "ewma", "mad")
+GLOBAL_KEY = ("__all__",)
+MAD_TO_STD = 1.4826  # MAD of a normal distribution times this equals its std
+STATE_VERSION = 2  # bump when the saved layout changes; older state is rebuilt
+
+def cost_per_km(df):
+    if "Cost_per_KM" in df.columns:
+        return df["Cost_per_KM"].to_numpy(dtype=np.float64, na_value=np.nan)
+    dist = df["Distance_KM"].to_numpy(dtype=np.float64, na_value=np.nan)
+    cost = df["Total_Cost_INR"].to_numpy(dtype=np.float64, na_value=np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(dist > 0, cost / dist, np.nan)
+
+class CostAnomalyDetector:
+    """
+    Running Cost_per_KM statistics per group (Route x Vehicle_Type by default)
+    plus one global group used as the fallback for thin or unseen groups.
+
+    Three estimates are kept side by side, all updated batch-wise in O(rows):
+      - welford: all-time mean/variance (Welford, batches merged with Chan's formula)
+      - ewma:    time-decayed mean/variance with a half-life in days
+      - mad:     median / MAD over the last `window` orders of the group
+    Scoring is a per-order array lookup of the group's centre and scale.
+    """
+
+    def __init__(self, by=DEFAULT_GROUP_BY, window=256, half_life_days=30.0, min_count=20):
+        self.by = tuple(by)
+        self.window = window
+        self.half_life_days = half_life_days
+        self.min_count = min_count
+        self.keys = []
+        self._codes = {}
+        self.count = np.zeros(0)
+        self.mean = np.zeros(0)
+        self.m2 = np.zeros(0)
+        self.ew_weight = np.zeros(0)
+        self.ew_sum = np.zeros(0)
+        self.ew_sumsq = np.zeros(0)
+        self.ew_day = np.zeros(0, dtype=np.int64)
+        self.buffer = np.full((0, window), np.nan, dtype=np.float32)
+        self.buffer_pos = np.zeros(0, dtype=np.int64)
+        self.median = np.zeros(0)
+        self.mad = np.zeros(0)
+        self.seen = IngestWatermark()
+        self.state_version = STATE_VERSION
+        self._encode_keys([GLOBAL_KEY])
+
+    def _grow(self, n):
+        grow = n - len(self.count)
+        if grow <= 0:
+            return
+        for attr in ["count", "mean", "m2", "ew_weight", "ew_sum", "ew_sumsq", "median", "mad"]:
+            setattr(self, attr, np.concatenate([getattr(self, attr), np.zeros(grow)]))
+        self.ew_day = np.concatenate([self.ew_day, np.full(grow, -1, dtype=np.int64)])
+        self.buffer_pos = np.concatenate([self.buffer_pos, np.zeros(grow, dtype=np.int64)])
+        self.buffer = np.vstack([self.buffer, np.full((grow, self.window), np.nan, dtype=np.float32)])
+
+    def _encode_keys(self, keys, add=True):
+        codes = np.empty(len(keys), dtype=np.int64)
+        for i, key in enumerate(keys):
+            if key not in self._codes and add:
+                self._codes[key] = len(self.keys)
+                self.keys.append(key)
+            codes[i] = self._codes.get(key, -1)
+        self._grow(len(self.keys))
+        return codes
+
+    def _group_codes(self, df, add=True):
+        if not self.by:
+            return np.zeros(len(df), dtype=np.int64)
+        # a grouping column missing from df (e.g. no Vehicle_Type join) acts as one "__na__" level
+        per_col = [pd.factorize(df[c].astype(object).fillna("__na__")) if c in df.columns
+                   else (np.zeros(len(df), dtype=np.int64), np.array(["__na__"], dtype=object)) for c in self.by]
+        combined = np.zeros(len(df), dtype=np.int64)
+        for codes, uniques in per_col:
+            combined = combined * len(uniques) + codes
+        combo_codes, combos = pd.factorize(combined)
+        # decode each distinct combination back into its key tuple
+        keys = []
+        for combo in combos:
+            parts = []
+            for codes, uniques in reversed(per_col):
+                combo, c = divmod(combo, len(uniques))
+                parts.append(uniques[c])
+            keys.append(tuple(reversed(parts)))
+        return self._encode_keys(keys, add=add)[combo_codes] if keys else combo_codes.astype(np.int64)
+
+    def _update_welford(self, g, x, n):
+        nb = np.bincount(g, minlength=n).astype(np.float64)
+        seen = nb > 0
+        mean_b = np.zeros(n)
+        mean_b[seen] = np.bincount(g, weights=x, minlength=n)[seen] / nb[seen]
+        m2_b = np.bincount(g, weights=(x - mean_b[g]) ** 2, minlength=n)
+        na = self.count
+        total = na + nb
+        delta = mean_b - self.mean
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.mean = np.where(seen, self.mean + delta * nb / total, self.mean)
+            self.m2 = np.where(seen, self.m2 + m2_b + delta ** 2 * na * nb / total, self.m2)
+        self.count = total
+
+    def _update_ewma(self, g, x, days, n):
+        ref = self.ew_day.copy()
+        np.maximum.at(ref, g, days)
+        decay = 0.5 ** (np.maximum(ref - self.ew_day, 0) / self.half_life_days)
+        w = 0.5 ** ((ref[g] - days) / self.half_life_days)
+        self.ew_weight = self.ew_weight * decay + np.bincount(g, weights=w, minlength=n)
+        self.ew_sum = self.ew_sum * decay + np.bincount(g, weights=w * x, minlength=n)
+        self.ew_sumsq = self.ew_sumsq * decay + np.bincount(g, weights=w * x * x, minlength=n)
+        self.ew_day = ref
+
+    def _update_window(self, g, x, days, n):
+        order = np.argsort(g * (days.max() + 1) + days, kind="stable")
+        g, x = g[order], x[order]
+        nb = np.bincount(g, minlength=n)
+        starts = np.concatenate([[0], np.cumsum(nb)[:-1]])
+        rank = np.arange(len(g)) - starts[g]
+        keep = rank >= nb[g] - self.window  # only the newest `window` values per group survive
+        slot = (self.buffer_pos[g[keep]] + rank[keep]) % self.window
+        self.buffer[g[keep], slot] = x[keep]
+        self.buffer_pos += nb
+        touched = np.flatnonzero(nb)
+        block = self.buffer[touched].astype(np.float64)
+        med = np.nanmedian(block, axis=1)
+        self.median[touched] = med
+        self.mad[touched] = np.nanmedian(np.abs(block - med[:, None]), axis=1)
+
+    def update(self, df, skip_seen=True):
+        """
+        Fold the orders in df into the running statistics. With `skip_seen`,
+        orders already ingested (see utils.IngestWatermark) are ignored, so
+        re-feeding history is cheap and does not double count. Returns the
+        number of rows ingested.
+        """
+        days = day_numbers(df["Order_Date"]) if "Order_Date" in df.columns else np.full(len(df), -1, dtype=np.int64)
+        ids = df["Order_ID"] if "Order_ID" in df.columns else None
+        mask = self.seen.new_rows(ids, days) if skip_seen else np.ones(len(df), dtype=bool)
+        x = cost_per_km(df)
+        mask &= np.isfinite(x)
+        if not mask.any():
+            return 0
+        g = self._group_codes(df[mask])
+        x, days = x[mask], np.maximum(days[mask], 0)
+        n = len(self.keys)
+        # every order also counts towards the global fallback group (code 0)
+        g = np.concatenate([g, np.zeros(len(g), dtype=np.int64)]) if self.by else g
+        x = np.concatenate([x, x]) if self.by else x
+        days = np.concatenate([days, days]) if self.by else days
+        self._update_welford(g, x, n)
+        self._update_ewma(g, x, days, n)
+        self._update_window(g, x, days, n)
+        return int(mask.sum())
+
+    def stats(self, method="welford"):
+        """(centre, scale, support) arrays over groups for one method."""
+        if method not in METHODS:
+            raise ValueError(f"Unknown method '{method}'; expected one of {METHODS}")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if method == "welford":
+                return self.mean, np.sqrt(self.m2 / (self.count - 1)), self.count
+            if method == "ewma":
+                centre = self.ew_sum / self.ew_weight
+                return centre, np.sqrt(np.maximum(self.ew_sumsq / self.ew_weight - centre ** 2, 0)), self.count
+            return self.median, self.mad * MAD_TO_STD, np.minimum(self.count, self.window)
+
+    def score(self, df, method="welford", threshold=2.0):
+        """
+        Per-order z-scores against the order's group, falling back to the
+        global statistics when the group has fewer than `min_count` orders.
+        Returns (cost_per_km, z, anomaly) arrays; anomaly means z > threshold.
+        """
+        x = cost_per_km(df)
+        centre, scale, support = self.stats(method)
+        g = self._group_codes(df, add=False)
+        thin = (g < 0) | (support[np.maximum(g, 0)] < self.min_count) | ~(scale[np.maximum(g, 0)] > 0)
+        g = np.where(thin, 0, g)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = (x - centre[g]) / scale[g]
+        return x, z, np.nan_to_num(z, nan=-np.inf) > threshold
+
+    def summary(self, method="welford"):
+        centre, scale, support = self.stats(method)
+        keys = pd.DataFrame(self.keys[1:], columns=list(self.by)) if self.by else pd.DataFrame(index=range(0))
+        return keys.assign(Orders=self.count[1:], Centre=centre[1:], Scale=scale[1:], Support=support[1:])
+
+    def save(self, path=ANOMALY_STATE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        joblib.dump(self, tmp)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=ANOMALY_STATE_PATH, **config):
+        """Saved detector if its configuration matches `config`, otherwise a fresh one."""
+        fresh = cls(**config)
+        if not os.path.exists(path):
+            return fresh
+        try:
+            saved = joblib.load(path)
+        except Exception:
+            return fresh
+        config_keys = ["by", "window", "half_life_days", "min_count", "state_version"]
+        same = all(getattr(saved, k, None) == getattr(fresh, k) for k in config_keys)
+        return saved if isinstance(saved, cls) and same else fresh
+
+@instrument()
+def ingest_and_score(df, path=ANOMALY_STATE_PATH, method="welford", threshold=2.0, save=True, **config):
+    """
+    Load the persisted detector, ingest only the orders it has not seen,
+    persist it and return df with Cost_per_KM, Cost_Z and Cost_Anomaly.
+    """
+    detector = CostAnomalyDetector.load(path, **config)
+    if detector.update(df) and save:
+        detector.save(path)
+    x, z, flags = detector.score(df, method, threshold)
+    return df.assign(Cost_per_KM=x, Cost_Z=z, Cost_Anomaly=flags)
@@ -0,0 +1,47 @@
+import pandas as pd
+import numpy as np
+from .instrumentation import instrument
+
+COST_FEATURES = ["Distance_KM","Order_Value_INR"]
+COST_TARGET = "Total_Cost_INR"
+COST_MODEL_PARAMS = {"n_estimators": 100, "random_state": 42}
+
+@instrument()
+def detect_cost_anomalies(df, by=None, method="welford", threshold=2.0, min_count=20):
+    """
+    Flag cost anomalies where cost_per_km > mean + 2*std.
+    With `by` (e.g. ("Route", "Vehicle_Type")) the statistics are per group,
+    falling back to the global ones for groups under `min_count` orders;
+    see cost_anomaly.CostAnomalyDetector for the methods and persistent state.
+    """
+    if by is not None:
+        from .cost_anomaly import CostAnomalyDetector
+        detector = CostAnomalyDetector(by=by, min_count=min_count)
+        detector.update(df, skip_seen=False)
+        x, z, flags = detector.score(df, method, threshold)
+        return df.assign(Cost_per_KM=x, Cost_Z=z, Cost_Anomaly=flags)
+    cost_per_km = df["Cost_per_KM"] if "Cost_per_KM" in df.columns else df["Total_Cost_INR"] / df["Distance_KM"].replace({0:np.nan})
+    mean = cost_per_km.mean(skipna=True)
+    std = cost_per_km.std(skipna=True)
+    return df.assign(Cost_per_KM=cost_per_km, Cost_Anomaly=cost_per_km > (mean + threshold*std))
+
+def train_cost_model(df):
+    """
+    Predict Total_Cost_INR using route and order features.
+    Returns (model, X_test, y_test)
+    """
+    from .training import train_all_models
+    return train_all_models(df, ["cost_model"])["cost_model"]
+
+def cost_feature_importance(model):
+    if model is None:
+        return pd.DataFrame()
+    try:
+        # hist gradient boosting has no impurity importances; training stores permutation ones
+        feats = getattr(model, "feature_importances_", None)
+        if feats is None:
+            feats = model.permutation_importances_
+        names = model.feature_names_in_ if hasattr(model, "feature_names_in_") else [f"f{i}" for i in range(len(feats))]
+        return pd.DataFrame({"feature": names, "importance": feats}).sort_values("importance", ascending=False)
+    except Exception:
+        return pd.DataFrame()
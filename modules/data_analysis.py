@@ -0,0 +1,201 @@
+import pandas as pd
+import numpy as np
+import threading
+import hashlib
+from .instrumentation import instrument
+from .data_loader import source_signature
+from .utils import id_hashes
+
+# Tables left-joined onto orders by Order_ID: (name, suffix for clashing columns, columns kept)
+JOIN_TABLES = [
+    ("delivery_performance", "_perf", None),
+    ("cost_breakdown", "_cost", None),
+    ("routes_distance", "_route", None),
+    ("customer_feedback", "", ["Order_ID","Rating","Issue_Category"]),
+]
+COST_COLS = ["Fuel_Cost","Labor_Cost","Vehicle_Maintenance","Insurance","Packaging_Cost","Technology_Platform_Fee","Other_Overhead"]
+
+# Last enriched build, shared by every Streamlit session in this process
+_metrics_cache = {}
+_metrics_lock = threading.Lock()
+
+def _row_hashes(df):
+    if df.empty:
+        return np.empty(0, dtype=np.uint64)
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+def _table_token(df):
+    """
+    What the cache remembers about one input table: the loader's source
+    signature when the frame still has one (no hashing), else its row hashes.
+    """
+    layout = (len(df), tuple(df.columns), tuple(str(t) for t in df.dtypes))
+    signature = source_signature(df)
+    if signature is not None:
+        return {"layout": layout, "signature": signature}
+    return {"layout": layout, "hashes": _row_hashes(df)}
+
+def _same_table(old, new):
+    if old["layout"] != new["layout"] or ("signature" in old) != ("signature" in new):
+        return False
+    if "signature" in new:
+        return old["signature"]["sha1"] == new["signature"]["sha1"]
+    return np.array_equal(old["hashes"], new["hashes"])
+
+def _kept_rows(old, new):
+    """Rows of the previous input still at the head of the new one, or None if it was not only appended to."""
+    if _same_table(old, new):
+        return old["layout"][0]
+    if old["layout"][1:] != new["layout"][1:] or ("signature" in old) != ("signature" in new):
+        return None
+    if "signature" in new:
+        previous = [old["signature"]["sha1"], old["signature"]["rows"]]
+        return previous[1] if new["signature"].get("appended_to") == previous else None
+    n = len(old["hashes"])
+    return n if len(new["hashes"]) >= n and np.array_equal(new["hashes"][:n], old["hashes"]) else None
+
+def _index_side(df, cols=None):
+    if df.empty or "Order_ID" not in df.columns:
+        return pd.DataFrame()
+    if cols is not None:
+        df = df[[c for c in cols if c in df.columns]]
+    return df.set_index("Order_ID")
+
+def _concat_rows(a, b):
+    """Row-wise concat that keeps categorical columns categorical."""
+    for c in a.columns.intersection(b.columns):
+        if isinstance(a[c].dtype, pd.CategoricalDtype) and isinstance(b[c].dtype, pd.CategoricalDtype):
+            cats = a[c].cat.categories.union(b[c].cat.categories)
+            a = a.assign(**{c: a[c].cat.set_categories(cats)})
+            b = b.assign(**{c: b[c].cat.set_categories(cats)})
+    return pd.concat([a, b], ignore_index=True)
+
+def derive_fields(df):
+    """Add the derived metric columns in place using whole-column operations."""
+    # Delivery delay days
+    if {"Promised_Delivery_Days","Actual_Delivery_Days"}.issubset(df.columns):
+        df["Delivery_Delay_Days"] = df["Actual_Delivery_Days"] - df["Promised_Delivery_Days"]
+    else:
+        df["Delivery_Delay_Days"] = np.nan
+
+    # Total cost INR from cost breakdown columns
+    cost_cols = [c for c in COST_COLS if c in df.columns]
+    if cost_cols:
+        df["Total_Cost_INR"] = df[cost_cols].sum(axis=1)
+    else:
+        df["Total_Cost_INR"] = df.get("Delivery_Cost_INR", np.nan)
+
+    # Cost per km (NaN when distance is missing or not positive)
+    if "Distance_KM" in df.columns:
+        dist = df["Distance_KM"]
+        df["Cost_per_KM"] = (df["Total_Cost_INR"] / dist).where(dist > 0)
+    else:
+        df["Cost_per_KM"] = np.nan
+
+    # Delay flag
+    df["Is_Delayed"] = (df["Delivery_Delay_Days"] > 0).astype(int)
+    return df
+
+def _enrich(orders, indexed, fleet):
+    df = orders
+    for name, suffix, _ in JOIN_TABLES:
+        side = indexed[name]
+        if side.empty:
+            continue
+        df = df.join(side, on="Order_ID", how="left", rsuffix=suffix)
+    df = derive_fields(df.reset_index(drop=True))
+
+    # Merge fleet info if Vehicle_ID available
+    if "Vehicle_ID" in df.columns and not fleet.empty:
+        df = df.merge(fleet, on="Vehicle_ID", how="left")
+    return df
+
+def _appended_rows(prev, tokens, tables):
+    """
+    Rows each table had at the previous build, when every table only grew
+    by appended rows, the fleet is unchanged and none of the new side-table
+    rows belongs to an order that was already enriched; else None.
+    """
+    kept = {name: _kept_rows(prev["tokens"][name], token) for name, token in tokens.items()}
+    if any(n is None for n in kept.values()) or not _same_table(prev["tokens"]["vehicle_fleet"], tokens["vehicle_fleet"]):
+        return None
+    old_keys = prev["order_keys"]
+    for name, _, _ in JOIN_TABLES:
+        new_rows = tables[name].iloc[kept[name]:]
+        if new_rows.empty or not len(old_keys):
+            continue
+        # membership on sorted uint64 id hashes: isin on string ids is far slower at this size
+        keys = id_hashes(new_rows["Order_ID"])
+        pos = np.minimum(np.searchsorted(old_keys, keys), len(old_keys) - 1)
+        if (old_keys[pos] == keys).any():
+            return None
+    return kept
+
+@instrument()
+def prepare_metrics(data_dict, use_cache=True):
+    """
+    Merge orders + delivery + cost + routes + feedback into a single dataframe.
+    Uses your column names: Order_ID, Distance_KM, etc.
+    The result is memoized per process; when the inputs only gained appended
+    orders, just the new rows are joined and derived. Unmodified frames from
+    load_table are recognised by their source signature, others by row hashes.
+    """
+    names = [n for n, _, _ in JOIN_TABLES] + ["orders", "vehicle_fleet"]
+    tables = {n: data_dict.get(n, pd.DataFrame()) for n in names}
+    fleet = tables["vehicle_fleet"]
+    if not use_cache:
+        indexed = {n: _index_side(tables[n], cols) for n, _, cols in JOIN_TABLES}
+        return _enrich(tables["orders"], indexed, fleet)
+
+    tokens = {n: _table_token(df) for n, df in tables.items()}
+    with _metrics_lock:
+        prev = _metrics_cache.get("state")
+        if prev is not None and all(_same_table(prev["tokens"][n], t) for n, t in tokens.items()):
+            return prev["enriched"].copy(deep=False)
+
+        kept = _appended_rows(prev, tokens, tables) if prev is not None else None
+        has_ids = "Order_ID" in tables["orders"].columns
+        if kept is not None:
+            indexed = {}
+            for n, _, cols in JOIN_TABLES:
+                new_side = _index_side(tables[n].iloc[kept[n]:], cols)
+                indexed[n] = prev["indexed"][n] if new_side.empty else pd.concat([prev["indexed"][n], new_side])
+            new_orders = tables["orders"].iloc[kept["orders"]:]
+            enriched = _concat_rows(prev["enriched"], _enrich(new_orders, indexed, fleet))
+            new_keys = id_hashes(new_orders["Order_ID"]) if has_ids else np.empty(0, dtype=np.uint64)
+            order_keys = np.sort(np.concatenate([prev["order_keys"], new_keys]))
+        else:
+            indexed = {n: _index_side(tables[n], cols) for n, _, cols in JOIN_TABLES}
+            enriched = _enrich(tables["orders"], indexed, fleet)
+            order_keys = np.sort(id_hashes(tables["orders"]["Order_ID"])) if has_ids else np.empty(0, dtype=np.uint64)
+
+        digest = hashlib.sha1()
+        for n in names:
+            token = tokens[n]
+            digest.update(repr((n, token["layout"], token.get("signature", {}).get("sha1"))).encode())
+            if "hashes" in token:
+                digest.update(token["hashes"].tobytes())
+        _metrics_cache["state"] = {
+            "tokens": tokens, "indexed": indexed, "enriched": enriched,
+            "order_keys": order_keys, "version": digest.hexdigest(),
+        }
+        return enriched.copy(deep=False)
+
+def metrics_version():
+    """Content hash of the inputs behind the last cached prepare_metrics build."""
+    state = _metrics_cache.get("state")
+    return state["version"] if state else None
+
+def clear_metrics_cache():
+    with _metrics_lock:
+        _metrics_cache.clear()
+
+@instrument()
+def compute_kpis(df):
+    kpis = {}
+    kpis["avg_delay_days"] = df["Delivery_Delay_Days"].mean(skipna=True)
+    kpis["on_time_rate_pct"] = (1 - df["Is_Delayed"].mean(skipna=True)) * 100 if "Is_Delayed" in df else None
+    kpis["avg_cost_per_order"] = df["Total_Cost_INR"].mean(skipna=True)
+    kpis["avg_cost_per_km"] = df["Cost_per_KM"].mean(skipna=True)
+    kpis["avg_customer_rating"] = df["Rating"].mean(skipna=True) if "Rating" in df else None
+    return kpis
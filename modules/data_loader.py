@@ -0,0 +1,296 @@
+import pandas as pd
+import os
+import json
+import hashlib
+import logging
+import weakref
+from .instrumentation import instrument
+
+logger = logging.getLogger("nexgen.data")
+
+FILES = {
+    "cost_breakdown": "cost_breakdown.csv",
+    "customer_feedback": "customer_feedback.csv",
+    "delivery_performance": "delivery_performance.csv",
+    "orders": "orders.csv",
+    "routes_distance": "routes_distance.csv",
+    "vehicle_fleet": "vehicle_fleet.csv",
+    "warehouse_inventory": "warehouse_inventory.csv"
+}
+
+# Typed schema per table: dtypes for read_csv plus the date columns to parse.
+# Low-cardinality text columns are categoricals, money columns are float32.
+SCHEMAS = {
+    "cost_breakdown": {
+        "dtypes": {
+            "Order_ID": "string",
+            "Fuel_Cost": "float32", "Labor_Cost": "float32", "Vehicle_Maintenance": "float32",
+            "Insurance": "float32", "Packaging_Cost": "float32",
+            "Technology_Platform_Fee": "float32", "Other_Overhead": "float32"
+        },
+        "dates": []
+    },
+    "customer_feedback": {
+        "dtypes": {
+            "Order_ID": "string", "Rating": "float32", "Feedback_Text": "string",
+            "Would_Recommend": "category", "Issue_Category": "category"
+        },
+        "dates": ["Feedback_Date"]
+    },
+    "delivery_performance": {
+        "dtypes": {
+            "Order_ID": "string", "Carrier": "category",
+            "Promised_Delivery_Days": "float32", "Actual_Delivery_Days": "float32",
+            "Delivery_Status": "category", "Quality_Issue": "category",
+            "Customer_Rating": "float32", "Delivery_Cost_INR": "float32"
+        },
+        "dates": []
+    },
+    "orders": {
+        "dtypes": {
+            "Order_ID": "string", "Customer_Segment": "category", "Priority": "category",
+            "Product_Category": "category", "Order_Value_INR": "float32",
+            "Origin": "category", "Destination": "category", "Special_Handling": "category"
+        },
+        "dates": ["Order_Date"]
+    },
+    "routes_distance": {
+        "dtypes": {
+            "Order_ID": "string", "Route": "category", "Distance_KM": "float32",
+            "Fuel_Consumption_L": "float32", "Toll_Charges_INR": "float32",
+            "Traffic_Delay_Minutes": "float32", "Weather_Impact": "category"
+        },
+        "dates": []
+    },
+    "vehicle_fleet": {
+        "dtypes": {
+            "Vehicle_ID": "string", "Vehicle_Type": "category", "Capacity_KG": "float32",
+            "Fuel_Efficiency_KM_per_L": "float32", "Current_Location": "category",
+            "Status": "category", "Age_Years": "float32", "CO2_Emissions_Kg_per_KM": "float32"
+        },
+        "dates": []
+    },
+    "warehouse_inventory": {
+        "dtypes": {
+            "Warehouse_ID": "string", "Location": "category", "Product_Category": "category",
+            "Current_Stock_Units": "float32", "Reorder_Level": "float32",
+            "Storage_Cost_per_Unit": "float32"
+        },
+        "dates": ["Last_Restocked_Date"]
+    }
+}
+
+CACHE_DIRNAME = ".cache"
+MANIFEST_NAME = "manifest.json"
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional, fall back to parsing the CSVs
+    pq = None
+
+def _coerce(df, dtypes):
+    """Cast column by column; values that do not parse as numbers become NaN."""
+    bad = {}
+    for c, t in dtypes.items():
+        if t in ("string", "category"):
+            df[c] = df[c].astype(t)
+            continue
+        values = pd.to_numeric(df[c], errors="coerce")
+        lost = int((values.isna() & df[c].notna()).sum())
+        if lost:
+            bad[c] = lost
+        df[c] = values.astype(t)
+    return df, bad
+
+def _read_csv_safe(path, schema=None):
+    try:
+        if schema is None:
+            return pd.read_csv(path)
+        header = pd.read_csv(path, nrows=0).columns
+        dtypes = {c: t for c, t in schema["dtypes"].items() if c in header}
+        dates = [c for c in schema["dates"] if c in header]
+        try:
+            df = pd.read_csv(path, dtype=dtypes)
+        except (ValueError, TypeError):
+            # one malformed value fails the typed parse; read untyped and coerce per column instead
+            df, bad = _coerce(pd.read_csv(path, dtype={c: "string" for c in dtypes if dtypes[c] == "string"}), dtypes)
+            logger.warning("%s: values that are not numbers were set to NaN: %s", path, bad)
+        for c in dates:
+            df[c] = pd.to_datetime(df[c], errors="coerce")
+    except Exception:
+        logger.exception("%s could not be read; continuing with an empty table", path)
+        df = pd.DataFrame()
+    return df
+
+def _file_hash(path, prefix_size=None, block_size=1 << 20):
+    """
+    sha1 of the file, plus the sha1 of its first `prefix_size` bytes when those
+    end on a line break (None otherwise), both in one pass.
+    """
+    h = hashlib.sha1()
+    prefix = None
+    pos = 0
+    last = b""
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            if prefix_size is not None and pos <= prefix_size <= pos + len(block):
+                cut = prefix_size - pos
+                h.update(block[:cut])
+                if (block[:cut][-1:] or last) == b"\n":
+                    prefix = h.copy().hexdigest()
+                h.update(block[cut:])
+                prefix_size = None
+            else:
+                h.update(block)
+            pos += len(block)
+            last = block[-1:]
+    return h.hexdigest(), prefix
+
+def _describe(path, previous=None):
+    """
+    Manifest entry for the CSV. When it only grew by whole lines since the
+    `previous` entry, "appended_to" records that entry's (sha1, rows).
+    """
+    st = os.stat(path)
+    grew = bool(previous) and previous.get("rows") is not None and previous.get("size", st.st_size) < st.st_size
+    digest, prefix = _file_hash(path, previous["size"] if grew else None)
+    entry = {"mtime": st.st_mtime, "size": st.st_size, "sha1": digest}
+    if grew and prefix == previous.get("sha1"):
+        entry["appended_to"] = [previous["sha1"], previous["rows"]]
+    return entry
+
+def _load_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_manifest(cache_dir, manifest):
+    tmp = os.path.join(cache_dir, MANIFEST_NAME + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(cache_dir, MANIFEST_NAME))
+
+def _cache_is_fresh(entry, path, cache_path):
+    """
+    Cheap check on mtime/size first; only hash the CSV when its stat changed,
+    so touching a file without editing it does not force a rebuild.
+    """
+    if not entry or not os.path.exists(cache_path):
+        return False, None
+    st = os.stat(path)
+    if entry.get("mtime") == st.st_mtime and entry.get("size") == st.st_size:
+        return True, entry
+    described = _describe(path, entry)
+    if described["sha1"] == entry.get("sha1"):
+        return True, {**entry, "mtime": st.st_mtime, "size": st.st_size}
+    return False, described
+
+def _read_parquet(cache_path, columns=None):
+    table = pq.read_table(cache_path, columns=columns, memory_map=True)
+    return table.to_pandas()
+
+# Frames returned from the Parquet cache, by id(): (weakref, guard, layout, signature)
+_signatures = {}
+
+def _layout(df):
+    return tuple(id(b.values) for b in df._mgr.blocks), id(df.index), tuple(df.columns)
+
+def _remember(df, name, entry):
+    key = id(df)
+    def forget(ref):
+        if _signatures.get(key, (None,))[0] is ref:
+            _signatures.pop(key, None)
+    # the shallow copy shares df's arrays, so copy-on-write gives any in-place edit of df new ones
+    signature = {"table": name, "sha1": entry["sha1"], "rows": len(df)}
+    if "appended_to" in entry:
+        signature["appended_to"] = list(entry["appended_to"])
+    _signatures[key] = (weakref.ref(df, forget), df.copy(deep=False), _layout(df), signature)
+
+def source_signature(df):
+    """
+    Signature (table, sha1 of the source CSV, rows) of a frame load_table
+    returned, or None. "appended_to" holds the (sha1, rows) of the previous
+    version of the CSV when that is a line-for-line prefix of this one.
+    The signature only holds for that exact object while unmodified:
+    copies, slices and derived frames have none, and the frame loses it on
+    any in-place edit or column rename. Frames read with use_cache=False (or
+    without pyarrow) have none either.
+    """
+    entry = _signatures.get(id(df))
+    if entry is None or entry[0]() is not df or _layout(df) != entry[2]:
+        return None
+    return dict(entry[3])
+
+@instrument()
+def load_table(name, data_dir="data", columns=None, use_cache=True):
+    """
+    Load one table with its typed schema.
+    When pyarrow is available the parsed table is cached as Parquet under
+    data/.cache and re-read (memory-mapped) until the CSV changes.
+    `columns` restricts the load to the listed columns.
+    """
+    path = os.path.join(data_dir, FILES[name])
+    schema = SCHEMAS.get(name)
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    if not use_cache or pq is None:
+        df = _read_csv_safe(path, schema)
+        return df[[c for c in columns if c in df.columns]] if columns is not None else df
+
+    cache_dir = os.path.join(data_dir, CACHE_DIRNAME)
+    cache_path = os.path.join(cache_dir, name + ".parquet")
+    manifest = _load_manifest(cache_dir)
+    fresh, entry = _cache_is_fresh(manifest.get(name), path, cache_path)
+    if not fresh:
+        entry = entry or _describe(path)
+        df = _read_csv_safe(path, schema)
+        if df.empty:
+            return df
+        os.makedirs(cache_dir, exist_ok=True)
+        # write aside and swap in, so a crash never leaves a truncated file the manifest calls fresh
+        tmp = cache_path + ".tmp"
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, cache_path)
+        entry["rows"] = len(df)
+    if manifest.get(name) != entry:
+        manifest[name] = entry
+        _save_manifest(cache_dir, manifest)
+    if columns is not None:
+        available = pq.read_schema(cache_path).names
+        df = _read_parquet(cache_path, [c for c in columns if c in available])
+    else:
+        df = _read_parquet(cache_path)
+    _remember(df, name, entry)
+    return df
+
+def iter_table_chunks(name, data_dir="data", chunksize=200_000, columns=None):
+    """
+    Yield one table in typed chunks of `chunksize` rows straight from the CSV,
+    without materializing the whole table. `columns` restricts the parse.
+    """
+    path = os.path.join(data_dir, FILES[name])
+    if not os.path.exists(path):
+        return
+    schema = SCHEMAS.get(name, {"dtypes": {}, "dates": []})
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [c for c in header if columns is None or c in columns]
+    dtypes = {c: t for c, t in schema["dtypes"].items() if c in usecols}
+    dates = [c for c in schema["dates"] if c in usecols]
+    for chunk in pd.read_csv(path, usecols=usecols, dtype=dtypes, chunksize=chunksize):
+        for c in dates:
+            chunk[c] = pd.to_datetime(chunk[c], errors="coerce")
+        yield chunk
+
+@instrument()
+def load_all_data(data_dir="data", columns=None, use_cache=True):
+    """
+    Load all seven tables as a dict of DataFrames.
+    `columns` optionally maps table name -> list of columns to project.
+    """
+    columns = columns or {}
+    data = {}
+    for key in FILES:
+        data[key] = load_table(key, data_dir, columns=columns.get(key), use_cache=use_cache)
+    return data
@@ -0,0 +1,36 @@
+import pandas as pd
+import numpy as np
+
+DELAY_FEATURES = ["Promised_Delivery_Days","Distance_KM"]
+DELAY_TARGET = "Delivery_Delay_Days"
+DELAY_CLF_FEATURES = ["Distance_KM","Total_Cost_INR","Traffic_Delay_Minutes"]
+DELAY_CLF_TARGET = "Is_Delayed"
+DELAY_MODEL_PARAMS = {"n_estimators": 100, "random_state": 42}
+
+def train_delay_model(df):
+    """
+    Regression model predicting delay days (numeric). Returns trained regressor and test sets.
+    """
+    from .training import train_all_models
+    return train_all_models(df, ["delay_model"])["delay_model"][0]
+
+def train_delay_classifier(df):
+    """
+    Classifier: Delayed (1) vs On-time (0).
+    Returns (clf, X_test, y_test)
+    """
+    from .training import train_all_models
+    return train_all_models(df, ["delay_classifier"])["delay_classifier"]
+
+def delay_feature_importance(clf):
+    if clf is None:
+        return pd.DataFrame()
+    try:
+        # hist gradient boosting has no impurity importances; training stores permutation ones
+        feats = getattr(clf, "feature_importances_", None)
+        if feats is None:
+            feats = clf.permutation_importances_
+        names = clf.feature_names_in_ if hasattr(clf, "feature_names_in_") else [f"f{i}" for i in range(len(feats))]
+        return pd.DataFrame({"feature": names, "importance": feats}).sort_values("importance", ascending=False)
+    except Exception:
+        return pd.DataFrame()
@@ -0,0 +1,222 @@
+import hashlib
+import importlib.util
+import io
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import numpy as np
+
+from .utils import day_numbers, IngestWatermark
+from .data_loader import source_signature
+from .instrumentation import instrument
+
+TOKEN_PATTERN = re.compile(r"\w[\w']*")
+# Rating band -> inclusive rating range
+RATING_BANDS = {"low": (1, 2), "neutral": (3, 3), "high": (4, 5)}
+KEY_COLUMNS = ["Issue_Category", "Rating_Band", "Day"]
+# Columns update() reads; their content decides whether a frame was seen already
+SOURCE_COLUMNS = ["Order_ID", "Feedback_Date", "Feedback_Text", "Issue_Category", "Rating"]
+IMAGE_CACHE_SIZE = 16
+
+_stopwords = None
+
+def _stop():
+    # Read wordcloud's stopword list straight from the package data: importing
+    # wordcloud pulls in matplotlib, which only the rendered cloud needs
+    global _stopwords
+    if _stopwords is None:
+        spec = importlib.util.find_spec("wordcloud")
+        path = os.path.join(spec.submodule_search_locations[0], "stopwords") if spec else None
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as fh:
+                words = fh.read().split()
+        else:
+            from wordcloud import STOPWORDS as words
+        _stopwords = frozenset(w.lower() for w in words)
+    return _stopwords
+
+def tokenize(text):
+    """Lowercase word tokens as WordCloud splits them: no 's, digits or stopwords."""
+    words = (w[:-2] if w.lower().endswith("'s") else w for w in TOKEN_PATTERN.findall(text))
+    stop = _stop()
+    return [w.lower() for w in words if w and not w.isdigit() and w.lower() not in stop]
+
+def fold_plurals(terms):
+    """
+    Map each term to its singular the way WordCloud's normalize_plurals does:
+    "xs" becomes "x" when "x" is among the terms too (not for "...ss").
+    """
+    present = set(terms)
+    return [t[:-1] if t.endswith("s") and not t.endswith("ss") and t[:-1] in present else t for t in terms]
+
+def content_signature(df):
+    """Signature of the feedback columns update() reads: the loader's when it has one, else a content hash."""
+    signature = source_signature(df)
+    if signature is not None:
+        return signature["sha1"], signature["rows"]
+    cols = [c for c in SOURCE_COLUMNS if c in df.columns]
+    digest = hashlib.sha1(repr(cols).encode())
+    if cols and len(df):
+        digest.update(pd.util.hash_pandas_object(df[cols], index=False).to_numpy().tobytes())
+    return digest.hexdigest(), len(df)
+
+def rating_band(ratings):
+    ratings = pd.Series(ratings).to_numpy(dtype=np.float64, na_value=np.nan)
+    bands = np.full(len(ratings), "unrated", dtype=object)
+    for band, (lo, hi) in RATING_BANDS.items():
+        bands[(ratings >= lo) & (ratings <= hi)] = band
+    return bands
+
+class FeedbackIndex:
+    """
+    Term counts of Feedback_Text per Issue_Category x rating band x day.
+
+    Each distinct text is tokenized once (texts repeat a lot), and update()
+    only folds in feedback rows it has not seen, so reruns and daily loads
+    touch new rows only. Queries sum the sparse count table; word-cloud
+    images are cached per filter key until the counts change.
+
+    Terms are single words with plurals folded as WordCloud does; unlike
+    WordCloud.generate, two-word collocations are not counted, since their
+    scores depend on the whole corpus and cannot be updated row by row.
+    """
+
+    def __init__(self):
+        self.terms = []
+        self._term_ids = {}
+        self._text_terms = {}
+        self.counts = pd.DataFrame({"Issue_Category": pd.Series(dtype=object), "Rating_Band": pd.Series(dtype=object),
+                                    "Day": pd.Series(dtype=np.int64), "term_id": pd.Series(dtype=np.int64),
+                                    "count": pd.Series(dtype=np.int64)})
+        self.rows = 0
+        self.version = 0
+        self.seen = IngestWatermark()
+        self._source = None
+        self._images = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _terms_of(self, text):
+        ids = self._text_terms.get(text)
+        if ids is None:
+            ids = []
+            for term in tokenize(text):
+                if term not in self._term_ids:
+                    self._term_ids[term] = len(self.terms)
+                    self.terms.append(term)
+                ids.append(self._term_ids[term])
+            ids = self._text_terms[text] = np.asarray(ids, dtype=np.int64)
+        return ids
+
+    @instrument("feedback_index.update")
+    def update(self, feedback_df):
+        """Tokenize and count feedback rows not indexed yet; returns how many were added."""
+        with self._lock:
+            source = content_signature(feedback_df)
+            if source == self._source:
+                return 0
+            added = self._ingest(feedback_df)
+            self._source = source
+            return added
+
+    def _ingest(self, df):
+        if df.empty or "Feedback_Text" not in df.columns:
+            return 0
+        days = day_numbers(df["Feedback_Date"]) if "Feedback_Date" in df.columns else np.full(len(df), -1, dtype=np.int64)
+        new = self.seen.new_rows(df["Order_ID"] if "Order_ID" in df.columns else None, days)
+        text = df["Feedback_Text"].to_numpy(dtype=object)
+        new &= pd.notna(text)
+        if not new.any():
+            return 0
+        issue = df["Issue_Category"].astype(object).fillna("None").to_numpy() if "Issue_Category" in df.columns \
+            else np.full(len(df), "None", dtype=object)
+        band = rating_band(df["Rating"]) if "Rating" in df.columns else np.full(len(df), "unrated", dtype=object)
+        rows = pd.DataFrame({"Issue_Category": issue[new], "Rating_Band": band[new], "Day": days[new], "text": text[new]})
+        # count rows per (key, text) first, then expand each distinct text into its terms
+        grouped = rows.groupby(KEY_COLUMNS + ["text"], sort=False).size().reset_index(name="n")
+        term_ids = [self._terms_of(t) for t in grouped["text"]]
+        lengths = np.fromiter((len(t) for t in term_ids), dtype=np.int64, count=len(term_ids))
+        rep = np.repeat(np.arange(len(grouped)), lengths)
+        delta = grouped.drop(columns="text").iloc[rep].assign(
+            term_id=np.concatenate(term_ids) if len(rep) else np.zeros(0, dtype=np.int64),
+            count=grouped["n"].to_numpy()[rep])
+        self.counts = (pd.concat([self.counts, delta.drop(columns="n")], ignore_index=True)
+                       .groupby(KEY_COLUMNS + ["term_id"], as_index=False, sort=False)["count"].sum())
+        self.rows += int(new.sum())
+        self.version += 1
+        self._images.clear()
+        return int(new.sum())
+
+    def _select(self, start_date=None, end_date=None, issue=None, band=None):
+        c = self.counts
+        mask = np.ones(len(c), dtype=bool)
+        if start_date is not None:
+            mask &= c["Day"].to_numpy() >= day_numbers([start_date])[0]
+        if end_date is not None:
+            mask &= c["Day"].to_numpy() <= day_numbers([end_date])[0]
+        if issue not in (None, "All"):
+            mask &= (c["Issue_Category"] == issue).to_numpy()
+        if band not in (None, "All"):
+            mask &= (c["Rating_Band"] == band).to_numpy()
+        return c[mask]
+
+    def term_counts(self, top=None, **filters):
+        """Term frequencies (term, count) for the filter, most frequent first, plurals folded."""
+        with self._lock:
+            sel = self._select(**filters)
+            totals = np.bincount(sel["term_id"].to_numpy(), weights=sel["count"].to_numpy(), minlength=len(self.terms))
+            terms = np.asarray(self.terms, dtype=object)
+        nz = np.flatnonzero(totals)
+        out = pd.DataFrame({"term": fold_plurals(terms[nz]), "count": totals[nz].astype(np.int64)})
+        out = out.groupby("term", as_index=False, sort=False)["count"].sum()
+        out = out.sort_values(["count", "term"], ascending=[False, True], ignore_index=True)
+        return out.head(top) if top else out
+
+    def at_risk_terms(self, top=20, min_count=5, **filters):
+        """
+        Terms over-represented in low-rated feedback: count in the low band,
+        total count and lift = (share among low-rated terms) / (share overall).
+        """
+        low = self.term_counts(**{**filters, "band": "low"}).set_index("term")["count"]
+        allc = self.term_counts(**{**filters, "band": None}).set_index("term")["count"]
+        if low.empty:
+            return pd.DataFrame(columns=["term","low_count","total_count","lift"])
+        out = pd.DataFrame({"low_count": low, "total_count": allc.reindex(low.index)})
+        out["lift"] = (out["low_count"] / low.sum()) / (out["total_count"] / allc.sum())
+        out = out[out["low_count"] >= min_count].sort_values(["lift", "low_count"], ascending=False)
+        return out.head(top).rename_axis("term").reset_index()
+
+    def wordcloud_png(self, width=800, height=300, **filters):
+        """PNG bytes of the word cloud for the filter (None if no terms), cached per filter key."""
+        key = (self.version, width, height, tuple(sorted((k, str(v)) for k, v in filters.items())))
+        with self._lock:
+            if key in self._images:
+                self._images.move_to_end(key)
+                return self._images[key]
+        freqs = self.term_counts(**filters)
+        png = None
+        if not freqs.empty:
+            from wordcloud import WordCloud
+            wc = WordCloud(width=width, height=height, background_color="white")
+            image = wc.generate_from_frequencies(dict(zip(freqs["term"], freqs["count"]))).to_image()
+            buf = io.BytesIO()
+            image.save(buf, format="PNG")
+            png = buf.getvalue()
+        with self._lock:
+            self._images[key] = png
+            while len(self._images) > IMAGE_CACHE_SIZE:
+                self._images.popitem(last=False)
+        return png
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_feedback_index():
+    """Process-wide feedback index shared by all sessions."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = FeedbackIndex()
+        return _index
@@ -0,0 +1,159 @@
+import pandas as pd
+import numpy as np
+import threading
+from .instrumentation import instrument
+
+# Dimensions with row-id posting lists and cube keys
+FILTER_DIMS = ["Origin", "Vehicle_Type"]
+
+# Additive KPI partials kept per day x Origin x Vehicle_Type: measure -> source column
+CUBE_MEASURES = {
+    "delay": "Delivery_Delay_Days",
+    "cost": "Total_Cost_INR",
+    "costpkm": "Cost_per_KM",
+    "rating": "Rating",
+    "delayed": "Is_Delayed",
+}
+
+_index_cache = {}
+_index_lock = threading.Lock()
+
+def _day_numbers(df):
+    """Order_Date as int64 days since epoch, NaT mapped to -1 with a validity mask."""
+    dates = pd.to_datetime(df["Order_Date"], errors="coerce")
+    valid = dates.notna().to_numpy()
+    days = dates.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]").astype(np.int64)
+    days[~valid] = -1
+    return days, valid
+
+def _to_day(value):
+    return int(np.datetime64(pd.Timestamp(value).date(), "D").astype(np.int64))
+
+def build_kpi_cube(df, days=None):
+    """
+    Aggregate df into sum/count partials of each KPI per day x Origin x Vehicle_Type.
+    Rows without a date keep day -1 so unfiltered roll-ups still see them.
+    """
+    if days is None:
+        days, _ = _day_numbers(df)
+    keys = {"day": days}
+    for dim in FILTER_DIMS:
+        if dim in df.columns:
+            keys[dim] = df[dim].to_numpy()
+    frame = pd.DataFrame(keys)
+    aggs = {}
+    for name, col in CUBE_MEASURES.items():
+        if col in df.columns:
+            frame[name] = df[col].to_numpy(dtype="float64", na_value=np.nan)
+            aggs[name + "_sum"] = (name, "sum")
+            aggs[name + "_count"] = (name, "count")
+    aggs["rows"] = ("day", "size")
+    return frame.groupby(list(keys), dropna=False, observed=True).agg(**aggs).reset_index()
+
+@instrument()
+def build_filter_index(df):
+    """
+    Precompute everything the sidebar filters need:
+    - a date-sorted row order for range lookups,
+    - per-Origin / per-Vehicle_Type row-id lists,
+    - the KPI cube used for roll-ups.
+    """
+    days, valid = _day_numbers(df)
+    dated_rows = np.flatnonzero(valid)
+    order = dated_rows[np.argsort(days[dated_rows], kind="stable")]
+    postings = {}
+    for dim in FILTER_DIMS:
+        if dim in df.columns:
+            codes, uniques = pd.factorize(df[dim])
+            rows_by_code = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[rows_by_code], np.arange(len(uniques) + 1))
+            postings[dim] = {
+                value: rows_by_code[bounds[i]:bounds[i + 1]] for i, value in enumerate(uniques)
+            }
+    sorted_days = days[order]
+    return {
+        "n_rows": len(df),
+        "date_order": order,
+        "sorted_days": sorted_days,
+        "date_min": pd.Timestamp(np.datetime64(int(sorted_days[0]), "D")) if len(order) else None,
+        "date_max": pd.Timestamp(np.datetime64(int(sorted_days[-1]), "D")) if len(order) else None,
+        "postings": postings,
+        "cube": build_kpi_cube(df, days),
+    }
+
+def get_filter_index(df, key):
+    """Return the filter index for df, rebuilding only when `key` changes."""
+    with _index_lock:
+        cached = _index_cache.get("index")
+        if cached is None or _index_cache.get("key") != key or key is None:
+            cached = build_filter_index(df)
+            _index_cache.update(key=key, index=cached)
+        return cached
+
+@instrument()
+def filter_rows(index, start_date=None, end_date=None, origin="All", vehicle="All"):
+    """Positional row ids matching the date range (inclusive) and Origin / Vehicle_Type choices."""
+    n = index["n_rows"]
+    mask = np.zeros(n, dtype=bool)
+    if start_date is None and end_date is None:
+        mask[:] = True
+    else:
+        sorted_days = index["sorted_days"]
+        lo = 0 if start_date is None else np.searchsorted(sorted_days, _to_day(start_date), side="left")
+        hi = len(sorted_days) if end_date is None else np.searchsorted(sorted_days, _to_day(end_date), side="right")
+        mask[index["date_order"][lo:hi]] = True
+    for dim, value in (("Origin", origin), ("Vehicle_Type", vehicle)):
+        postings = index["postings"].get(dim)
+        if value in (None, "All") or postings is None:
+            continue
+        selected = np.zeros(n, dtype=bool)
+        selected[postings.get(value, np.empty(0, dtype=np.intp))] = True
+        mask &= selected
+    return np.flatnonzero(mask)
+
+def _cube_slice(cube, start_date=None, end_date=None, origin="All", vehicle="All"):
+    keep = np.ones(len(cube), dtype=bool)
+    if start_date is not None or end_date is not None:
+        day = cube["day"].to_numpy()
+        keep &= day >= 0
+        if start_date is not None:
+            keep &= day >= _to_day(start_date)
+        if end_date is not None:
+            keep &= day <= _to_day(end_date)
+    for dim, value in (("Origin", origin), ("Vehicle_Type", vehicle)):
+        if value not in (None, "All") and dim in cube.columns:
+            keep &= (cube[dim] == value).to_numpy()
+    return cube[keep]
+
+def _ratio(part, name):
+    if name + "_sum" not in part.columns:
+        return None
+    count = part[name + "_count"].sum()
+    return part[name + "_sum"].sum() / count if count else np.nan
+
+@instrument()
+def kpis_from_cube(cube, start_date=None, end_date=None, origin="All", vehicle="All"):
+    """Same KPI dict as data_analysis.compute_kpis, rolled up from the cube."""
+    part = _cube_slice(cube, start_date, end_date, origin, vehicle)
+    kpis = {}
+    kpis["avg_delay_days"] = _ratio(part, "delay")
+    delayed = _ratio(part, "delayed")
+    kpis["on_time_rate_pct"] = (1 - delayed) * 100 if delayed is not None else None
+    kpis["avg_cost_per_order"] = _ratio(part, "cost")
+    kpis["avg_cost_per_km"] = _ratio(part, "costpkm")
+    kpis["avg_customer_rating"] = _ratio(part, "rating")
+    return kpis
+
+@instrument()
+def daily_trend(cube, start_date=None, end_date=None, origin="All", vehicle="All"):
+    """Per-day orders, average delay and on-time rate rolled up from the cube."""
+    part = _cube_slice(cube, start_date, end_date, origin, vehicle)
+    part = part[part["day"] >= 0]
+    cols = [c for c in ["rows", "delay_sum", "delay_count", "delayed_sum", "delayed_count"] if c in part.columns]
+    daily = part.groupby("day")[cols].sum().reset_index()
+    out = pd.DataFrame({"Order_Date": pd.to_datetime(daily["day"].to_numpy(), unit="D"), "Orders": daily["rows"]})
+    if "delay_sum" in daily.columns:
+        out["Avg_Delay_Days"] = daily["delay_sum"] / daily["delay_count"].replace(0, np.nan)
+    if "delayed_sum" in daily.columns:
+        out["On_Time_Rate_Pct"] = (1 - daily["delayed_sum"] / daily["delayed_count"].replace(0, np.nan)) * 100
+    return out
@@ -0,0 +1,225 @@
+import os
+import json
+import time
+import logging
+import weakref
+import functools
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+logger = logging.getLogger("nexgen.perf")
+
+# NEXGEN_PROFILE=1 turns timing on by default, NEXGEN_PROFILE=memory also tracks peak memory
+_DEFAULT_MODE = os.environ.get("NEXGEN_PROFILE", "").lower()
+# Per-thread state: each Streamlit session reruns its script on its own thread
+_local = threading.local()
+
+# tracemalloc is process-wide: it runs while at least one thread has memory
+# tracking on, and its peak is shared, so memory-profiled stages are counted
+# across threads to flag the ones another thread's stage overlapped
+_memory_lock = threading.Lock()
+_memory_users = 0
+_memory_stages = {"active": 0, "started": 0}
+
+class _MemoryHold:
+    """One thread's claim on tracemalloc; released on disable() or when the thread's state is dropped."""
+
+def _release_memory():
+    global _memory_users
+    with _memory_lock:
+        _memory_users -= 1
+        if _memory_users == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+def _set_memory(state, memory):
+    global _memory_users
+    state.memory = memory
+    if memory and state.memory_hold is None:
+        with _memory_lock:
+            _memory_users += 1
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+        state.memory_hold = _MemoryHold()
+        state.memory_release = weakref.finalize(state.memory_hold, _release_memory)
+    elif not memory and state.memory_hold is not None:
+        state.memory_release()
+        state.memory_hold = state.memory_release = None
+
+def _state():
+    if not hasattr(_local, "records"):
+        _local.enabled = _DEFAULT_MODE not in ("", "0", "false")
+        _local.records = []
+        _local.stack = []
+        _local.memory_hold = _local.memory_release = None
+        _local.memory_open = _local.memory_started = 0
+        _set_memory(_local, _DEFAULT_MODE == "memory")
+    return _local
+
+def enable(memory=False):
+    """
+    Start recording stages on this thread; `memory` adds tracemalloc peaks
+    (slower). tracemalloc stops again once no thread tracks memory.
+    """
+    state = _state()
+    state.enabled = True
+    _set_memory(state, memory)
+
+def disable():
+    state = _state()
+    state.enabled = False
+    _set_memory(state, False)
+
+def is_enabled():
+    return _state().enabled
+
+def reset():
+    """Drop the records of the previous run (call at the top of each rerun)."""
+    state = _state()
+    state.records = []
+    state.stack = []
+
+@contextmanager
+def capture(enabled=None, memory=None):
+    """
+    Record stages into a fresh list for the duration of the block, then
+    restore this thread's previous state. Used on worker threads with the
+    caller's settings (see `settings()`); yields the list, to be handed
+    back to the caller and passed to `merge()`.
+    """
+    state = _state()
+    saved = (state.enabled, state.memory, state.records, state.stack)
+    state.enabled = state.enabled if enabled is None else enabled
+    state.memory = state.memory if memory is None else memory
+    state.records, state.stack = [], []
+    try:
+        yield state.records
+    finally:
+        state.enabled, state.memory, state.records, state.stack = saved
+
+def settings():
+    """(enabled, memory) of this thread, for `capture()` on another thread."""
+    state = _state()
+    return state.enabled, state.memory
+
+def merge(captured):
+    """Add records captured on another thread as children of the current stage."""
+    state = _state()
+    if not state.enabled:
+        return
+    depth = len(state.stack)
+    state.records.extend(dict(record, depth=record["depth"] + depth) for record in captured)
+
+def count_rows(obj):
+    """Best-effort row count of a DataFrame/Series, dict of frames or trainer tuple."""
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return len(obj)
+    if isinstance(obj, dict):
+        frames = [v for v in obj.values() if isinstance(v, (pd.DataFrame, pd.Series))]
+        return sum(len(v) for v in frames) if frames else None
+    if isinstance(obj, tuple):
+        for item in obj:
+            if isinstance(item, (pd.DataFrame, pd.Series)):
+                return len(item)
+    if hasattr(obj, "shape") and getattr(obj, "ndim", 0) >= 1:
+        return int(obj.shape[0])
+    return None
+
+@contextmanager
+def stage(name, rows_in=None):
+    """
+    Time a block and record it as one stage. Yields a dict; set
+    `info["rows_out"]` inside the block to record output rows. Any other
+    keys set on it are kept on the record as extra columns.
+    Does nothing (beyond the yield) when instrumentation is disabled.
+
+    `peak_mb` is the process-wide tracemalloc peak over the block, above
+    the memory in use when it started. Another thread's profiled stage
+    resets that peak too, so `peak_shared` marks stages that overlapped one
+    (including workers the stage waited on); their peaks are approximate.
+    """
+    state = _state()
+    info = {"rows_out": None}
+    if not state.enabled:
+        yield info
+        return
+    tracing = state.memory and tracemalloc.is_tracing()
+    if tracing:
+        with _memory_lock:
+            shared = _memory_stages["active"] > state.memory_open
+            started = _memory_stages["started"] - state.memory_started
+            _memory_stages["active"] += 1
+            _memory_stages["started"] += 1
+        state.memory_open += 1
+        state.memory_started += 1
+        mem_start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    record = {"stage": name, "depth": len(state.stack), "rows_in": rows_in, "child_peak": 0}
+    state.stack.append(record)
+    start = time.perf_counter()
+    try:
+        yield info
+    finally:
+        record["seconds"] = round(time.perf_counter() - start, 6)
+        state.stack.pop()
+        record.update(info)
+        peak = None
+        record["peak_mb"] = record["peak_shared"] = None
+        if tracing:
+            with _memory_lock:
+                _memory_stages["active"] -= 1
+                shared = shared or _memory_stages["started"] - state.memory_started != started
+            state.memory_open -= 1
+            if tracemalloc.is_tracing():
+                # a nested stage resets the peak, so fold in the peaks it reported
+                peak = max(tracemalloc.get_traced_memory()[1], record["child_peak"])
+                record["peak_mb"] = round(max(peak - mem_start, 0) / 1e6, 3)
+                record["peak_shared"] = shared
+                if state.stack:
+                    state.stack[-1]["child_peak"] = max(state.stack[-1]["child_peak"], peak)
+        del record["child_peak"]
+        record["thread"] = threading.current_thread().name
+        state.records.append(record)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(json.dumps(record, default=str))
+
+def instrument(name=None):
+    """
+    Decorator recording wall time, rows in/out and (optionally) peak memory
+    of each call. Rows in come from the first argument. When disabled the
+    wrapper only checks a flag and calls straight through.
+    """
+    def decorator(fn):
+        label = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _state().enabled:
+                return fn(*args, **kwargs)
+            with stage(label, rows_in=count_rows(args[0]) if args else None) as info:
+                result = fn(*args, **kwargs)
+                info["rows_out"] = count_rows(result)
+            return result
+        return wrapper
+    return decorator
+
+def records():
+    """Stages recorded on this thread since the last reset(), in completion order."""
+    return list(_state().records)
+
+def records_frame():
+    rows = records()
+    cols = ["stage", "depth", "seconds", "rows_in", "rows_out", "peak_mb", "peak_shared", "thread"]
+    extra = sorted({key for record in rows for key in record} - set(cols))
+    return pd.DataFrame(rows, columns=cols + extra)
+
+def export_json(path=None):
+    """Records as a JSON string; also written to `path` when given."""
+    payload = json.dumps({"generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "stages": records()},
+                         indent=2, default=str)
+    if path:
+        with open(path, "w") as f:
+            f.write(payload)
+    return payload
@@ -0,0 +1,289 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import joblib
+
+from . import instrumentation
+
+REGISTRY_DIR = "models"
+# Persisted models kept per name; older keys are deleted after each save
+MODEL_RETENTION = 3
+# Pin label for models fitted on the whole dataset (what batch scoring uses)
+FULL_DATA_PIN = "full"
+
+def data_fingerprint(df, columns):
+    """Content hash of the columns a model is trained on."""
+    cols = [c for c in columns if c in df.columns]
+    h = hashlib.sha1(json.dumps(cols).encode())
+    if cols and not df.empty:
+        h.update(pd.util.hash_pandas_object(df[cols], index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+def model_key(name, fingerprint, features, params, parent=None):
+    """
+    Registry key of a fit. A warm-started model also hashes the key of the
+    model it grew from (`parent`), so it never shares a key with a fresh fit.
+    """
+    payload = {"name": name, "data": fingerprint, "features": list(features), "params": params}
+    if parent is not None:
+        payload["parent"] = parent
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+def _model_of(result):
+    """Trainers return either the model or a (model, X_test, y_test) tuple; older artifacts stored the tuple."""
+    return result[0] if isinstance(result, tuple) else result
+
+def _record_size(model, path):
+    """Set the fit report's model_mb from the persisted joblib file."""
+    report = getattr(model, "fit_report_", None)
+    if isinstance(report, dict):
+        report["model_mb"] = round(os.path.getsize(path) / 1e6, 3)
+    return model
+
+def _test_metrics(model):
+    """The test_* entries of a model's fit report (held-out scores)."""
+    report = getattr(model, "fit_report_", None) or {}
+    return {k: v for k, v in report.items() if k.startswith("test_")}
+
+def _write_json(path, payload):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(payload, f, indent=2, default=str)
+    os.replace(tmp, path)
+
+class ModelRegistry:
+    """
+    Fitted models persisted under `root/<name>/<key>.joblib`, where the key
+    combines the training-data fingerprint, feature list and hyperparameters
+    (and, for warm-started fits, the parent model's key). Only the estimator
+    is stored; its fit report carries the held-out metrics, which are also
+    written to `latest.json`. `latest.json` points at the last good model so it
+    can keep serving while a retrain runs in the background. `pins.json`
+    maps labels such as FULL_DATA_PIN to a key so offline jobs can ask for
+    a specific model rather than whatever was fitted last. Only the `keep`
+    most recently saved keys per model stay on disk, plus pinned ones.
+    """
+
+    def __init__(self, root=REGISTRY_DIR, keep=MODEL_RETENTION):
+        self.root = root
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._serving = {}   # name -> (key, model)
+        self._jobs = {}      # tuple of names -> (keys, Future)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-retrain")
+
+    def _path(self, name, key):
+        return os.path.join(self.root, name, key + ".joblib")
+
+    def load(self, name, key):
+        """The persisted model `key` of `name`, or None."""
+        path = self._path(name, key)
+        if not os.path.exists(path):
+            return None
+        try:
+            return _record_size(_model_of(joblib.load(path)), path)
+        except Exception:
+            return None
+
+    def _save(self, name, key, model, meta):
+        folder = os.path.join(self.root, name)
+        os.makedirs(folder, exist_ok=True)
+        tmp = self._path(name, key) + ".tmp"
+        joblib.dump(model, tmp)
+        os.replace(tmp, self._path(name, key))
+        _record_size(model, self._path(name, key))
+        meta = dict(meta, key=key, metrics=_test_metrics(model), trained_at=time.strftime("%Y-%m-%dT%H:%M:%S"))
+        _write_json(os.path.join(folder, "latest.json"), meta)
+        self.prune(name)
+
+    def prune(self, name, keep=None):
+        """Delete all but the `keep` newest keys of `name` (never the latest or serving one); returns removed keys."""
+        keep = self.keep if keep is None else keep
+        folder = os.path.join(self.root, name)
+        try:
+            files = [f for f in os.listdir(folder) if f.endswith(".joblib")]
+        except OSError:
+            return []
+        files.sort(key=lambda f: os.path.getmtime(os.path.join(folder, f)), reverse=True)
+        with self._lock:
+            serving = self._serving.get(name, (None,))[0]
+        protected = {self.latest_key(name), serving} | set(self._pins(name).values())
+        removed = []
+        for f in files[keep:]:
+            key = f[:-len(".joblib")]
+            if key in protected:
+                continue
+            try:
+                os.remove(os.path.join(folder, f))
+                removed.append(key)
+            except OSError:
+                pass
+        return removed
+
+    def _latest_meta(self, name):
+        try:
+            with open(os.path.join(self.root, name, "latest.json")) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return meta if isinstance(meta, dict) else {}
+
+    def latest_key(self, name):
+        """Key of the last good model of `name` on disk, or None."""
+        return self._latest_meta(name).get("key")
+
+    def _pins(self, name):
+        try:
+            with open(os.path.join(self.root, name, "pins.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def pin(self, name, key, label=FULL_DATA_PIN):
+        """Point `label` at the persisted model `key` of `name`."""
+        if not os.path.exists(self._path(name, key)):
+            raise LookupError(f"No persisted model '{name}' with key '{key}'")
+        with self._lock:
+            pins = self._pins(name)
+            if pins.get(label) == key:
+                return
+            pins[label] = key
+            _write_json(os.path.join(self.root, name, "pins.json"), pins)
+
+    def pinned_key(self, name, label=FULL_DATA_PIN):
+        return self._pins(name).get(label)
+
+    def pinned(self, name, label=FULL_DATA_PIN):
+        """Model pinned as `label` for `name`, or None."""
+        key = self.pinned_key(name, label)
+        return self.load(name, key) if key is not None else None
+
+    def latest(self, name):
+        """Last good model for `name`, from memory or from disk."""
+        with self._lock:
+            if name in self._serving:
+                return self._serving[name][1]
+        key = self.latest_key(name)
+        if key is None:
+            return None
+        model = self.load(name, key)
+        if model is not None:
+            with self._lock:
+                self._serving.setdefault(name, (key, model))
+        return model
+
+    def _train_many(self, names, keys, train_many_fn, df, metas, pin=None):
+        results = train_many_fn(df, list(names))
+        models = {}
+        for name in names:
+            models[name] = model = _model_of(results.get(name))
+            if model is not None:
+                self._save(name, keys[name], model, metas[name])
+                with self._lock:
+                    self._serving[name] = (keys[name], model)
+                if pin:
+                    self.pin(name, keys[name], pin)
+        return models
+
+    def _train_in_background(self, names, keys, train_many_fn, df, metas, pin=None):
+        # nobody collects this thread's stage records, so don't let them pile up
+        with instrumentation.capture():
+            return self._train_many(names, keys, train_many_fn, df, metas, pin)
+
+    def get_or_train_many(self, specs, train_many_fn, df, force=False, background=False, pin=None, parents=None):
+        """
+        Like get_or_train for a group of models fitted together.
+        `specs` maps name -> (features, params) and `train_many_fn(df, names)`
+        returns a dict name -> result for the requested names only, so a
+        single call can fit every stale model at once. Returns name -> model.
+        With `pin`, each model fitted (or found) for exactly this `df` is
+        pinned under that label. `parents` maps name -> key of the model a
+        stale fit grows from (warm start); such fits get their own key, and a
+        parent already fitted on this data and params is served as is.
+        """
+        parents = parents or {}
+        keys, metas, results = {}, {}, {}
+        for name, (features, params) in specs.items():
+            fingerprint = data_fingerprint(df, features)
+            base_key = model_key(name, fingerprint, features, params)
+            parent = parents.get(name)
+            metas[name] = {"name": name, "fingerprint": fingerprint, "features": list(features), "params": params,
+                           "base_key": base_key, "parent": parent}
+            latest = self._latest_meta(name)
+            if parent is not None and not force and latest.get("key") == parent \
+                    and latest.get("base_key", parent) == base_key:
+                keys[name] = parent
+            else:
+                keys[name] = model_key(name, fingerprint, features, params, parent)
+            if force:
+                continue
+            with self._lock:
+                serving = self._serving.get(name)
+            if serving is not None and serving[0] == keys[name]:
+                results[name] = serving[1]
+            else:
+                model = self.load(name, keys[name])
+                if model is None:
+                    continue
+                with self._lock:
+                    self._serving[name] = (keys[name], model)
+                results[name] = model
+            if pin:
+                self.pin(name, keys[name], pin)
+        stale = [name for name in specs if name not in results]
+        if not stale:
+            return results
+
+        last_good = {name: self.latest(name) for name in stale}
+        if background and all(r is not None for r in last_good.values()):
+            job_key = tuple(keys[name] for name in stale)
+            with self._lock:
+                job = self._jobs.get(tuple(stale))
+                if job is None or job[0] != job_key or job[1].done():
+                    future = self._executor.submit(self._train_in_background, stale, keys, train_many_fn, df,
+                                                 metas, pin)
+                    self._jobs[tuple(stale)] = (job_key, future)
+            results.update(last_good)
+            return results
+        results.update(self._train_many(stale, keys, train_many_fn, df, metas, pin))
+        return results
+
+    def get_or_train(self, name, train_fn, df, features, params=None, force=False, background=False):
+        """
+        Return the fitted model for `df`, loading it from disk when a model
+        with the same fingerprint/features/params exists. Otherwise train it;
+        with `background=True` the retrain runs on a worker thread and the
+        last good model is returned meanwhile (if there is one).
+        """
+        results = self.get_or_train_many(
+            {name: (features, params)}, lambda data, names: {name: train_fn(data)},
+            df, force=force, background=background
+        )
+        return results.get(name)
+
+    def is_training(self, name=None):
+        with self._lock:
+            jobs = [j for names, j in self._jobs.items() if name is None or name in names]
+        return any(not future.done() for _, future in jobs)
+
+    def predict(self, name, X):
+        """Serving path: predict with the current model for `name` without training."""
+        model = self.latest(name)
+        if model is None:
+            raise LookupError(f"No trained model registered for '{name}'")
+        return model.predict(X)
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+def get_registry(root=REGISTRY_DIR):
+    """Process-wide registry per root directory, shared by all sessions."""
+    with _registries_lock:
+        if root not in _registries:
+            _registries[root] = ModelRegistry(root)
+        return _registries[root]
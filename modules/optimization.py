@@ -0,0 +1,185 @@
+import pandas as pd
+import numpy as np
+import time
+import warnings
+from .instrumentation import instrument
+from .route_risk import build_route_risk_engine, score_route_risk  # noqa: F401  score_route_risk re-exported
+
+@instrument()
+def compute_route_risk(df, weights=None, normalization="minmax"):
+    """
+    Composite Route Risk = normalized delay factor + cost factor + traffic factor
+    Returns dataframe with Route and Route_Risk score
+    (see route_risk.RouteRiskEngine for other granularities and incremental updates)
+    """
+    grp = build_route_risk_engine(df, granularities=("route",)).scores("route", weights, normalization)
+    if grp.empty:
+        return pd.DataFrame(columns=["Route","Route_Risk"])
+    return grp
+
+# Weights of the assignment benefit: risk served, fuel efficiency and low CO2 per km
+ASSIGNMENT_WEIGHTS = {"risk": 0.5, "fuel": 0.3, "co2": 0.2}
+# Added cost when the vehicle is not currently at the route origin
+LOCATION_PENALTY = 0.25
+# Use the exact linear assignment solver up to this many route x vehicle cells
+EXACT_SOLVER_MAX_CELLS = 2_000_000
+_INFEASIBLE = 1e9
+# Order weight column used for route demand; capacity is only checked when the data has it
+ORDER_WEIGHT_COLUMN = "Weight_KG"
+
+def route_demand(df, weight_col=ORDER_WEIGHT_COLUMN):
+    """
+    Demand_KG per Route: the heaviest day's total order weight, i.e. what one
+    vehicle serving the route must carry. Empty when `df` has no `weight_col`.
+    """
+    if weight_col not in df.columns or "Route" not in df.columns or df.empty:
+        return pd.DataFrame(columns=["Route","Demand_KG"])
+    keys = [df["Route"]]
+    if "Order_Date" in df.columns:
+        keys.append(pd.to_datetime(df["Order_Date"]).dt.normalize())
+    daily = df[weight_col].groupby(keys, observed=True, sort=False).sum()
+    return daily.groupby(level=0, observed=True, sort=False).max().rename("Demand_KG").reset_index()
+
+def _minmax(values):
+    values = np.nan_to_num(np.asarray(values, dtype=np.float64), nan=0.0)
+    span = values.max() - values.min() if len(values) else 0.0
+    return (values - values.min()) / span if span > 0 else np.zeros_like(values)
+
+def _assignable_vehicles(vehicle_df):
+    status = vehicle_df["Status"].astype(str).str.lower() if "Status" in vehicle_df.columns else None
+    if status is None:
+        return vehicle_df
+    v = vehicle_df[status.isin(["available", "active"]).to_numpy()]
+    return v if not v.empty else vehicle_df
+
+def _assignment_inputs(route_risk_df, vehicles, weights):
+    risk = np.nan_to_num(route_risk_df["Route_Risk"].to_numpy(dtype=np.float64, na_value=np.nan), nan=0.0)
+    origin = route_risk_df["Route"].astype(str).str.split("-", n=1).str[0].to_numpy()
+    demand = route_risk_df["Demand_KG"].to_numpy(dtype=np.float64, na_value=0.0) if "Demand_KG" in route_risk_df.columns else np.zeros(len(risk))
+    fuel_eff = vehicles["Fuel_Efficiency_KM_per_L"].to_numpy(dtype=np.float64, na_value=np.nan) if "Fuel_Efficiency_KM_per_L" in vehicles.columns else np.zeros(len(vehicles))
+    co2 = vehicles["CO2_Emissions_Kg_per_KM"].to_numpy(dtype=np.float64, na_value=np.nan) if "CO2_Emissions_Kg_per_KM" in vehicles.columns else np.zeros(len(vehicles))
+    capacity = vehicles["Capacity_KG"].to_numpy(dtype=np.float64, na_value=np.inf) if "Capacity_KG" in vehicles.columns else np.full(len(vehicles), np.inf)
+    location = vehicles["Current_Location"].astype(str).to_numpy() if "Current_Location" in vehicles.columns else np.full(len(vehicles), "")
+    # vehicle quality in [0, 1]: efficient and clean vehicles score high
+    quality = weights["fuel"] * _minmax(fuel_eff) + weights["co2"] * (1 - _minmax(co2))
+    # routes with higher risk gain more from being served, and more from a good vehicle
+    gain = np.maximum(risk, 0) + 1e-6
+    return {"gain": gain, "origin": origin, "demand": demand, "quality": quality,
+            "capacity": capacity, "location": location, "risk_weight": weights["risk"]}
+
+def _cost_rows(inp, rows, location_penalty):
+    """Cost of assigning each vehicle to each route in `rows` (lower is better)."""
+    gain = inp["gain"][rows, None]
+    cost = -gain * (inp["risk_weight"] + inp["quality"][None, :])
+    cost = cost + location_penalty * (inp["location"][None, :] != inp["origin"][rows, None])
+    return np.where(inp["capacity"][None, :] >= inp["demand"][rows, None], cost, _INFEASIBLE)
+
+def _solve_exact(inp, location_penalty):
+    from scipy.optimize import linear_sum_assignment
+    cost = _cost_rows(inp, np.arange(len(inp["gain"])), location_penalty)
+    r, v = linear_sum_assignment(cost)
+    keep = cost[r, v] < _INFEASIBLE
+    r, v = r[keep], v[keep]
+    # optimal, so the objective is its own bound
+    return r, v, cost[r, v], cost[r, v].sum()
+
+def _solve_greedy(inp, location_penalty):
+    """
+    Riskiest routes first, each taking its cheapest feasible free vehicle.
+    Stops once vehicles run out, so the work is O(min(routes, vehicles) x vehicles).
+    The lower bound sums each served route's best cost ignoring vehicle reuse.
+    """
+    n_vehicles = len(inp["quality"])
+    free = np.ones(n_vehicles, dtype=bool)
+    base = inp["risk_weight"] + inp["quality"]
+    routes, vehicles, costs, bounds = [], [], [], []
+    for r in np.argsort(-inp["gain"], kind="stable"):
+        if not free.any():
+            break
+        row = -inp["gain"][r] * base + location_penalty * (inp["location"] != inp["origin"][r])
+        feasible = inp["capacity"] >= inp["demand"][r]
+        if not feasible.any():
+            continue
+        bounds.append(row[feasible].min())
+        row = np.where(feasible & free, row, np.inf)
+        v = int(np.argmin(row))
+        if not np.isfinite(row[v]):
+            bounds.pop()
+            continue
+        free[v] = False
+        routes.append(r)
+        vehicles.append(v)
+        costs.append(row[v])
+    return np.array(routes, dtype=np.intp), np.array(vehicles, dtype=np.intp), np.array(costs), float(np.sum(bounds))
+
+def _capacity_gap(route_risk_df, vehicle_df):
+    """Why vehicle capacity cannot be checked, or None when it can."""
+    if "Demand_KG" not in route_risk_df.columns:
+        return f"routes carry no Demand_KG (orders need a {ORDER_WEIGHT_COLUMN} column, see route_demand)"
+    if "Capacity_KG" not in vehicle_df.columns:
+        return "vehicles carry no Capacity_KG"
+    return None
+
+@instrument()
+def assign_vehicles(route_risk_df, vehicle_df, weights=None, location_penalty=LOCATION_PENALTY,
+                    slots_per_route=1, solver="auto", require_capacity=False):
+    """
+    Match available vehicles to routes: each vehicle fills at most one route
+    slot, must have Capacity_KG >= the route's Demand_KG, and pays
+    `location_penalty` when its Current_Location is not the route origin.
+    Without both columns capacity is not checked: a RuntimeWarning says so,
+    or a ValueError is raised when `require_capacity` is set.
+    Small problems use the exact linear assignment solver, large ones a
+    bounded greedy. Returns (assignments_df, stats) where stats carries the
+    solver, solve time, objective value and a lower bound on it.
+    """
+    weights = dict(ASSIGNMENT_WEIGHTS, **(weights or {}))
+    gap = _capacity_gap(route_risk_df, vehicle_df)
+    stats = {"solver": None, "solve_seconds": 0.0, "objective": 0.0, "lower_bound": 0.0,
+             "routes": len(route_risk_df), "vehicles": 0, "assigned": 0,
+             "capacity_checked": gap is None}
+    if vehicle_df.empty or route_risk_df.empty:
+        return pd.DataFrame(), stats
+    if gap is not None:
+        if require_capacity:
+            raise ValueError(f"Cannot check vehicle capacity: {gap}")
+        warnings.warn(f"Vehicle capacity not checked: {gap}", RuntimeWarning, stacklevel=3)
+    vehicles = _assignable_vehicles(vehicle_df).reset_index(drop=True)
+    routes = route_risk_df.reset_index(drop=True)
+    if slots_per_route > 1:
+        routes = routes.loc[np.repeat(np.arange(len(routes)), slots_per_route)].reset_index(drop=True)
+    stats["vehicles"] = len(vehicles)
+
+    start = time.perf_counter()
+    inp = _assignment_inputs(routes, vehicles, weights)
+    if solver == "auto":
+        solver = "exact" if len(routes) * len(vehicles) <= EXACT_SOLVER_MAX_CELLS else "greedy"
+    solve = _solve_exact if solver == "exact" else _solve_greedy
+    r, v, cost, lower_bound = solve(inp, location_penalty)
+    stats.update(solver=solver, solve_seconds=round(time.perf_counter() - start, 4),
+                 objective=float(cost.sum()), lower_bound=float(lower_bound), assigned=int(len(r)))
+
+    out = pd.DataFrame({
+        "Route": routes["Route"].to_numpy()[r],
+        "Route_Risk": routes["Route_Risk"].to_numpy()[r],
+    })
+    if "Demand_KG" in routes.columns:
+        out["Demand_KG"] = routes["Demand_KG"].to_numpy()[r]
+    for src, dst in [("Vehicle_ID", "Recommended_Vehicle_ID"), ("Vehicle_Type", "Vehicle_Type"),
+                     ("Fuel_Efficiency_KM_per_L", "Vehicle_Fuel_Eff_kmpl"), ("CO2_Emissions_Kg_per_KM", "Vehicle_CO2_kg_per_km"),
+                     ("Capacity_KG", "Vehicle_Capacity_KG"), ("Current_Location", "Vehicle_Location")]:
+        if src in vehicles.columns:
+            out[dst] = vehicles[src].to_numpy()[v]
+    out["Assignment_Cost"] = cost
+    return out.sort_values("Route_Risk", ascending=False).reset_index(drop=True), stats
+
+def recommend_alternatives(route_risk_df, vehicle_df, top_n=20):
+    """
+    For the `top_n` highest-risk routes, recommend one available vehicle each
+    via assign_vehicles (location and one-route-per-vehicle aware; capacity
+    too when route_risk_df carries Demand_KG, see route_demand).
+    """
+    if route_risk_df.empty:
+        return pd.DataFrame()
+    top = route_risk_df.sort_values("Route_Risk", ascending=False).head(top_n)
+    return assign_vehicles(top, vehicle_df)[0]
@@ -0,0 +1,100 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import numpy as np
+
+# Upper bounds on what a chart sends to the browser, whatever the data size
+MAX_SCATTER_POINTS = 5000
+HIST_BINS = 30
+DENSITY_GRID = 64
+PAYLOAD_CACHE_SIZE = 8
+
+_payloads = OrderedDict()
+_payloads_lock = threading.Lock()
+
+def _finite(values):
+    values = pd.Series(values).to_numpy(dtype=np.float64, na_value=np.nan)
+    return values[np.isfinite(values)]
+
+def histogram_frame(values, bins=HIST_BINS, value_range=None):
+    """
+    Pre-binned histogram (NumPy) as a small frame with bin_start, bin_end,
+    bin_mid and count, so the chart carries `bins` rows instead of the data.
+    """
+    values = _finite(values)
+    if not len(values):
+        return pd.DataFrame(columns=["bin_start","bin_end","bin_mid","count"])
+    counts, edges = np.histogram(values, bins=bins, range=value_range)
+    return pd.DataFrame({"bin_start": edges[:-1], "bin_end": edges[1:],
+                         "bin_mid": (edges[:-1] + edges[1:]) / 2, "count": counts})
+
+def _grid_codes(values, grid):
+    lo, hi = np.nanmin(values), np.nanmax(values)
+    if not hi > lo:
+        return np.zeros(len(values), dtype=np.int64)
+    return np.clip(((values - lo) / (hi - lo) * grid).astype(np.int64), 0, grid - 1)
+
+def _cell_cap(counts, max_points):
+    """Largest per-cell cap k with sum(min(counts, k)) <= max_points (at least 1)."""
+    lo, hi = 1, int(counts.max())
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if np.minimum(counts, mid).sum() <= max_points:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+def downsample_scatter(df, x, y, max_points=MAX_SCATTER_POINTS, grid=DENSITY_GRID, seed=0):
+    """
+    Density-aware sample of at most ~max_points rows for an x/y scatter.
+    Rows are bucketed on a grid x grid raster and each cell keeps at most k
+    random rows, k chosen to fit the budget: sparse regions and outliers
+    survive whole, dense cores are thinned. Rows with missing x/y are dropped.
+    """
+    if len(df) <= max_points:
+        return df
+    xs = df[x].to_numpy(dtype=np.float64, na_value=np.nan)
+    ys = df[y].to_numpy(dtype=np.float64, na_value=np.nan)
+    pos = np.flatnonzero(np.isfinite(xs) & np.isfinite(ys))
+    if len(pos) <= max_points:
+        return df.iloc[pos]
+    cells = _grid_codes(xs[pos], grid) * grid + _grid_codes(ys[pos], grid)
+    counts = np.bincount(cells, minlength=grid * grid)
+    cap = _cell_cap(counts, max_points)
+    # random order within each cell, then keep the first `cap` rows of every cell
+    order = np.lexsort((np.random.default_rng(seed).random(len(cells)), cells))
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank = np.arange(len(order)) - starts[cells[order]]
+    keep = np.sort(pos[order[rank < cap]])
+    if len(keep) > max_points:  # more occupied cells than the budget
+        keep = np.sort(np.random.default_rng(seed).choice(keep, max_points, replace=False))
+    return df.iloc[keep]
+
+def frame_fingerprint(df):
+    h = hashlib.sha1(repr((list(df.columns), len(df))).encode())
+    if len(df):
+        h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+def csv_payload(df):
+    """
+    Zero-argument callable producing df as CSV bytes, for st.download_button's
+    deferred `data`: nothing is serialized until someone clicks, and repeat
+    downloads of the same content come from a small LRU cache.
+    """
+    def build():
+        key = frame_fingerprint(df)
+        with _payloads_lock:
+            if key in _payloads:
+                _payloads.move_to_end(key)
+                return _payloads[key]
+        payload = df.to_csv(index=False).encode("utf-8")
+        with _payloads_lock:
+            _payloads[key] = payload
+            while len(_payloads) > PAYLOAD_CACHE_SIZE:
+                _payloads.popitem(last=False)
+        return payload
+    return build
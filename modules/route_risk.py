@@ -0,0 +1,249 @@
+import pandas as pd
+import numpy as np
+
+from .utils import day_numbers, IngestWatermark
+from .instrumentation import instrument
+
+# granularity -> secondary grouping column (None: route only)
+GRANULARITIES = {"route": None, "carrier": "Carrier", "week": "Week", "weather": "Weather_Impact"}
+# output column -> source column, in Route_Risk weight order
+RISK_MEASURES = {"avg_delay": "Delivery_Delay_Days", "avg_costpkm": "Cost_per_KM", "avg_traffic": "Traffic_Delay_Minutes"}
+RISK_WEIGHTS = {"avg_delay": 0.5, "avg_costpkm": 0.3, "avg_traffic": 0.2}
+NORMALIZATIONS = ("minmax", "robust")
+ROBUST_Z_CLIP = 3.0
+MISSING_LABEL = "None"
+
+def _normalize(values, normalization):
+    v = values.to_numpy(dtype=np.float64)
+    if normalization == "minmax":
+        return (v - v.min()) / (v.max() - v.min() + 1e-9)
+    # robust: z-score around the median scaled by MAD, clipped so one outlier
+    # saturates at 1 instead of squeezing every other route towards 0
+    med = np.median(v)
+    scale = 1.4826 * np.median(np.abs(v - med))
+    if not scale > 0:
+        scale = v.std()
+    z = (v - med) / scale if scale > 0 else np.zeros_like(v)
+    return (np.clip(z, -ROBUST_Z_CLIP, ROBUST_Z_CLIP) + ROBUST_Z_CLIP) / (2 * ROBUST_Z_CLIP)
+
+def score_route_risk(grp, weights=None, normalization="minmax", keys=("Route",)):
+    """
+    Composite risk from per-route means (avg_delay, avg_costpkm, avg_traffic).
+    `weights` overrides RISK_WEIGHTS per measure; `normalization` is "minmax"
+    (relative to the set being scored) or "robust" (median/MAD, clipped).
+    """
+    if normalization not in NORMALIZATIONS:
+        raise ValueError(f"Unknown normalization '{normalization}'; expected one of {NORMALIZATIONS}")
+    unknown = set(weights or {}) - set(RISK_WEIGHTS)
+    if unknown:
+        raise ValueError(f"Unknown risk weights {sorted(unknown)}; expected {list(RISK_WEIGHTS)}")
+    weights = {**RISK_WEIGHTS, **(weights or {})}
+    grp = grp.copy()
+    risk = np.zeros(len(grp))
+    for c in RISK_MEASURES:
+        grp[c + "_n"] = _normalize(grp[c], normalization) if len(grp) else np.zeros(0)
+        risk = risk + weights[c] * grp[c + "_n"].to_numpy()
+    grp["Route_Risk"] = risk
+    return grp[list(keys) + ["Route_Risk","avg_delay","avg_costpkm","avg_traffic","count_orders"]]
+
+class _Vocab:
+    """Incremental label -> int code mapping; only distinct values touch Python."""
+
+    def __init__(self):
+        self.labels = []
+        self._codes = {}
+
+    def encode(self, values):
+        values = pd.Series(values)
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+        else:
+            codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        mapping = np.empty(len(uniques), dtype=np.int64)
+        for i, label in enumerate(uniques):
+            if label not in self._codes:
+                self._codes[label] = len(self.labels)
+                self.labels.append(label)
+            mapping[i] = self._codes[label]
+        if not len(mapping):
+            return np.full(len(codes), -1, dtype=np.int64)
+        return np.where(codes >= 0, mapping[np.maximum(codes, 0)], -1)
+
+class _GroupSums:
+    """Running measure sums, row and order counts per (route id, secondary code) pair."""
+
+    def __init__(self):
+        self._slots = {}
+        self.route = np.zeros(0, dtype=np.int64)
+        self.secondary = np.zeros(0, dtype=np.int64)
+        self.sums = np.zeros((0, len(RISK_MEASURES)))
+        self.rows = np.zeros(0, dtype=np.int64)
+        self.orders = np.zeros(0, dtype=np.int64)
+
+    def add(self, route, secondary, values, has_order):
+        inverse, uniq = pd.factorize((route << 32) | secondary)
+        slots = np.empty(len(uniq), dtype=np.int64)
+        new = []
+        for i, key in enumerate(uniq.tolist()):
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._slots[key] = len(self._slots)
+                new.append(key)
+            slots[i] = slot
+        if new:
+            new = np.asarray(new, dtype=np.int64)
+            self.route = np.concatenate([self.route, new >> 32])
+            self.secondary = np.concatenate([self.secondary, new & 0xFFFFFFFF])
+            self.sums = np.vstack([self.sums, np.zeros((len(new), self.sums.shape[1]))])
+            self.rows = np.concatenate([self.rows, np.zeros(len(new), dtype=np.int64)])
+            self.orders = np.concatenate([self.orders, np.zeros(len(new), dtype=np.int64)])
+        idx = slots[inverse]
+        n = len(self._slots)
+        for j in range(values.shape[1]):
+            self.sums[:, j] += np.bincount(idx, weights=values[:, j], minlength=n)
+        self.rows += np.bincount(idx, minlength=n)
+        self.orders += np.bincount(idx, weights=has_order, minlength=n).astype(np.int64)
+
+class RouteRiskEngine:
+    """
+    Route risk at several granularities from one pass over the orders.
+
+    Routes are integer-encoded Origin/Destination pairs; each granularity
+    (route, route x carrier, route x week, route x Weather_Impact) keeps
+    running sums and counts per group, so update() with new orders only adds
+    to them. Scores are computed from the group means on demand and cached
+    until the next update; top_k() uses a partial selection, not a full sort.
+    """
+
+    def __init__(self, granularities=tuple(GRANULARITIES)):
+        unknown = set(granularities) - set(GRANULARITIES)
+        if unknown:
+            raise ValueError(f"Unknown granularities {sorted(unknown)}; expected {list(GRANULARITIES)}")
+        self.granularities = tuple(granularities)
+        self.places = _Vocab()
+        self._route_ids = {}
+        self.route_od = np.zeros((0, 2), dtype=np.int64)
+        self.vocabs = {g: _Vocab() for g in self.granularities if GRANULARITIES[g] not in (None, "Week")}
+        self.groups = {g: _GroupSums() for g in self.granularities}
+        self.seen = IngestWatermark()
+        self.version = 0
+        self._scores = {}
+
+    def _routes(self, df):
+        if {"Origin", "Destination"}.issubset(df.columns):
+            origin, dest = df["Origin"], df["Destination"]
+        else:
+            parts = df["Route"].astype(object).str.split("-", n=1)
+            origin, dest = parts.str[0], parts.str[1]
+        o, d = self.places.encode(origin), self.places.encode(dest)
+        valid = (o >= 0) & (d >= 0)
+        pair = np.where(valid, (o << 32) | np.maximum(d, 0), -1)
+        inverse, uniq = pd.factorize(pair)
+        ids = np.empty(len(uniq), dtype=np.int64)
+        new = []
+        for i, key in enumerate(uniq.tolist()):
+            if key < 0:
+                ids[i] = -1
+                continue
+            if key not in self._route_ids:
+                self._route_ids[key] = len(self._route_ids)
+                new.append((key >> 32, key & 0xFFFFFFFF))
+            ids[i] = self._route_ids[key]
+        if new:
+            self.route_od = np.vstack([self.route_od, np.asarray(new, dtype=np.int64)])
+        return ids[inverse]
+
+    def _secondary(self, granularity, df):
+        col = GRANULARITIES[granularity]
+        if col is None:
+            return np.zeros(len(df), dtype=np.int64)
+        if col == "Week":
+            # Monday-based weeks since the epoch (1970-01-01 was a Thursday)
+            days = day_numbers(df["Order_Date"]) if "Order_Date" in df.columns else np.full(len(df), -1)
+            return np.where(days >= 0, (days + 3) // 7, 0).astype(np.int64)
+        if col not in df.columns:
+            return self.vocabs[granularity].encode(pd.Series(MISSING_LABEL, index=df.index, dtype=object))
+        codes = self.vocabs[granularity].encode(df[col])
+        # missing values (e.g. no weather impact) form their own "None" group
+        return np.where(codes >= 0, codes, self.vocabs[granularity].encode([MISSING_LABEL])[0])
+
+    @instrument("route_risk.update")
+    def update(self, df, skip_seen=False):
+        """
+        Add orders to every granularity; rows need a Route and all three risk
+        measures, as in compute_route_risk. With `skip_seen`, orders already
+        ingested (see utils.IngestWatermark) are ignored. Returns rows added.
+        """
+        needed = ["Route"] + list(RISK_MEASURES.values())
+        if not set(needed) <= set(df.columns):
+            return 0
+        mask = df[needed].notna().all(axis=1).to_numpy()
+        if skip_seen and "Order_Date" in df.columns:
+            ids = df["Order_ID"] if "Order_ID" in df.columns else None
+            mask = mask & self.seen.new_rows(ids, day_numbers(df["Order_Date"]))
+        if not mask.any():
+            return 0
+        df = df[mask]
+        route = self._routes(df)
+        keep = route >= 0
+        values = np.column_stack([df[c].to_numpy(dtype=np.float64, na_value=np.nan) for c in RISK_MEASURES.values()])
+        has_order = df["Order_ID"].notna().to_numpy(dtype=np.float64) if "Order_ID" in df.columns else np.ones(len(df))
+        for g in self.granularities:
+            secondary = self._secondary(g, df)
+            self.groups[g].add(route[keep], secondary[keep], values[keep], has_order[keep])
+        self.version += 1
+        self._scores.clear()
+        return int(keep.sum())
+
+    def _labels(self, granularity, groups):
+        places = np.asarray(self.places.labels, dtype=object)
+        od = self.route_od[groups.route]
+        route = pd.Series(places[od[:, 0]] + "-" + places[od[:, 1]] if len(od) else [], dtype=object)
+        out = pd.DataFrame({"Route": route})
+        col = GRANULARITIES[granularity]
+        if col == "Week":
+            out["Week"] = pd.to_datetime(groups.secondary * 7 - 3, unit="D")
+        elif col is not None:
+            out[col] = np.asarray(self.vocabs[granularity].labels, dtype=object)[groups.secondary] \
+                if len(groups.secondary) else []
+        return out
+
+    def scores(self, granularity="route", weights=None, normalization="minmax", min_orders=1):
+        """
+        Risk per group at `granularity`, sorted by its keys. Groups with fewer
+        than `min_orders` rows are left out before normalizing.
+        """
+        if granularity not in self.groups:
+            raise ValueError(f"Granularity '{granularity}' not tracked; engine has {list(self.groups)}")
+        cache_key = (granularity, tuple(sorted((weights or {}).items())), normalization, min_orders)
+        cached = self._scores.get(cache_key)
+        if cached is not None:
+            return cached
+        groups = self.groups[granularity]
+        keys = ["Route"] + ([GRANULARITIES[granularity]] if GRANULARITIES[granularity] else [])
+        seen = groups.rows >= max(min_orders, 1)
+        means = groups.sums[seen] / groups.rows[seen, None] if seen.any() else np.zeros((0, len(RISK_MEASURES)))
+        grp = self._labels(granularity, groups)[seen].reset_index(drop=True)
+        for j, c in enumerate(RISK_MEASURES):
+            grp[c] = means[:, j]
+        grp["count_orders"] = groups.orders[seen]
+        grp = grp.sort_values(keys, kind="stable").reset_index(drop=True)
+        result = score_route_risk(grp, weights, normalization, keys=keys)
+        self._scores[cache_key] = result
+        return result
+
+    def top_k(self, k=10, granularity="route", **score_args):
+        """The k highest-risk groups, highest first, via argpartition."""
+        scored = self.scores(granularity, **score_args)
+        risk = scored["Route_Risk"].to_numpy()
+        if k < len(risk):
+            idx = np.argpartition(-risk, k - 1)[:k]
+        else:
+            idx = np.arange(len(risk))
+        idx = idx[np.argsort(-risk[idx], kind="stable")]
+        return scored.iloc[idx].reset_index(drop=True)
+
+def build_route_risk_engine(df, granularities=tuple(GRANULARITIES)):
+    engine = RouteRiskEngine(granularities)
+    engine.update(df)
+    return engine
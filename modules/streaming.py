@@ -0,0 +1,339 @@
+import pandas as pd
+import numpy as np
+
+from .data_loader import iter_table_chunks
+from .data_analysis import COST_COLS, JOIN_TABLES
+from .route_risk import score_route_risk
+from .instrumentation import instrument
+from .utils import id_hashes
+
+DEFAULT_CHUNKSIZE = 200_000
+
+# KPI name -> accumulated measure, in compute_kpis terms
+KPI_MEASURES = {
+    "avg_delay_days": "delay",
+    "avg_cost_per_order": "cost",
+    "avg_cost_per_km": "costpkm",
+    "avg_customer_rating": "rating",
+}
+
+def _floats(chunk, col):
+    if col not in chunk.columns:
+        return np.full(len(chunk), np.nan, dtype=np.float32)
+    return chunk[col].to_numpy(dtype=np.float32, na_value=np.nan)
+
+class QuantileSketch:
+    """
+    Mergeable fixed-bin histogram on a signed log1p scale, so the same bins
+    cover small and very large magnitudes (about 1% relative error).
+    """
+
+    def __init__(self, bins=4000, limit=20.0):
+        self.bins = bins
+        self.limit = limit
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.min = np.inf
+        self.max = -np.inf
+
+    def _transform(self, values):
+        return np.sign(values) * np.log1p(np.abs(values))
+
+    def update(self, values):
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        pos = (self._transform(values.astype(np.float64)) + self.limit) / (2 * self.limit) * self.bins
+        self.counts += np.bincount(np.clip(pos.astype(np.int64), 0, self.bins - 1), minlength=self.bins)
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q):
+        total = self.counts.sum()
+        if not total:
+            return np.nan
+        cum = np.cumsum(self.counts)
+        b = int(np.searchsorted(cum, q * total, side="left"))
+        below = cum[b - 1] if b else 0
+        frac = (q * total - below) / self.counts[b] if self.counts[b] else 0.0
+        t = (b + frac) / self.bins * 2 * self.limit - self.limit
+        value = np.sign(t) * np.expm1(np.abs(t))
+        return float(np.clip(value, self.min, self.max))
+
+class KpiAccumulator:
+    """Sums, counts, min/max and quantile sketches behind each compute_kpis value."""
+
+    def __init__(self):
+        self.sums = {m: 0.0 for m in ["delay", "cost", "costpkm", "rating", "delayed"]}
+        self.counts = {m: 0 for m in self.sums}
+        self.sketches = {m: QuantileSketch() for m in ["delay", "cost", "costpkm", "rating"]}
+        self.rows = 0
+
+    def update(self, measures):
+        self.rows += len(measures["delayed"])
+        for m, values in measures.items():
+            if m not in self.sums:
+                continue
+            valid = ~np.isnan(values)
+            self.sums[m] += float(values[valid].sum(dtype=np.float64))
+            self.counts[m] += int(valid.sum())
+            if m in self.sketches:
+                self.sketches[m].update(values)
+
+    def merge(self, other):
+        for m in self.sums:
+            self.sums[m] += other.sums[m]
+            self.counts[m] += other.counts[m]
+        for m in self.sketches:
+            self.sketches[m].merge(other.sketches[m])
+        self.rows += other.rows
+        return self
+
+    def _mean(self, m):
+        return self.sums[m] / self.counts[m] if self.counts[m] else np.nan
+
+    def result(self):
+        kpis = {name: self._mean(m) for name, m in KPI_MEASURES.items()}
+        kpis["on_time_rate_pct"] = (1 - self._mean("delayed")) * 100
+        return {k: kpis[k] for k in ["avg_delay_days","on_time_rate_pct","avg_cost_per_order","avg_cost_per_km","avg_customer_rating"]}
+
+    def summary(self, quantiles=(0.5, 0.9, 0.99)):
+        """Per-measure count, mean, min, max and approximate quantiles."""
+        rows = []
+        for m, sketch in self.sketches.items():
+            row = {"measure": m, "count": self.counts[m], "mean": self._mean(m),
+                   "min": sketch.min if self.counts[m] else np.nan,
+                   "max": sketch.max if self.counts[m] else np.nan}
+            for q in quantiles:
+                row[f"p{int(q * 100)}"] = sketch.quantile(q)
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+class RouteAccumulator:
+    """Per-route sums and counts of the compute_route_risk inputs."""
+
+    def __init__(self):
+        self.names = []
+        self._codes = {}
+        self.sums = np.zeros((0, 3))  # delay, cost per km, traffic
+        self.rows = np.zeros(0, dtype=np.int64)
+        self.counts = np.zeros(0, dtype=np.int64)  # rows with an Order_ID
+
+    def _encode(self, routes):
+        codes, uniques = pd.factorize(routes)
+        mapping = np.empty(len(uniques), dtype=np.int64)
+        for i, name in enumerate(uniques):
+            if name not in self._codes:
+                self._codes[name] = len(self.names)
+                self.names.append(name)
+            mapping[i] = self._codes[name]
+        grow = len(self.names) - len(self.rows)
+        if grow > 0:
+            self.sums = np.vstack([self.sums, np.zeros((grow, 3))])
+            self.rows = np.concatenate([self.rows, np.zeros(grow, dtype=np.int64)])
+            self.counts = np.concatenate([self.counts, np.zeros(grow, dtype=np.int64)])
+        if not len(mapping):
+            return codes.astype(np.int64)
+        return np.where(codes >= 0, mapping[np.maximum(codes, 0)], -1)
+
+    def update(self, routes, delay, costpkm, traffic, has_order_id):
+        codes = self._encode(routes)
+        valid = (codes >= 0) & ~np.isnan(delay) & ~np.isnan(costpkm) & ~np.isnan(traffic)
+        codes = codes[valid]
+        n = len(self.names)
+        for j, values in enumerate([delay, costpkm, traffic]):
+            self.sums[:, j] += np.bincount(codes, weights=values[valid].astype(np.float64), minlength=n)
+        self.rows += np.bincount(codes, minlength=n)
+        self.counts += np.bincount(codes, weights=has_order_id[valid], minlength=n).astype(np.int64)
+
+    def merge(self, other):
+        codes = self._encode(pd.Series(other.names, dtype=object))
+        np.add.at(self.sums, codes, other.sums)
+        np.add.at(self.rows, codes, other.rows)
+        np.add.at(self.counts, codes, other.counts)
+        return self
+
+    def route_risk(self):
+        seen = self.rows > 0
+        if not seen.any():
+            return pd.DataFrame(columns=["Route","Route_Risk"])
+        means = self.sums[seen] / self.rows[seen, None]
+        grp = pd.DataFrame({
+            "Route": np.asarray(self.names, dtype=object)[seen],
+            "avg_delay": means[:, 0], "avg_costpkm": means[:, 1], "avg_traffic": means[:, 2],
+            "count_orders": self.counts[seen],
+        }).sort_values("Route").reset_index(drop=True)
+        return score_route_risk(grp)
+
+def _sorted_lookup(keys, values):
+    """
+    Side-table values sorted by hashed Order_ID (all rows, in file order per
+    id), with each distinct id's first position and row count.
+    """
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    first = np.ones(len(keys), dtype=bool)
+    first[1:] = keys[1:] != keys[:-1]
+    starts = np.flatnonzero(first)
+    return {"keys": keys[first], "starts": starts, "counts": np.diff(np.append(starts, len(keys))),
+            "values": {k: v[order] for k, v in values.items()}}
+
+@instrument()
+def build_order_lookups(data_dir="data", chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Compact per-order lookups from the side tables: only the derived values
+    the KPIs and route risk use, keyed by hashed Order_ID.
+    """
+    lookups = {}
+
+    def _collect(name, columns, extract):
+        keys, parts = [], {}
+        for chunk in iter_table_chunks(name, data_dir, chunksize, columns=["Order_ID"] + columns):
+            keys.append(id_hashes(chunk["Order_ID"]))
+            for k, v in extract(chunk).items():
+                parts.setdefault(k, []).append(v)
+        if keys:
+            lookups[name] = _sorted_lookup(np.concatenate(keys), {k: np.concatenate(v) for k, v in parts.items()})
+
+    _collect("delivery_performance", ["Promised_Delivery_Days","Actual_Delivery_Days","Delivery_Cost_INR"], lambda c: {
+        "delay": _floats(c, "Actual_Delivery_Days") - _floats(c, "Promised_Delivery_Days"),
+        "delivery_cost": _floats(c, "Delivery_Cost_INR"),
+    })
+    cost_cols_seen = []
+
+    def _cost(c):
+        cols = [col for col in COST_COLS if col in c.columns]
+        cost_cols_seen.extend(col for col in cols if col not in cost_cols_seen)
+        total = np.nansum(np.column_stack([_floats(c, col) for col in cols]), axis=1) if cols else np.full(len(c), np.nan)
+        return {"total": total.astype(np.float32)}
+
+    _collect("cost_breakdown", COST_COLS, _cost)
+    lookups["has_cost_cols"] = bool(cost_cols_seen)
+    _collect("routes_distance", ["Route","Distance_KM","Traffic_Delay_Minutes"], lambda c: {
+        "route": c["Route"].astype(object).to_numpy() if "Route" in c.columns else np.full(len(c), None, dtype=object),
+        "distance": _floats(c, "Distance_KM"),
+        "traffic": _floats(c, "Traffic_Delay_Minutes"),
+    })
+    _collect("customer_feedback", ["Rating"], lambda c: {"rating": _floats(c, "Rating")})
+    return lookups
+
+def _match(lookup, keys):
+    """Position of each key's first side row (-1 when absent) and its number of side rows."""
+    sorted_keys = lookup["keys"]
+    if not len(sorted_keys):
+        return np.full(len(keys), -1, dtype=np.int64), np.zeros(len(keys), dtype=np.int64)
+    idx = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+    found = sorted_keys[idx] == keys
+    return np.where(found, lookup["starts"][idx], -1), np.where(found, lookup["counts"][idx], 0)
+
+def _join_positions(keys, lookups):
+    """
+    Left-join the orders with each side table in prepare_metrics' order:
+    an order with k rows in a side table becomes k joined rows, as in the
+    in-memory join. Returns the order row of each joined row and, per side
+    table, the matched side row (-1 for none).
+    """
+    rows = np.arange(len(keys))
+    picks = {}
+    for name, _, _ in JOIN_TABLES:
+        if name not in lookups:
+            continue
+        pos, count = _match(lookups[name], keys[rows])
+        reps = np.maximum(count, 1)
+        if (reps > 1).any():
+            rows = np.repeat(rows, reps)
+            within = np.arange(len(rows)) - np.repeat(np.cumsum(reps) - reps, reps)
+            pos = np.repeat(pos, reps) + within
+            picks = {t: np.repeat(p, reps) for t, p in picks.items()}
+        picks[name] = pos
+    return rows, picks
+
+def _lookup(lookups, picks, n, name, field, fill):
+    if name not in picks:
+        return np.full(n, fill, dtype=object if fill is None else np.float32)
+    pos = picks[name]
+    column = lookups[name]["values"][field]
+    out = np.full(n, fill, dtype=column.dtype)
+    found = pos >= 0
+    out[found] = column[pos[found]]
+    return out
+
+def join_chunk(order_ids, lookups):
+    """
+    Derived KPI measures for one chunk of orders (same rules as prepare_metrics),
+    one entry per joined row: orders with repeated side rows count once per row.
+    """
+    order_ids = np.asarray(order_ids, dtype=object)
+    rows, picks = _join_positions(id_hashes(order_ids), lookups)
+    n = len(rows)
+    delay = _lookup(lookups, picks, n, "delivery_performance", "delay", np.nan)
+    if lookups.get("has_cost_cols"):
+        # prepare_metrics sums the cost columns with skipna, so orders without a cost row cost 0
+        total = _lookup(lookups, picks, n, "cost_breakdown", "total", 0.0)
+    else:
+        total = _lookup(lookups, picks, n, "delivery_performance", "delivery_cost", np.nan)
+    distance = _lookup(lookups, picks, n, "routes_distance", "distance", np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        costpkm = np.where(distance > 0, total / distance, np.nan).astype(np.float32)
+    return {
+        "delay": delay,
+        "cost": total,
+        "costpkm": costpkm,
+        "rating": _lookup(lookups, picks, n, "customer_feedback", "rating", np.nan),
+        "delayed": (delay > 0).astype(np.float32),
+        "route": _lookup(lookups, picks, n, "routes_distance", "route", None),
+        "traffic": _lookup(lookups, picks, n, "routes_distance", "traffic", np.nan),
+        "has_order_id": pd.notna(order_ids[rows]).astype(np.float64),
+    }
+
+@instrument()
+def stream_metrics(data_dir="data", chunksize=DEFAULT_CHUNKSIZE, quantiles=(0.5, 0.9, 0.99)):
+    """
+    Compute KPIs, route risk and per-KPI summaries for data larger than memory.
+    Orders are read in chunks, joined against compact per-order lookups
+    (hashed Order_ID plus a few float32 values per side table) and folded
+    into mergeable accumulators; results match compute_kpis and
+    compute_route_risk on the in-memory path, including orders that have
+    several rows in a side table. "rows" counts joined rows, like
+    len(prepare_metrics(...)).
+    Returns {"kpis", "route_risk", "summary", "rows"}.
+    """
+    lookups = build_order_lookups(data_dir, chunksize)
+    kpi = KpiAccumulator()
+    routes = RouteAccumulator()
+    for chunk in iter_table_chunks("orders", data_dir, chunksize, columns=["Order_ID"]):
+        measures = join_chunk(chunk["Order_ID"].to_numpy(dtype=object, na_value=None), lookups)
+        kpi.update(measures)
+        routes.update(pd.Series(measures["route"], dtype=object), measures["delay"],
+                      measures["costpkm"], measures["traffic"], measures["has_order_id"])
+    return {
+        "kpis": kpi.result(),
+        "route_risk": routes.route_risk(),
+        "summary": kpi.summary(quantiles),
+        "rows": kpi.rows,
+    }
+
+def main(argv=None):
+    import argparse
+    import json
+    parser = argparse.ArgumentParser(description="Compute KPIs and route risk in streaming mode.")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--top", type=int, default=10, help="riskiest routes to print")
+    args = parser.parse_args(argv)
+    result = stream_metrics(args.data_dir, args.chunksize)
+    top = result["route_risk"].sort_values("Route_Risk", ascending=False).head(args.top)
+    print(json.dumps({
+        "rows": result["rows"],
+        "kpis": {k: float(v) for k, v in result["kpis"].items()},
+        "top_routes": top.to_dict(orient="records"),
+        "summary": result["summary"].to_dict(orient="records"),
+    }, indent=2, default=float))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+import os
+import time
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import numpy as np
+
+from .cost_intelligence import COST_FEATURES, COST_TARGET, COST_MODEL_PARAMS
+from .delay_predictor import (
+    DELAY_FEATURES, DELAY_TARGET, DELAY_CLF_FEATURES, DELAY_CLF_TARGET, DELAY_MODEL_PARAMS
+)
+from .instrumentation import instrument
+
+# name -> what to fit; `required` rows must be non-null, other feature gaps are filled with 0
+MODEL_SPECS = {
+    "cost_model": {
+        "kind": "regressor", "features": COST_FEATURES, "target": COST_TARGET,
+        "required": [COST_TARGET] + COST_FEATURES, "params": COST_MODEL_PARAMS,
+    },
+    "delay_model": {
+        "kind": "regressor", "features": DELAY_FEATURES, "target": DELAY_TARGET,
+        "required": [DELAY_TARGET, "Promised_Delivery_Days"], "params": DELAY_MODEL_PARAMS,
+    },
+    "delay_classifier": {
+        "kind": "classifier", "features": DELAY_CLF_FEATURES, "target": DELAY_CLF_TARGET,
+        "required": [DELAY_CLF_TARGET, "Distance_KM", "Total_Cost_INR"], "params": DELAY_MODEL_PARAMS,
+    },
+}
+
+# Above this many training rows the "auto" backend switches to histogram gradient boosting
+HIST_GB_MIN_ROWS = 200_000
+HIST_GB_PARAMS = {"max_iter": 200, "random_state": 42}
+# Hist models have no impurity importances; permutation importance runs on this many test rows instead
+PERMUTATION_SAMPLE_ROWS = 5000
+PERMUTATION_REPEATS = 5
+# Trees added to an existing forest (or boosting iterations) when warm-starting
+WARM_START_GROWTH = 25
+
+def training_columns(names=None):
+    """All feature/target columns the named models read (used for fingerprints)."""
+    cols = []
+    for name in names or MODEL_SPECS:
+        spec = MODEL_SPECS[name]
+        for c in spec["features"] + [spec["target"]] + spec["required"]:
+            if c not in cols:
+                cols.append(c)
+    return cols
+
+@instrument()
+def build_training_set(df, names=None, test_size=0.2, random_state=42):
+    """
+    Extract every column the models need into one contiguous float32 matrix
+    and draw a single train/test split shared by all models.
+    """
+    columns = [c for c in training_columns(names) if c in df.columns]
+    matrix = np.ascontiguousarray(
+        df[columns].to_numpy(dtype=np.float32, na_value=np.nan) if columns else np.empty((len(df), 0), np.float32)
+    )
+    rng = np.random.default_rng(random_state)
+    test_mask = np.zeros(len(df), dtype=bool)
+    test_mask[rng.permutation(len(df))[:int(round(len(df) * test_size))]] = True
+    return {"columns": columns, "matrix": matrix, "test_mask": test_mask}
+
+def _model_arrays(training_set, spec):
+    columns = training_set["columns"]
+    if not set(spec["required"]).issubset(columns):
+        return None
+    features = [c for c in spec["features"] if c in columns]
+    matrix = training_set["matrix"]
+    idx = {c: i for i, c in enumerate(columns)}
+    valid = ~np.isnan(matrix[:, [idx[c] for c in spec["required"]]]).any(axis=1)
+    if not valid.any():
+        return None
+    X = np.nan_to_num(matrix[:, [idx[c] for c in features]], nan=0.0)
+    y = matrix[:, idx[spec["target"]]]
+    if spec["kind"] == "classifier":
+        y = y.astype(np.int64)
+    train = valid & ~training_set["test_mask"]
+    test = valid & training_set["test_mask"]
+    return {
+        "features": features,
+        "X_train": np.ascontiguousarray(X[train]), "y_train": y[train],
+        "X_test": np.ascontiguousarray(X[test]), "y_test": y[test],
+    }
+
+def _holdout(arrays, spec):
+    """(X_test, y_test) frames of one model's test rows."""
+    if arrays is None:
+        return pd.DataFrame(), pd.Series(dtype="float32")
+    return (pd.DataFrame(arrays["X_test"], columns=arrays["features"]),
+            pd.Series(arrays["y_test"], name=spec["target"]))
+
+def _estimator_classes(backend):
+    """(classifier, regressor) for a backend; scikit-learn is imported on the first fit."""
+    if backend == "hist":
+        from sklearn.ensemble import HistGradientBoostingClassifier, HistGradientBoostingRegressor
+        return HistGradientBoostingClassifier, HistGradientBoostingRegressor
+    from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+    return RandomForestClassifier, RandomForestRegressor
+
+def _make_estimator(spec, backend, n_jobs):
+    classifier, regressor = _estimator_classes(backend)
+    cls = classifier if spec["kind"] == "classifier" else regressor
+    if backend == "hist":
+        return cls(**HIST_GB_PARAMS)
+    return cls(**spec["params"], n_jobs=n_jobs)
+
+def _permutation_importances(model, X, y, n_jobs=None, random_state=42):
+    """Mean permutation importance per feature on a sample of (X, y); None without test rows."""
+    if len(y) == 0:
+        return None
+    from sklearn.inspection import permutation_importance
+    if len(y) > PERMUTATION_SAMPLE_ROWS:
+        rows = np.random.default_rng(random_state).choice(len(y), PERMUTATION_SAMPLE_ROWS, replace=False)
+        X, y = X[rows], y[rows]
+    result = permutation_importance(model, X, y, n_repeats=PERMUTATION_REPEATS, random_state=random_state, n_jobs=n_jobs)
+    return result.importances_mean
+
+def _warm_start(previous, spec, backend, n_features):
+    """Grow a copy of `previous` if it is compatible with this fit, else None."""
+    if previous is None or getattr(previous, "n_features_in_", None) != n_features:
+        return None
+    if not isinstance(previous, _estimator_classes(backend)):
+        return None
+    model = pickle.loads(pickle.dumps(previous))
+    if backend == "forest":
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + WARM_START_GROWTH)
+    else:
+        model.set_params(warm_start=True, max_iter=model.max_iter + WARM_START_GROWTH)
+    return model
+
+@instrument()
+def fit_model(name, training_set, backend="auto", previous=None, n_jobs=None):
+    """
+    Fit one model from the shared training set.
+    Returns (model, X_test, y_test); model is None when the data is unusable.
+    The fitted model carries a `fit_report_` dict with timing, memory and the
+    held-out score (`test_score`: R^2 or accuracy; `model_mb` is filled in
+    by the registry from the saved file). Hist
+    models also get `permutation_importances_`, computed on test rows.
+    """
+    spec = MODEL_SPECS[name]
+    arrays = _model_arrays(training_set, spec)
+    if arrays is None or len(arrays["y_train"]) == 0:
+        return (None, *_holdout(None, spec))
+    features = arrays["features"]
+    if backend == "auto":
+        backend = "hist" if len(arrays["y_train"]) >= HIST_GB_MIN_ROWS else "forest"
+    model = _warm_start(previous, spec, backend, len(features))
+    warm = model is not None
+    if model is None:
+        model = _make_estimator(spec, backend, n_jobs)
+    start = time.perf_counter()
+    model.fit(arrays["X_train"], arrays["y_train"])
+    elapsed = time.perf_counter() - start
+    # before feature names are attached, so scoring on the bare arrays doesn't warn
+    test_rows = len(arrays["y_test"])
+    test_score = float(model.score(arrays["X_test"], arrays["y_test"])) if test_rows else None
+    if not hasattr(model, "feature_importances_"):
+        model.permutation_importances_ = _permutation_importances(model, arrays["X_test"], arrays["y_test"], n_jobs)
+    model.feature_names_in_ = np.array(features, dtype=object)
+    model.fit_report_ = {
+        "model": name,
+        "backend": backend,
+        "warm_start": warm,
+        "train_rows": int(len(arrays["y_train"])),
+        "fit_seconds": round(elapsed, 4),
+        "train_data_mb": round((arrays["X_train"].nbytes + arrays["y_train"].nbytes) / 1e6, 3),
+        "model_mb": None,
+        "test_rows": int(test_rows),
+        "test_score": None if test_score is None else round(test_score, 4),
+    }
+    return (model, *_holdout(arrays, spec))
+
+@instrument()
+def train_all_models(df, names=None, backend="auto", warm_start_from=None, n_jobs=None, max_workers=None):
+    """
+    Build the shared training set once and fit the named models concurrently.
+    `warm_start_from` maps name -> previously fitted model (or trainer result)
+    whose forest is grown instead of refitting from scratch.
+    Returns {name: (model, X_test, y_test)}.
+    """
+    names = list(names or MODEL_SPECS)
+    warm_start_from = warm_start_from or {}
+    training_set = build_training_set(df, names)
+    cores = os.cpu_count() or 1
+    max_workers = max_workers or max(1, min(len(names), cores))
+    if n_jobs is None:
+        n_jobs = max(1, cores // max_workers)
+
+    def _fit(name):
+        previous = warm_start_from.get(name)
+        if isinstance(previous, tuple):
+            previous = previous[0]
+        return fit_model(name, training_set, backend=backend, previous=previous, n_jobs=n_jobs)
+
+    # Forest fitting releases the GIL, so threads share the arrays without copies
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {name: pool.submit(_fit, name) for name in names}
+        return {name: future.result() for name, future in futures.items()}
+
+def holdout_sets(df, names=None):
+    """{name: (X_test, y_test)}: the test rows fit_model holds out of df for each model."""
+    names = list(names or MODEL_SPECS)
+    training_set = build_training_set(df, names)
+    return {name: _holdout(_model_arrays(training_set, MODEL_SPECS[name]), MODEL_SPECS[name]) for name in names}
+
+def fit_reports(results):
+    """Table of fit time and memory per model from train_all_models output."""
+    rows = [getattr(r[0], "fit_report_", None) for r in results.values() if r and r[0] is not None]
+    return pd.DataFrame([r for r in rows if r])
+
+def model_specs(backend="auto"):
+    """Registry specs: name -> (fingerprint columns, params) for every model."""
+    return {
+        name: (training_columns([name]), dict(spec["params"], backend=backend))
+        for name, spec in MODEL_SPECS.items()
+    }
+
+def train_registered_models(registry, df, backend="auto", warm_start=False, force=False, background=False,
+                            pin=None):
+    """
+    Fetch all models from `registry`, fitting only the stale ones together in
+    one concurrent train_all_models call. With `warm_start` stale models grow
+    the last good forest instead of starting over, keyed by that parent; `pin`
+    labels the models fitted on `df` in the registry (see ModelRegistry.pin).
+    The registry stores only the models, so the test rows are rebuilt from
+    `df`: returns {name: (model, X_test, y_test)}.
+    """
+    specs = model_specs(backend)
+    parents = {name: registry.latest_key(name) for name in specs} if warm_start else {}
+    parents = {name: key for name, key in parents.items() if key is not None}
+
+    def _train(data, names):
+        previous = {name: registry.load(name, parents[name]) for name in names if name in parents}
+        return train_all_models(data, names, backend=backend, warm_start_from=previous)
+
+    models = registry.get_or_train_many(specs, _train, df, force=force, background=background, pin=pin,
+                                        parents=parents)
+    holdout = holdout_sets(df, list(models))
+    return {name: (model, *holdout[name]) for name, model in models.items()}
@@ -0,0 +1,210 @@
+import streamlit as st
+import pandas as pd
+from .instrumentation import instrument
+from .feedback_index import get_feedback_index, RATING_BANDS
+from .render import histogram_frame, downsample_scatter, csv_payload, MAX_SCATTER_POINTS
+
+def _px():
+    # plotly.express costs ~0.25s to import; defer it until the first chart is drawn
+    import plotly.express as px
+    return px
+
+def _download_button_df(df, prefix):
+    # CSV is built only when the button is clicked (and cached), not on every rerun
+    st.download_button(f"📥 Download {prefix} (CSV)", data=csv_payload(df), file_name=f"{prefix}.csv", mime="text/csv")
+
+def _histogram_chart(values, x_title, title, bins=30):
+    """Bar chart of a NumPy pre-binned histogram (payload is `bins` rows)."""
+    hist = histogram_frame(values, bins=bins)
+    fig = _px().bar(hist, x="bin_mid", y="count", title=title, hover_data=["bin_start","bin_end"],
+                 labels={"bin_mid": x_title, "count": "count"})
+    fig.update_layout(bargap=0.05)
+    return fig
+
+def _sampled(df, x, y, max_points=MAX_SCATTER_POINTS):
+    sample = downsample_scatter(df, x, y, max_points=max_points)
+    if len(sample) < len(df):
+        st.caption(f"Showing {len(sample):,} of {len(df):,} points (density-preserving sample).")
+    return sample
+
+@instrument()
+def show_kpi_summary(kpis: dict):
+    st.header("Summary KPIs")
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Avg Delay (days)", f"{kpis.get('avg_delay_days',0):.2f}")
+    col2.metric("On-time Rate (%)", f"{kpis.get('on_time_rate_pct',0):.2f}")
+    col3.metric("Avg Cost / Order (INR)", f"{kpis.get('avg_cost_per_order',0):.2f}")
+    col4.metric("Avg Customer Rating", f"{kpis.get('avg_customer_rating',0):.2f}")
+
+@instrument()
+def show_daily_trend(trend_df):
+    st.subheader("Daily Delivery Trend")
+    if trend_df.empty:
+        st.info("No orders in the selected range.")
+        return
+    y = [c for c in ["Avg_Delay_Days","On_Time_Rate_Pct"] if c in trend_df.columns] or ["Orders"]
+    fig = _px().line(trend_df, x="Order_Date", y=y, title="Avg Delay and On-time Rate by Day")
+    st.plotly_chart(fig, use_container_width=True)
+
+@instrument()
+def show_delivery_performance(df):
+    st.subheader("Delivery Performance")
+    if "Delivery_Delay_Days" in df.columns:
+        fig = _histogram_chart(df["Delivery_Delay_Days"], "Delivery_Delay_Days", "Delivery Delay Distribution", bins=30)
+        st.plotly_chart(fig, use_container_width=True)
+        _download_button_df(df[["Order_ID","Delivery_Delay_Days"]], "delivery_delays")
+
+@instrument()
+def show_route_efficiency(routes_df):
+    st.subheader("Route Efficiency")
+    df = routes_df
+    if {"Distance_KM","Fuel_Consumption_L"}.issubset(df.columns):
+        df = df.assign(Efficiency_Score=df["Distance_KM"] / df["Fuel_Consumption_L"])
+        fig = _px().scatter(_sampled(df, "Distance_KM", "Fuel_Consumption_L"), x="Distance_KM", y="Fuel_Consumption_L",
+                         size="Efficiency_Score", color="Efficiency_Score", title="Fuel Efficiency by Route")
+        st.plotly_chart(fig, use_container_width=True)
+        _download_button_df(df, "routes_efficiency")
+
+@instrument()
+def show_vehicle_status(vehicle_df):
+    st.subheader("Fleet Overview")
+    if "Status" in vehicle_df.columns:
+        counts = vehicle_df["Status"].value_counts().reset_index()
+        counts.columns = ["Status","Count"]
+        fig = _px().pie(counts, names="Status", values="Count", title="Vehicle Status")
+        st.plotly_chart(fig, use_container_width=True)
+        _download_button_df(vehicle_df, "vehicle_fleet")
+
+@instrument()
+def show_cost_breakdown(cost_df):
+    st.subheader("Cost Breakdown")
+    df = cost_df
+    # average each cost category (column means, no melt of the full frame)
+    cost_cols = [c for c in ["Fuel_Cost","Labor_Cost","Vehicle_Maintenance","Insurance","Packaging_Cost","Technology_Platform_Fee","Other_Overhead"] if c in df.columns]
+    if cost_cols:
+        means = df[cost_cols].astype("float64").mean().sort_index()
+        summary = pd.DataFrame({"Cost_Type": means.index, "Amount": means.to_numpy()})
+        fig = _px().bar(summary, x="Cost_Type", y="Amount", title="Avg Cost by Category")
+        st.plotly_chart(fig, use_container_width=True)
+        _download_button_df(summary, "cost_breakdown_summary")
+    else:
+        st.info("Cost columns not found.")
+
+@instrument()
+def show_customer_feedback(feedback_df, text_index=None):
+    """Rating histogram, word cloud and at-risk terms; the text comes from a FeedbackIndex."""
+    st.subheader("Customer Feedback")
+    if "Rating" in feedback_df.columns:
+        fig = _histogram_chart(feedback_df["Rating"], "Rating", "Rating Distribution", bins=5)
+        st.plotly_chart(fig, use_container_width=True)
+    if "Feedback_Text" in feedback_df.columns:
+        if text_index is None:
+            text_index = get_feedback_index()
+            text_index.update(feedback_df)
+        col1, col2 = st.columns(2)
+        issues = ["All"] + sorted(feedback_df["Issue_Category"].dropna().astype(str).unique().tolist()) \
+            if "Issue_Category" in feedback_df.columns else ["All"]
+        issue = col1.selectbox("Issue category", options=issues, index=0)
+        band = col2.selectbox("Rating band", options=["All"] + list(RATING_BANDS), index=0)
+        # The word cloud is the slowest panel on a cold start; render it on demand
+        if st.toggle("Show word cloud", value=False):
+            png = text_index.wordcloud_png(issue=issue, band=band)
+            if png:
+                st.image(png, use_container_width=True)
+            else:
+                st.info("No feedback text for this selection.")
+        at_risk = text_index.at_risk_terms(issue=issue)
+        if not at_risk.empty:
+            st.write("Terms most over-represented in low ratings:")
+            st.dataframe(at_risk)
+    _download_button_df(feedback_df, "customer_feedback")
+
+@instrument()
+def show_warehouse_status(warehouse_df):
+    st.subheader("Warehouse Inventory")
+    if {"Warehouse_ID","Current_Stock_Units","Reorder_Level"}.issubset(warehouse_df.columns):
+        fig = _px().bar(warehouse_df, x="Warehouse_ID", y=["Current_Stock_Units","Reorder_Level"], barmode="group", title="Stock vs Reorder Level")
+        st.plotly_chart(fig, use_container_width=True)
+    _download_button_df(warehouse_df, "warehouse_inventory")
+
+@instrument()
+def show_inventory_projection(summary_df, daily_stock, policy_df=None):
+    """Projected stock: SKUs crossing their reorder level, network stock trend and policy comparison."""
+    st.subheader("Inventory Projection")
+    if summary_df.empty:
+        st.info("No warehouse inventory to project.")
+        return
+    col1, col2, col3 = st.columns(3)
+    col1.metric("SKUs reaching reorder level", f"{int(summary_df['Days_To_Reorder'].notna().sum())} / {len(summary_df)}")
+    col2.metric("Projected stockout units", f"{summary_df['Stockout_Units'].sum():,.0f}")
+    col3.metric("Storage cost (INR)", f"{summary_df['Storage_Cost_INR'].sum():,.0f}")
+    st.caption("Demand is measured in orders per day: orders carry no quantity, so each order is counted as one unit.")
+    at_risk = summary_df[summary_df["Days_To_Reorder"].notna()].sort_values("Days_To_Reorder")
+    st.write("Warehouse categories crossing their reorder level (soonest first):")
+    st.dataframe(at_risk[["Warehouse_ID","Product_Category","Current_Stock_Units","Reorder_Level","Daily_Demand",
+                          "Reorder_Date","Days_To_Stockout","Orders_Placed","Storage_Cost_INR"]].head(20))
+    trend = pd.DataFrame({"Date": daily_stock.index, "Total_Stock_Units": daily_stock.to_numpy().sum(axis=1)})
+    fig = _px().line(trend, x="Date", y="Total_Stock_Units", title="Projected Network Stock")
+    st.plotly_chart(fig, use_container_width=True)
+    if policy_df is not None and not policy_df.empty:
+        st.write("Reorder policy comparison over the same horizon:")
+        st.dataframe(policy_df)
+    _download_button_df(summary_df, "inventory_projection")
+
+@instrument()
+def show_route_risk_scatter(route_risk_df):
+    st.subheader("Route Risk Scatter")
+    if route_risk_df.empty:
+        st.info("No route risk data available.")
+        return
+    fig = _px().scatter(_sampled(route_risk_df, "avg_costpkm", "avg_delay"), x="avg_costpkm", y="avg_delay",
+                     size="count_orders", color="Route_Risk",
+                     hover_data=["Route"], title="Route Risk: cost vs delay (size=orders)")
+    st.plotly_chart(fig, use_container_width=True)
+
+@instrument()
+def show_cost_model_insights(model, X_test, y_test):
+    st.subheader("Cost Model Insights")
+    if model is None:
+        st.info("Cost model not available (insufficient data).")
+        return
+    df = X_test.assign(Actual_Cost=y_test.values, Predicted_Cost=model.predict(X_test))
+    st.write("Sample predictions (Actual vs Predicted):")
+    st.dataframe(df.head(10))
+    # simple scatter
+    fig = _px().scatter(_sampled(df, "Actual_Cost", "Predicted_Cost"), x="Actual_Cost", y="Predicted_Cost", title="Actual vs Predicted Cost")
+    st.plotly_chart(fig, use_container_width=True)
+    _download_button_df(df, "cost_model_predictions")
+
+def show_performance_panel(records_df, json_payload):
+    """Sidebar table, timing bar chart and JSON export of the stages recorded this run."""
+    with st.sidebar.expander("Performance", expanded=True):
+        if records_df.empty:
+            st.caption("No stages recorded.")
+            return
+        st.caption(f"{len(records_df)} stages, {records_df.loc[records_df['depth'] == 0, 'seconds'].sum():.3f}s top-level")
+        st.dataframe(records_df, use_container_width=True)
+        if records_df["peak_mb"].notna().any():
+            st.caption("peak_mb is the process-wide tracemalloc peak during the stage; "
+                       "peak_shared marks stages that overlapped another thread's profiled stage.")
+        top = records_df.groupby("stage", as_index=False)["seconds"].sum().nlargest(15, "seconds")
+        fig = _px().bar(top, x="seconds", y="stage", orientation="h", title="Time by stage")
+        fig.update_layout(yaxis={"categoryorder": "total ascending"})
+        st.plotly_chart(fig, use_container_width=True)
+        st.download_button("📥 Download timings (JSON)", data=json_payload,
+                           file_name="stage_timings.json", mime="application/json")
+
+def show_serving_panel(latency_df, session_id, active_sessions):
+    """Sidebar latency table of the shared compute service: this session and all sessions."""
+    with st.sidebar.expander("Serving"):
+        st.caption(f"Session {session_id} · {active_sessions} active session(s) in the last 5 min")
+        if latency_df.empty:
+            st.caption("No queries yet.")
+            return
+        mine = latency_df[latency_df["session"] == session_id].drop(columns="session")
+        st.write("This session:")
+        st.dataframe(mine, use_container_width=True, hide_index=True)
+        overall = latency_df.groupby("query", as_index=False).agg(
+            sessions=("session", "nunique"), calls=("calls", "sum"), p95_ms=("p95_ms", "max"))
+        st.write("All sessions (worst p95):")
+        st.dataframe(overall, use_container_width=True, hide_index=True)
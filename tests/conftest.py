@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules.data_loader import load_all_data  # noqa: E402
+from modules.data_analysis import clear_metrics_cache  # noqa: E402
+
+DATA_DIR = os.path.join(ROOT, "data")
+
+@pytest.fixture(scope="session")
+def data_dir():
+    return DATA_DIR
+
+@pytest.fixture(scope="session")
+def data():
+    """The bundled tables, read straight from the CSVs (no Parquet cache)."""
+    return load_all_data(DATA_DIR, use_cache=False)
+
+@pytest.fixture(autouse=True)
+def fresh_metrics_cache():
+    clear_metrics_cache()
+    yield
+    clear_metrics_cache()
@@ -0,0 +1,55 @@
+import threading
+
+import numpy as np
+import pytest
+
+from modules import compute_service
+from modules.compute_service import ComputeService
+
+ALL = {"origin": "All", "vehicle": "All"}
+
+@pytest.fixture
+def service(data_dir, tmp_path):
+    svc = ComputeService(data_dir, registry_root=str(tmp_path / "models"), max_workers=2)
+    yield svc
+    svc._executor.shutdown(wait=True)
+
+@pytest.fixture
+def fits(monkeypatch):
+    calls = []
+    monkeypatch.setattr(compute_service, "train_registered_models",
+                        lambda registry, df, **kw: calls.append(kw) or {"n": len(calls)})
+    return calls
+
+def test_models_are_memoized_per_data_version(service, fits):
+    snap = service.snapshot()
+    first = service.query("models", snapshot=snap, backend="auto")
+    assert service.query("models", snapshot=snap, backend="auto") is first
+    assert len(fits) == 1
+    service.query("models", snapshot=snap, backend="auto", force=True)
+    assert len(fits) == 2 and fits[-1]["force"]
+    service.query("models", snapshot=snap, backend="sklearn")
+    assert len(fits) == 3
+
+def test_models_not_memoized_while_retraining(service, fits, monkeypatch):
+    monkeypatch.setattr(service.registry, "is_training", lambda name=None: True)
+    snap = service.snapshot()
+    service.query("models", snapshot=snap, background=True)
+    service.query("models", snapshot=snap, background=True)
+    assert len(fits) == 2
+
+def test_cost_anomalies_score_outside_the_service_lock(service, monkeypatch):
+    snap = service.snapshot()
+    free = []
+
+    class Detector:
+        def score(self, df, method, threshold):
+            probe = threading.Thread(target=lambda: free.append(service._lock.acquire(blocking=False)
+                                                                and service._lock.release() is None))
+            probe.start()
+            probe.join()
+            return None, np.zeros(len(df)), np.zeros(len(df), dtype=bool)
+
+    monkeypatch.setattr(service, "anomaly_detector", lambda snap: Detector())
+    service.query("cost_anomalies", snapshot=snap, selection=ALL)
+    assert free == [True]
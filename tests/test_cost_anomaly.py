@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.cost_anomaly import MAD_TO_STD, METHODS, CostAnomalyDetector
+
+WINDOW = 16
+HALF_LIFE = 7.0
+
+@pytest.fixture(scope="module")
+def orders():
+    rng = np.random.default_rng(7)
+    n = 600
+    return pd.DataFrame({
+        "Order_ID": [f"ORD{i:05d}" for i in range(n)],
+        "Order_Date": pd.Timestamp("2025-01-01") + pd.to_timedelta(np.sort(rng.integers(0, 90, n)), unit="D"),
+        "Route": rng.choice(["Pune-Delhi", "Mumbai-Chennai", "Delhi-Kolkata"], n),
+        "Vehicle_Type": rng.choice(["Truck", "Van"], n),
+        "Cost_per_KM": rng.gamma(4.0, 5.0, n),
+    })
+
+def _detector():
+    return CostAnomalyDetector(window=WINDOW, half_life_days=HALF_LIFE, min_count=5)
+
+def _by_group(detector, method):
+    return detector.summary(method).set_index(["Route", "Vehicle_Type"]).sort_index()
+
+def _expected(orders, method):
+    """Batch statistics per group computed directly from all rows."""
+    last_day = orders.groupby(["Route", "Vehicle_Type"])["Order_Date"].transform("max")
+    age = (last_day - orders["Order_Date"]).dt.days
+    frame = orders.assign(w=0.5 ** (age / HALF_LIFE))
+    rows = []
+    for key, grp in frame.groupby(["Route", "Vehicle_Type"]):
+        x = grp["Cost_per_KM"].to_numpy()
+        if method == "welford":
+            centre, scale = x.mean(), x.std(ddof=1)
+        elif method == "ewma":
+            w = grp["w"].to_numpy()
+            centre = np.average(x, weights=w)
+            scale = np.sqrt(np.average((x - centre) ** 2, weights=w))
+        else:
+            recent = x[-WINDOW:].astype(np.float32).astype(np.float64)
+            centre = np.median(recent)
+            scale = np.median(np.abs(recent - centre)) * MAD_TO_STD
+        rows.append((*key, centre, scale))
+    return pd.DataFrame(rows, columns=["Route", "Vehicle_Type", "Centre", "Scale"]).set_index(
+        ["Route", "Vehicle_Type"]).sort_index()
+
+@pytest.mark.parametrize("method", METHODS)
+def test_incremental_updates_match_batch(orders, method):
+    batch = _detector()
+    assert batch.update(orders) == len(orders)
+
+    incremental = _detector()
+    for cut in [100, 250, 251, 480]:
+        incremental.update(orders.iloc[:cut])
+    assert incremental.update(orders) == len(orders) - 480
+
+    got, want = _by_group(incremental, method), _by_group(batch, method)
+    pd.testing.assert_frame_equal(got, want, rtol=1e-9)
+    expected = _expected(orders, method)
+    np.testing.assert_allclose(got["Centre"], expected["Centre"], rtol=1e-9)
+    np.testing.assert_allclose(got["Scale"], expected["Scale"], rtol=1e-9)
+
+def test_global_group_tracks_all_orders(orders):
+    detector = _detector()
+    detector.update(orders)
+    centre, scale, support = detector.stats("welford")
+    assert support[0] == len(orders)
+    assert centre[0] == pytest.approx(orders["Cost_per_KM"].mean())
+    assert scale[0] == pytest.approx(orders["Cost_per_KM"].std(ddof=1))
+
+def test_save_load_round_trip(orders, tmp_path):
+    path = str(tmp_path / "state.joblib")
+    detector = _detector()
+    detector.update(orders.iloc[:300])
+    detector.save(path)
+
+    loaded = CostAnomalyDetector.load(path, window=WINDOW, half_life_days=HALF_LIFE, min_count=5)
+    assert loaded.keys == detector.keys
+    for method in METHODS:
+        pd.testing.assert_frame_equal(loaded.summary(method), detector.summary(method))
+        np.testing.assert_array_equal(loaded.score(orders, method)[1], detector.score(orders, method)[1])
+    # the watermark is saved too: only the unseen orders are ingested after loading
+    assert loaded.update(orders) == len(orders) - 300
+    # a different configuration starts from scratch
+    assert CostAnomalyDetector.load(path, window=WINDOW * 2).count.sum() == 0
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+from modules import data_analysis
+from modules.data_analysis import prepare_metrics
+from modules.data_loader import FILES, load_all_data
+
+def baseline_metrics(data):
+    """The original chained-merge build with row-wise derived fields."""
+    df = data["orders"].merge(data["delivery_performance"], on="Order_ID", how="left", suffixes=("", "_perf"))
+    df = df.merge(data["cost_breakdown"], on="Order_ID", how="left", suffixes=("", "_cost"))
+    df = df.merge(data["routes_distance"], on="Order_ID", how="left", suffixes=("", "_route"))
+    df = df.merge(data["customer_feedback"][["Order_ID","Rating","Issue_Category"]], on="Order_ID", how="left")
+    df["Delivery_Delay_Days"] = df["Actual_Delivery_Days"] - df["Promised_Delivery_Days"]
+    cost_cols = [c for c in data_analysis.COST_COLS if c in df.columns]
+    df["Total_Cost_INR"] = df[cost_cols].sum(axis=1)
+    df["Cost_per_KM"] = df.apply(lambda r: (r["Total_Cost_INR"] / r["Distance_KM"])
+                                 if pd.notnull(r.get("Distance_KM")) and r.get("Distance_KM") > 0 else np.nan, axis=1)
+    df["Is_Delayed"] = df["Delivery_Delay_Days"].apply(lambda x: 1 if pd.notnull(x) and x > 0 else 0)
+    if "Vehicle_ID" in df.columns:
+        df = df.merge(data["vehicle_fleet"], on="Vehicle_ID", how="left")
+    return df
+
+def _comparable(df):
+    """Plain object/float columns, so categorical vs string storage does not matter."""
+    out = df.reset_index(drop=True).copy()
+    for c in out.columns:
+        if isinstance(out[c].dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(out[c]):
+            out[c] = out[c].astype(object).where(out[c].notna(), None)
+        elif pd.api.types.is_numeric_dtype(out[c]) and not pd.api.types.is_bool_dtype(out[c]):
+            out[c] = out[c].astype(np.float64)
+    return out
+
+def _split_by_order(data, n_orders):
+    """(first, full) table dicts where each first table is a prefix of the full one."""
+    sorted_data = {name: df.sort_values("Order_ID", kind="stable").reset_index(drop=True)
+                   if "Order_ID" in df.columns else df for name, df in data.items()}
+    cutoff = sorted_data["orders"]["Order_ID"].iloc[n_orders]
+    first = {name: df[df["Order_ID"] < cutoff].reset_index(drop=True) if "Order_ID" in df.columns else df
+             for name, df in sorted_data.items()}
+    return first, sorted_data
+
+def test_prepare_metrics_matches_baseline(data):
+    enriched = prepare_metrics(data, use_cache=False)
+    expected = baseline_metrics(data)
+    assert list(enriched.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(_comparable(enriched), _comparable(expected))
+
+def test_cached_build_matches_uncached(data):
+    first = prepare_metrics(data)
+    again = prepare_metrics(data)
+    pd.testing.assert_frame_equal(_comparable(first), _comparable(prepare_metrics(data, use_cache=False)))
+    pd.testing.assert_frame_equal(_comparable(again), _comparable(first))
+
+def test_incremental_append_matches_full_build(data, monkeypatch):
+    first, full = _split_by_order(data, n_orders=120)
+    prepare_metrics(first)
+
+    enriched_rows = []
+    enrich = data_analysis._enrich
+    monkeypatch.setattr(data_analysis, "_enrich", lambda orders, *a: enriched_rows.append(len(orders)) or enrich(orders, *a))
+    incremental = prepare_metrics(full)
+    # only the appended orders went through the join/derive step
+    assert enriched_rows == [len(full["orders"]) - len(first["orders"])]
+
+    monkeypatch.setattr(data_analysis, "_enrich", enrich)
+    expected = prepare_metrics(full, use_cache=False)
+    pd.testing.assert_frame_equal(_comparable(incremental), _comparable(expected))
+
+def test_edited_copy_of_loaded_frame_is_rebuilt(data):
+    loaded = {name: df.copy() for name, df in data.items()}
+    prepare_metrics(loaded)
+    orders = loaded["orders"].copy()
+    orders.loc[0, "Order_Value_INR"] = orders.loc[0, "Order_Value_INR"] + 1
+    edited = dict(loaded, orders=orders)
+    enriched = prepare_metrics(edited)
+    row = enriched["Order_ID"] == orders.loc[0, "Order_ID"]
+    assert enriched.loc[row, "Order_Value_INR"].iloc[0] == orders.loc[0, "Order_Value_INR"]
+    pd.testing.assert_frame_equal(_comparable(enriched), _comparable(prepare_metrics(edited, use_cache=False)))
+
+def _no_row_hashes(df):
+    raise AssertionError("loader frames should not be row-hashed")
+
+def test_appended_csvs_fold_in_without_hashing(data, tmp_path, monkeypatch):
+    first, full = _split_by_order(data, n_orders=120)
+    for name, df in first.items():
+        df.to_csv(tmp_path / FILES[name], index=False)
+    prepare_metrics(load_all_data(str(tmp_path)))
+    for name, df in full.items():
+        if len(df) > len(first[name]):
+            df.iloc[len(first[name]):].to_csv(tmp_path / FILES[name], mode="a", header=False, index=False)
+    appended = load_all_data(str(tmp_path))
+
+    enriched_rows = []
+    enrich = data_analysis._enrich
+    monkeypatch.setattr(data_analysis, "_row_hashes", _no_row_hashes)
+    monkeypatch.setattr(data_analysis, "_enrich", lambda orders, *a: enriched_rows.append(len(orders)) or enrich(orders, *a))
+    incremental = prepare_metrics(appended)
+    assert enriched_rows == [len(full["orders"]) - len(first["orders"])]
+    # a rerun on the same frames is a cache hit
+    prepare_metrics(appended)
+    assert len(enriched_rows) == 1
+
+    monkeypatch.setattr(data_analysis, "_enrich", enrich)
+    pd.testing.assert_frame_equal(_comparable(incremental), _comparable(prepare_metrics(appended, use_cache=False)))
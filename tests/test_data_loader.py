@@ -0,0 +1,65 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from modules.data_loader import load_table, source_signature
+
+def _copy_with_bad_value(data_dir, tmp_path):
+    for name in os.listdir(data_dir):
+        if name.endswith(".csv"):
+            shutil.copy(os.path.join(data_dir, name), tmp_path / name)
+    path = tmp_path / "orders.csv"
+    df = pd.read_csv(path)
+    df["Order_Value_INR"] = df["Order_Value_INR"].astype(object)
+    df.loc[3, "Order_Value_INR"] = "12,5O"
+    df.to_csv(path, index=False)
+    return df
+
+def test_bad_value_coerces_instead_of_emptying_table(data_dir, tmp_path, caplog):
+    raw = _copy_with_bad_value(data_dir, tmp_path)
+    with caplog.at_level("WARNING", logger="nexgen.data"):
+        orders = load_table("orders", str(tmp_path), use_cache=False)
+    assert len(orders) == len(raw)
+    assert orders["Order_Value_INR"].dtype == np.float32
+    assert np.isnan(orders.loc[3, "Order_Value_INR"])
+    assert orders["Order_Value_INR"].notna().sum() == len(raw) - 1
+    assert isinstance(orders["Customer_Segment"].dtype, pd.CategoricalDtype)
+    assert "Order_Value_INR" in caplog.text
+
+def test_parquet_cache_is_swapped_in_whole(data_dir, tmp_path):
+    _copy_with_bad_value(data_dir, tmp_path)
+    first = load_table("orders", str(tmp_path))
+    cache = tmp_path / ".cache"
+    assert sorted(os.listdir(cache)) == ["manifest.json", "orders.parquet"]
+    pd.testing.assert_frame_equal(load_table("orders", str(tmp_path)), first)
+
+def test_source_signature_only_for_unmodified_loaded_frame(data_dir, tmp_path):
+    _copy_with_bad_value(data_dir, tmp_path)
+    orders = load_table("orders", str(tmp_path))
+    signature = source_signature(orders)
+    assert signature["table"] == "orders" and signature["rows"] == len(orders)
+    assert source_signature(load_table("orders", str(tmp_path))) == signature
+    assert source_signature(orders.copy()) is None
+    assert source_signature(orders.iloc[:10]) is None
+    assert source_signature(load_table("orders", str(tmp_path), use_cache=False)) is None
+    orders.loc[0, "Order_Value_INR"] = 1.0
+    assert source_signature(orders) is None
+
+def test_appended_csv_records_previous_version(data_dir, tmp_path):
+    _copy_with_bad_value(data_dir, tmp_path)
+    before = source_signature(load_table("orders", str(tmp_path)))
+    with open(tmp_path / "orders.csv", "a") as f:
+        f.write("ORD99999,2025-02-01,SMB,Express,Books,100.0,Pune,Delhi,\n")
+    after = source_signature(load_table("orders", str(tmp_path)))
+    assert after["rows"] == before["rows"] + 1
+    assert after["appended_to"] == [before["sha1"], before["rows"]]
+
+def test_rewritten_csv_is_not_an_append(data_dir, tmp_path):
+    raw = _copy_with_bad_value(data_dir, tmp_path)
+    load_table("orders", str(tmp_path))
+    raw.iloc[1:].to_csv(tmp_path / "orders.csv", index=False)
+    with open(tmp_path / "orders.csv", "a") as f:
+        f.write("ORD99998,2025-02-01,SMB,Express,Books,100.0,Pune,Delhi,\n" * 2)
+    assert "appended_to" not in source_signature(load_table("orders", str(tmp_path)))
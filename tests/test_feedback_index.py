@@ -0,0 +1,57 @@
+import pandas as pd
+from wordcloud import WordCloud
+
+from modules.feedback_index import FeedbackIndex, tokenize
+
+def _counts(index, **filters):
+    return index.term_counts(**filters).set_index("term")["count"].sort_index()
+
+def _by_date(feedback):
+    return feedback.sort_values(["Feedback_Date", "Order_ID"], kind="stable").reset_index(drop=True)
+
+def test_incremental_update_matches_one_batch(data):
+    feedback = _by_date(data["customer_feedback"])
+    batch = FeedbackIndex()
+    assert batch.update(feedback) == feedback["Feedback_Text"].notna().sum()
+
+    incremental = FeedbackIndex()
+    half = len(feedback) // 2
+    incremental.update(feedback.iloc[:half])
+    incremental.update(feedback)
+    assert incremental.rows == batch.rows
+    pd.testing.assert_series_equal(_counts(incremental), _counts(batch))
+    pd.testing.assert_series_equal(_counts(incremental, issue="Timing", band="low"),
+                                   _counts(batch, issue="Timing", band="low"))
+
+def test_rerun_is_skipped_but_same_length_edit_is_not(data):
+    feedback = _by_date(data["customer_feedback"])
+    index = FeedbackIndex()
+    index.update(feedback)
+    version = index.version
+    assert index.update(feedback) == 0
+    assert index.update(feedback.copy()) == 0
+    assert index.version == version
+
+    # same length, different content: the last row is replaced by unseen feedback
+    edited = feedback.copy()
+    edited.loc[len(edited) - 1, ["Order_ID", "Feedback_Text"]] = ["ORD999999", "Packaging crushed badly"]
+    assert index.update(edited) == 1
+    assert _counts(index)["crushed"] == 1
+
+def test_terms_match_wordcloud_unigrams(data):
+    text = data["customer_feedback"]["Feedback_Text"].dropna()
+    index = FeedbackIndex()
+    index.update(data["customer_feedback"])
+    expected = WordCloud(collocations=False).process_text(" ".join(text))
+    expected = pd.Series({w.lower(): n for w, n in expected.items()}, name="count").sort_index()
+    pd.testing.assert_series_equal(_counts(index), expected, check_names=False, check_dtype=False)
+
+def test_plurals_fold_into_singular():
+    index = FeedbackIndex()
+    index.update(pd.DataFrame({"Order_ID": ["A", "B", "C"], "Feedback_Date": pd.to_datetime(["2025-01-01"] * 3),
+                               "Rating": [1.0, 2.0, 5.0], "Issue_Category": ["Delay"] * 3,
+                               "Feedback_Text": ["Late delivery, one delay", "Two deliveries late, delays", "Glass was fine"]}))
+    counts = _counts(index)
+    assert tokenize("delays glass") == ["delays", "glass"]
+    assert counts["delay"] == 2 and "delays" not in counts
+    assert counts["late"] == 2 and counts["glass"] == 1 and counts["deliveries"] == 1
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.data_analysis import prepare_metrics, compute_kpis
+from modules.filtering import build_filter_index, filter_rows, kpis_from_cube, daily_trend
+
+# the cube sums in float64, compute_kpis averages the float32 columns in float32
+RTOL = 1e-6
+
+@pytest.fixture(scope="module")
+def metrics(data):
+    metrics = prepare_metrics(data, use_cache=False)
+    # the bundled orders carry no Vehicle_ID, so give them a vehicle type to filter on
+    types = np.array(["Truck", "Van", "Bike", None], dtype=object)
+    return metrics.assign(Vehicle_Type=types[np.arange(len(metrics)) % len(types)])
+
+@pytest.fixture(scope="module")
+def index(metrics):
+    return build_filter_index(metrics)
+
+def _selections(metrics):
+    dates = metrics["Order_Date"].dropna().sort_values()
+    first, mid, last = dates.iloc[0], dates.iloc[len(dates) // 2], dates.iloc[-1]
+    origin = metrics["Origin"].dropna().astype(str).value_counts().index[0]
+    return [
+        {},
+        {"start_date": first.date(), "end_date": last.date()},
+        {"start_date": mid.date(), "end_date": last.date()},
+        {"start_date": mid.date(), "end_date": mid.date(), "origin": origin},
+        {"origin": origin},
+        {"vehicle": "Van"},
+        {"start_date": first.date(), "end_date": mid.date(), "origin": origin, "vehicle": "Truck"},
+        {"origin": "Nowhere"},
+    ]
+
+def reference_rows(metrics, start_date=None, end_date=None, origin="All", vehicle="All"):
+    """Boolean-mask filtering as the dashboard originally did it."""
+    mask = pd.Series(True, index=metrics.index)
+    if start_date is not None:
+        mask &= metrics["Order_Date"] >= pd.Timestamp(start_date)
+    if end_date is not None:
+        mask &= metrics["Order_Date"] <= pd.Timestamp(end_date)
+    if origin != "All":
+        mask &= metrics["Origin"].astype(object) == origin
+    if vehicle != "All":
+        mask &= metrics["Vehicle_Type"] == vehicle
+    return metrics[mask.to_numpy()]
+
+def test_filter_rows_match_boolean_masks(metrics, index):
+    for selection in _selections(metrics):
+        expected = reference_rows(metrics, **selection).index.to_numpy()
+        np.testing.assert_array_equal(np.sort(filter_rows(index, **selection)), expected)
+
+def test_cube_kpis_match_compute_kpis_on_filtered_rows(metrics, index):
+    for selection in _selections(metrics):
+        expected = compute_kpis(reference_rows(metrics, **selection))
+        got = kpis_from_cube(index["cube"], **selection)
+        assert set(got) == set(expected)
+        for name, value in expected.items():
+            if pd.isna(value):
+                assert pd.isna(got[name]), (selection, name)
+            else:
+                assert got[name] == pytest.approx(value, rel=RTOL), (selection, name)
+
+def test_daily_trend_matches_groupby_of_filtered_rows(metrics, index):
+    for selection in _selections(metrics):
+        rows = reference_rows(metrics, **selection)
+        rows = rows[rows["Order_Date"].notna()]
+        expected = rows.groupby(rows["Order_Date"].dt.normalize()).agg(
+            Orders=("Order_ID", "size"), Avg_Delay_Days=("Delivery_Delay_Days", "mean"),
+            delayed=("Is_Delayed", "mean")).reset_index()
+        got = daily_trend(index["cube"], **selection)
+        assert got["Order_Date"].tolist() == expected["Order_Date"].tolist()
+        assert got["Orders"].tolist() == expected["Orders"].tolist()
+        np.testing.assert_allclose(got["Avg_Delay_Days"].to_numpy(dtype=float),
+                                   expected["Avg_Delay_Days"].to_numpy(dtype=float), rtol=RTOL)
+        np.testing.assert_allclose(got["On_Time_Rate_Pct"].to_numpy(dtype=float),
+                                   (1 - expected["delayed"].to_numpy(dtype=float)) * 100, rtol=RTOL)
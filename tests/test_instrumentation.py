@@ -0,0 +1,68 @@
+import threading
+import tracemalloc
+
+import pytest
+
+from modules import instrumentation
+
+@pytest.fixture(autouse=True)
+def fresh_thread_state():
+    instrumentation.disable()
+    instrumentation.reset()
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+def _on_thread(fn):
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(value=fn()))
+    thread.start()
+    thread.join()
+    return result.get("value")
+
+def test_tracemalloc_stops_when_last_memory_user_disables():
+    assert not tracemalloc.is_tracing()
+    instrumentation.enable(memory=True)
+    instrumentation.enable(memory=True)  # reruns re-enable without taking a second hold
+    assert tracemalloc.is_tracing()
+    ready, done = threading.Event(), threading.Event()
+
+    def other_session():
+        instrumentation.enable(memory=True)
+        ready.set()
+        done.wait()
+        instrumentation.disable()
+
+    thread = threading.Thread(target=other_session)
+    thread.start()
+    ready.wait()
+    instrumentation.disable()
+    assert tracemalloc.is_tracing()  # the other thread still tracks memory
+    done.set()
+    thread.join()
+    assert not tracemalloc.is_tracing()
+
+def test_thread_ending_without_disable_releases_tracemalloc():
+    _on_thread(lambda: instrumentation.enable(memory=True))
+    assert not tracemalloc.is_tracing()
+
+def test_overlapping_memory_stages_are_flagged_shared():
+    instrumentation.enable(memory=True)
+    with instrumentation.stage("alone"):
+        with instrumentation.stage("nested"):
+            bytearray(1 << 20)
+    with instrumentation.stage("overlapped"):
+        settings = instrumentation.settings()
+
+        def worker():
+            with instrumentation.capture(*settings) as records:
+                with instrumentation.stage("worker"):
+                    pass
+            return records
+
+        worker_records = _on_thread(worker)
+    frame = instrumentation.records_frame().set_index("stage")
+    assert not frame.loc["alone", "peak_shared"] and not frame.loc["nested", "peak_shared"]
+    assert frame.loc["alone", "peak_mb"] >= 1
+    assert frame.loc["overlapped", "peak_shared"]
+    assert worker_records[0]["peak_shared"]
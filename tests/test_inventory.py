@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.inventory import REORDER_POLICIES, STORAGE_COST_PERIOD_DAYS, compare_policies, demand_rates, simulate_inventory
+
+def reference_simulation(warehouses, rate, day_factor, policy, lead_time_days, cover_days, order_qty=None):
+    """Row-by-row, day-by-day simulation with explicit arrival lists."""
+    out = []
+    for i, row in enumerate(warehouses.itertuples(index=False)):
+        stock, level = float(row.Current_Stock_Units), float(row.Reorder_Level)
+        arrivals = {}
+        lost = storage = 0.0
+        placed = 0
+        first_reorder = first_stockout = None
+        for t, factor in enumerate(day_factor):
+            stock += arrivals.pop(t, 0.0)
+            demand = rate[i] * factor
+            if demand > stock and first_stockout is None:
+                first_stockout = t
+            lost += max(demand - stock, 0.0)
+            stock = max(stock - demand, 0.0)
+            if stock <= level and first_reorder is None:
+                first_reorder = t
+            if policy != "none":
+                position = stock + sum(q for day, q in arrivals.items() if day > t)
+                if position <= level:
+                    if policy == "min_max":
+                        qty = max(level + cover_days * rate[i] - position, 0.0)
+                    else:
+                        qty = float(order_qty) if order_qty is not None else max(cover_days * rate[i], 1.0)
+                    if qty > 0:
+                        placed += 1
+                        if lead_time_days == 0:
+                            stock += qty
+                        else:
+                            arrivals[t + lead_time_days] = arrivals.get(t + lead_time_days, 0.0) + qty
+            storage += stock * row.Storage_Cost_per_Unit / STORAGE_COST_PERIOD_DAYS
+        out.append({"Ending_Stock": stock, "Stockout_Units": lost, "Orders_Placed": placed, "Storage_Cost_INR": storage,
+                    "Days_To_Reorder": np.nan if first_reorder is None else first_reorder,
+                    "Days_To_Stockout": np.nan if first_stockout is None else first_stockout})
+    return pd.DataFrame(out)
+
+def test_demand_is_orders_per_day_split_across_warehouses():
+    orders = pd.DataFrame({
+        "Order_Date": pd.to_datetime(["2025-01-01", "2025-01-02", "2025-01-03", "2025-01-04", "2025-01-04"]),
+        "Origin": ["Pune", "Pune", "Pune", "Delhi", "Pune"],
+        "Product_Category": ["Books", "Books", "Food", "Books", "Books"],
+    })
+    warehouses = pd.DataFrame({"Warehouse_ID": ["W1", "W2", "W3", "W4"], "Location": ["Pune", "Pune", "Delhi", "Mumbai"],
+                               "Product_Category": ["Books", "Books", "Books", "Books"]})
+    rates, dow = demand_rates(orders, warehouses, lookback_days=4)
+    # 3 Pune book orders over 4 days, shared by two warehouses; 1 Delhi order; none in Mumbai
+    np.testing.assert_allclose(rates, [3 / 4 / 2, 3 / 4 / 2, 1 / 4, 0.0])
+    assert dow.mean() == pytest.approx(1.0)
+    rates, _ = demand_rates(orders, warehouses, lookback_days=1)
+    np.testing.assert_allclose(rates, [0.5, 0.5, 1.0, 0.0])
+
+@pytest.mark.parametrize("policy", REORDER_POLICIES)
+@pytest.mark.parametrize("lead_time_days", [0, 3])
+def test_vectorized_simulation_matches_reference(data, policy, lead_time_days):
+    warehouses, orders = data["warehouse_inventory"], data["orders"]
+    summary, daily = simulate_inventory(warehouses, orders, horizon_days=120, policy=policy,
+                                        lead_time_days=lead_time_days, cover_days=10)
+    rate, dow = demand_rates(orders, warehouses)
+    factors = dow[daily.index.dayofweek.to_numpy()]
+    expected = reference_simulation(warehouses, rate, factors, policy, lead_time_days, cover_days=10)
+    for col in expected.columns:
+        np.testing.assert_allclose(summary[col].to_numpy(dtype=float), expected[col].to_numpy(dtype=float),
+                                   rtol=1e-9, atol=1e-6, err_msg=col)
+    np.testing.assert_allclose(daily.iloc[-1].to_numpy(), summary["Ending_Stock"].to_numpy())
+
+def test_reorder_policies_prevent_stockouts(data):
+    warehouses = data["warehouse_inventory"].assign(Current_Stock_Units=5)
+    totals = compare_policies(warehouses, data["orders"], horizon_days=60, lead_time_days=0).set_index("Policy")
+    assert totals.loc["none", "Orders_Placed"] == 0
+    assert totals.loc["none", "Stockout_Units"] > 0
+    assert totals.loc["min_max", "Stockout_Units"] < totals.loc["none", "Stockout_Units"]
+    summary, _ = simulate_inventory(warehouses, data["orders"], horizon_days=60, policy="fixed_qty", order_qty=500,
+                                    lead_time_days=0)
+    assert totals.loc["fixed_qty", "Orders_Placed"] > 0
+    assert (summary["Units_Ordered"] == 500 * summary["Orders_Placed"]).all()
+
+def test_unknown_policy_raises(data):
+    with pytest.raises(ValueError):
+        simulate_inventory(data["warehouse_inventory"], data["orders"], policy="just_in_time")
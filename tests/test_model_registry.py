@@ -0,0 +1,43 @@
+import os
+import json
+
+import joblib
+
+from modules.data_analysis import prepare_metrics
+from modules.model_registry import ModelRegistry
+from modules.training import MODEL_SPECS, train_registered_models
+
+def test_artifacts_hold_only_the_model_and_its_metrics(data, tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    models = train_registered_models(registry, prepare_metrics(data, use_cache=False), backend="forest")
+    for name, (model, X_test, y_test) in models.items():
+        folder = tmp_path / name
+        meta = json.loads((folder / "latest.json").read_text())
+        stored = joblib.load(folder / f"{meta['key']}.joblib")
+        assert type(stored) is type(model)
+        assert meta["metrics"] == {"test_rows": len(y_test), "test_score": model.fit_report_["test_score"]}
+        assert len(X_test) == len(y_test) > 0
+        assert not [f for f in os.listdir(folder) if f.endswith(".tmp")]
+
+def test_warm_start_is_keyed_by_its_parent(data, tmp_path):
+    df = prepare_metrics(data, use_cache=False)
+    registry = ModelRegistry(str(tmp_path))
+    train_registered_models(registry, df.iloc[:150], backend="forest")
+    parents = {name: registry.latest_key(name) for name in MODEL_SPECS}
+
+    fresh = ModelRegistry(str(tmp_path / "fresh"))
+    train_registered_models(fresh, df, backend="forest")
+    train_registered_models(registry, df, backend="forest", warm_start=True)
+    for name in MODEL_SPECS:
+        warm_key = registry.latest_key(name)
+        assert warm_key not in {parents[name], fresh.latest_key(name)}
+        meta = json.loads((tmp_path / name / "latest.json").read_text())
+        assert meta["parent"] == parents[name] and meta["base_key"] == fresh.latest_key(name)
+        assert registry.latest(name).fit_report_["warm_start"]
+
+    # the warm model already covers this data: asking again serves it instead of growing it further
+    warm_keys = {name: registry.latest_key(name) for name in MODEL_SPECS}
+    again = train_registered_models(registry, df, backend="forest", warm_start=True)
+    assert {name: registry.latest_key(name) for name in MODEL_SPECS} == warm_keys
+    for name, (model, _, _) in again.items():
+        assert model.n_estimators == MODEL_SPECS[name]["params"]["n_estimators"] + 25
@@ -0,0 +1,132 @@
+import itertools
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules import optimization
+from modules.optimization import assign_vehicles, route_demand, EXACT_SOLVER_MAX_CELLS
+
+CITIES = ["Mumbai", "Delhi", "Pune", "Chennai", "Kolkata", "Hyderabad"]
+
+def _routes(n, rng, demand=True):
+    origins = np.resize(CITIES, n)
+    df = pd.DataFrame({"Route": [f"{o}-Stop{i}" for i, o in enumerate(origins)],
+                       "Route_Risk": rng.random(n)})
+    if demand:
+        df["Demand_KG"] = rng.uniform(100, 1000, n)
+    return df
+
+def _vehicles(n, rng):
+    return pd.DataFrame({
+        "Vehicle_ID": [f"V{i:05d}" for i in range(n)],
+        "Capacity_KG": rng.uniform(50, 1200, n),
+        "Fuel_Efficiency_KM_per_L": rng.uniform(4, 12, n),
+        "CO2_Emissions_Kg_per_KM": rng.uniform(0.2, 0.9, n),
+        "Current_Location": rng.choice(CITIES, n),
+        "Status": "Available",
+    })
+
+def _cost(routes, vehicles, pairs):
+    """Objective of a route -> vehicle assignment, computed from scratch."""
+    inp = optimization._assignment_inputs(routes, vehicles, optimization.ASSIGNMENT_WEIGHTS)
+    rows = np.arange(len(routes))
+    cost = optimization._cost_rows(inp, rows, optimization.LOCATION_PENALTY)
+    return sum(cost[r, v] for r, v in pairs)
+
+def _pairs(routes, vehicles, assigned):
+    r = {route: i for i, route in enumerate(routes["Route"])}
+    v = {vid: i for i, vid in enumerate(vehicles["Vehicle_ID"])}
+    return [(r[a], v[b]) for a, b in zip(assigned["Route"], assigned["Recommended_Vehicle_ID"])]
+
+def test_exact_solver_is_optimal_and_feasible():
+    rng = np.random.default_rng(1)
+    routes, vehicles = _routes(4, rng), _vehicles(6, rng)
+    assigned, stats = assign_vehicles(routes, vehicles, solver="exact")
+    assert stats["solver"] == "exact" and stats["capacity_checked"]
+    assert (assigned["Vehicle_Capacity_KG"] >= assigned["Demand_KG"]).all()
+    assert assigned["Recommended_Vehicle_ID"].is_unique
+    # brute force: serve as many routes as capacity allows, then minimize the cost
+    inp = optimization._assignment_inputs(routes, vehicles, optimization.ASSIGNMENT_WEIGHTS)
+    cost = optimization._cost_rows(inp, np.arange(len(routes)), optimization.LOCATION_PENALTY)
+
+    def score(perm):
+        cells = [cost[r, v] for r, v in enumerate(perm)]
+        feasible = [c for c in cells if c < optimization._INFEASIBLE]
+        return -len(feasible), sum(feasible)
+
+    unserved, best = min(score(perm) for perm in itertools.permutations(range(len(vehicles)), len(routes)))
+    assert stats["assigned"] == -unserved
+    assert stats["objective"] == pytest.approx(best)
+    assert stats["objective"] == pytest.approx(_cost(routes, vehicles, _pairs(routes, vehicles, assigned)))
+
+def test_capacity_excludes_small_vehicles():
+    routes = pd.DataFrame({"Route": ["Mumbai-Pune", "Delhi-Pune"], "Route_Risk": [0.9, 0.1], "Demand_KG": [900.0, 100.0]})
+    vehicles = pd.DataFrame({"Vehicle_ID": ["SMALL", "BIG"], "Capacity_KG": [200.0, 1000.0],
+                             "Fuel_Efficiency_KM_per_L": [12.0, 4.0], "CO2_Emissions_Kg_per_KM": [0.2, 0.9],
+                             "Current_Location": ["Mumbai", "Delhi"], "Status": "Available"})
+    for solver in ("exact", "greedy"):
+        assigned, _ = assign_vehicles(routes, vehicles, solver=solver)
+        assert dict(zip(assigned["Route"], assigned["Recommended_Vehicle_ID"])) == {"Mumbai-Pune": "BIG", "Delhi-Pune": "SMALL"}
+    too_heavy = routes.assign(Demand_KG=[5000.0, 100.0])
+    assigned, stats = assign_vehicles(too_heavy, vehicles)
+    assert assigned["Route"].tolist() == ["Delhi-Pune"] and stats["assigned"] == 1
+
+def test_location_penalty_prefers_vehicles_at_the_origin():
+    routes = pd.DataFrame({"Route": ["Pune-Delhi"], "Route_Risk": [0.5], "Demand_KG": [10.0]})
+    vehicles = _vehicles(2, np.random.default_rng(0)).assign(
+        Current_Location=["Delhi", "Pune"], Fuel_Efficiency_KM_per_L=8.0, CO2_Emissions_Kg_per_KM=0.5)
+    assigned, _ = assign_vehicles(routes, vehicles)
+    assert assigned["Vehicle_Location"].tolist() == ["Pune"]
+
+def test_auto_falls_back_to_greedy_above_the_cell_limit():
+    rng = np.random.default_rng(2)
+    vehicles = _vehicles(2000, rng)
+    routes = _routes(EXACT_SOLVER_MAX_CELLS // len(vehicles) + 1, rng)
+    assigned, stats = assign_vehicles(routes, vehicles)
+    assert stats["solver"] == "greedy"
+    assert assigned["Recommended_Vehicle_ID"].is_unique
+    assert (assigned["Vehicle_Capacity_KG"] >= assigned["Demand_KG"]).all()
+    assert stats["lower_bound"] <= stats["objective"] + 1e-9
+    _, small = assign_vehicles(routes.head(len(routes) - 2), vehicles)
+    assert small["solver"] == "exact"
+
+@pytest.mark.parametrize("seed", range(5))
+def test_greedy_is_bounded_by_exact_on_small_inputs(seed):
+    rng = np.random.default_rng(seed)
+    routes, vehicles = _routes(8, rng), _vehicles(12, rng)
+    exact_df, exact = assign_vehicles(routes, vehicles, solver="exact")
+    greedy_df, greedy = assign_vehicles(routes, vehicles, solver="greedy")
+    assert greedy["lower_bound"] <= greedy["objective"] + 1e-9
+    # greedy can strand a route by taking the only vehicle that fits it; otherwise it cannot beat exact
+    assert greedy["assigned"] <= exact["assigned"]
+    if greedy["assigned"] == exact["assigned"]:
+        assert greedy["objective"] >= exact["objective"] - 1e-9
+    assert greedy["objective"] == pytest.approx(_cost(routes, vehicles, _pairs(routes, vehicles, greedy_df)))
+
+def test_greedy_matches_exact_without_conflicts():
+    # every route has its own vehicle waiting at the origin and identical vehicles otherwise
+    routes = pd.DataFrame({"Route": [f"{c}-Goa" for c in CITIES], "Route_Risk": np.linspace(0.1, 0.9, len(CITIES)),
+                           "Demand_KG": 100.0})
+    vehicles = _vehicles(len(CITIES), np.random.default_rng(0)).assign(
+        Current_Location=CITIES[::-1], Capacity_KG=500.0, Fuel_Efficiency_KM_per_L=8.0, CO2_Emissions_Kg_per_KM=0.5)
+    exact_df, exact = assign_vehicles(routes, vehicles, solver="exact")
+    greedy_df, greedy = assign_vehicles(routes, vehicles, solver="greedy")
+    pd.testing.assert_frame_equal(exact_df, greedy_df)
+    assert greedy["objective"] == pytest.approx(exact["objective"])
+
+def test_missing_capacity_inputs_warn_or_raise(data):
+    routes = _routes(3, np.random.default_rng(0), demand=False)
+    vehicles = data["vehicle_fleet"]
+    assert route_demand(pd.DataFrame({"Route": ["A-B"], "Order_Value_INR": [1.0]})).empty
+    with pytest.warns(RuntimeWarning, match="Demand_KG"):
+        _, stats = assign_vehicles(routes, vehicles)
+    assert not stats["capacity_checked"]
+    with pytest.raises(ValueError, match="capacity"):
+        assign_vehicles(routes, vehicles, require_capacity=True)
+    with pytest.warns(RuntimeWarning, match="Capacity_KG"):
+        assign_vehicles(_routes(3, np.random.default_rng(0)), vehicles.drop(columns="Capacity_KG"))
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assign_vehicles(_routes(3, np.random.default_rng(0)), vehicles, require_capacity=True)
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.data_analysis import prepare_metrics
+from modules.optimization import compute_route_risk
+from modules.route_risk import GRANULARITIES, RISK_MEASURES, RISK_WEIGHTS, ROBUST_Z_CLIP, build_route_risk_engine
+
+@pytest.fixture(scope="module")
+def metrics(data):
+    return prepare_metrics(data, use_cache=False)
+
+@pytest.fixture(scope="module")
+def engine(metrics):
+    return build_route_risk_engine(metrics)
+
+def baseline_route_risk(df):
+    """The original groupby / min-max compute_route_risk."""
+    df2 = df.dropna(subset=["Route","Cost_per_KM","Delivery_Delay_Days","Traffic_Delay_Minutes"])
+    grp = df2.groupby("Route", observed=True).agg(
+        avg_delay=("Delivery_Delay_Days","mean"),
+        avg_costpkm=("Cost_per_KM","mean"),
+        avg_traffic=("Traffic_Delay_Minutes","mean"),
+        count_orders=("Order_ID","count"),
+    ).reset_index()
+    for c in ["avg_delay","avg_costpkm","avg_traffic"]:
+        v = grp[c]
+        grp[c + "_n"] = (v - v.min()) / (v.max() - v.min() + 1e-9)
+    grp["Route_Risk"] = 0.5*grp["avg_delay_n"] + 0.3*grp["avg_costpkm_n"] + 0.2*grp["avg_traffic_n"]
+    return grp[["Route","Route_Risk","avg_delay","avg_costpkm","avg_traffic","count_orders"]]
+
+def _robust(v):
+    med = np.median(v)
+    scale = 1.4826 * np.median(np.abs(v - med))
+    if not scale > 0:  # more than half the groups share one value: fall back to the std
+        scale = v.std()
+    z = (v - med) / scale if scale > 0 else np.zeros_like(v)
+    return (np.clip(z, -ROBUST_Z_CLIP, ROBUST_Z_CLIP) + ROBUST_Z_CLIP) / (2 * ROBUST_Z_CLIP)
+
+def _minmax(v):
+    return (v - v.min()) / (v.max() - v.min() + 1e-9)
+
+def grouped_reference(metrics, granularity, normalization):
+    """Plain pandas groupby of the risk measures at `granularity`, scored with `normalization`."""
+    df = metrics.dropna(subset=["Route"] + list(RISK_MEASURES.values())).copy()
+    df["Route"] = df["Route"].astype(str)
+    keys = ["Route"]
+    col = GRANULARITIES[granularity]
+    if col == "Week":
+        df["Week"] = df["Order_Date"].dt.normalize() - pd.to_timedelta(df["Order_Date"].dt.weekday, unit="D")
+        keys.append("Week")
+    elif col is not None:
+        df[col] = df[col].astype(object).fillna("None")
+        keys.append(col)
+    grp = df.groupby(keys, observed=True).agg(**{m: (c, "mean") for m, c in RISK_MEASURES.items()}).reset_index()
+    normalize = _robust if normalization == "robust" else _minmax
+    grp["Route_Risk"] = sum(RISK_WEIGHTS[m] * normalize(grp[m].to_numpy(dtype=float)) for m in RISK_MEASURES)
+    return grp
+
+def _sorted(df, keys):
+    out = df.copy()
+    for k in keys:
+        out[k] = out[k].astype(str) if k != "Week" else pd.to_datetime(out[k])
+    return out.sort_values(keys).reset_index(drop=True)
+
+def test_compute_route_risk_matches_baseline(metrics):
+    got = _sorted(compute_route_risk(metrics), ["Route"])
+    expected = _sorted(baseline_route_risk(metrics), ["Route"])
+    assert got["Route"].tolist() == expected["Route"].tolist()
+    assert got["count_orders"].tolist() == expected["count_orders"].tolist()
+    for c in ["Route_Risk","avg_delay","avg_costpkm","avg_traffic"]:
+        np.testing.assert_allclose(got[c].to_numpy(dtype=float), expected[c].to_numpy(dtype=float), atol=1e-6)
+
+@pytest.mark.parametrize("granularity", list(GRANULARITIES))
+@pytest.mark.parametrize("normalization", ["minmax", "robust"])
+def test_granularities_match_groupby(engine, metrics, granularity, normalization):
+    keys = ["Route"] + ([GRANULARITIES[granularity]] if GRANULARITIES[granularity] else [])
+    got = _sorted(engine.scores(granularity, normalization=normalization), keys)
+    expected = _sorted(grouped_reference(metrics, granularity, normalization), keys)
+    assert got[keys].astype(str).values.tolist() == expected[keys].astype(str).values.tolist()
+    for c in list(RISK_MEASURES) + ["Route_Risk"]:
+        np.testing.assert_allclose(got[c].to_numpy(dtype=float), expected[c].to_numpy(dtype=float), atol=1e-6)
+
+def test_robust_normalization_resists_an_outlier(metrics):
+    spiked = metrics.copy()
+    worst = spiked["Route"].dropna().iloc[0]
+    spiked.loc[spiked["Route"] == worst, "Cost_per_KM"] *= 1000
+    engine = build_route_risk_engine(spiked, granularities=("route",))
+    cost_only = {"avg_delay": 0.0, "avg_costpkm": 1.0, "avg_traffic": 0.0}
+    minmax = engine.scores("route", cost_only, normalization="minmax").set_index("Route")["Route_Risk"]
+    robust = engine.scores("route", cost_only, normalization="robust").set_index("Route")["Route_Risk"]
+    others = minmax.index != worst
+    # min-max squeezes every other route's cost factor towards 0; robust keeps their spread
+    assert minmax[worst] == pytest.approx(1.0) and robust[worst] == 1.0
+    assert minmax[others].max() < 0.01
+    assert robust[others].std() > 10 * minmax[others].std()
+    assert robust.min() >= 0.0
+    with pytest.raises(ValueError):
+        engine.scores("route", normalization="zscore")
+
+@pytest.mark.parametrize("granularity", list(GRANULARITIES))
+@pytest.mark.parametrize("k", [1, 5, 10_000])
+def test_top_k_matches_full_sort(engine, granularity, k):
+    scored = engine.scores(granularity)
+    expected = scored.sort_values("Route_Risk", ascending=False, kind="stable").head(k)
+    got = engine.top_k(k, granularity)
+    assert len(got) == min(k, len(scored))
+    np.testing.assert_allclose(got["Route_Risk"].to_numpy(), expected["Route_Risk"].to_numpy())
+    assert set(got["Route_Risk"]) == set(expected["Route_Risk"])
+
+def test_incremental_updates_match_one_build(metrics):
+    half = len(metrics) // 2
+    engine = build_route_risk_engine(metrics.iloc[:half])
+    engine.update(metrics.iloc[half:])
+    full = build_route_risk_engine(metrics)
+    for granularity in GRANULARITIES:
+        pd.testing.assert_frame_equal(engine.scores(granularity).reset_index(drop=True),
+                                      full.scores(granularity).reset_index(drop=True))
@@ -0,0 +1,97 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.data_loader import FILES, load_all_data
+from modules.data_analysis import prepare_metrics, compute_kpis
+from modules.optimization import compute_route_risk
+from modules.streaming import stream_metrics, KpiAccumulator, RouteAccumulator
+
+# the streaming lookups hold float32 values, the in-memory path float64
+RTOL = 1e-5
+
+@pytest.fixture(scope="module")
+def in_memory(data):
+    metrics = prepare_metrics(data, use_cache=False)
+    return compute_kpis(metrics), compute_route_risk(metrics)
+
+@pytest.mark.parametrize("chunksize", [37, 1_000_000])
+def test_streamed_kpis_match_in_memory(data_dir, in_memory, chunksize):
+    kpis, _ = in_memory
+    streamed = stream_metrics(data_dir, chunksize=chunksize)
+    assert set(streamed["kpis"]) == set(kpis)
+    for name, value in kpis.items():
+        assert streamed["kpis"][name] == pytest.approx(value, rel=RTOL), name
+
+@pytest.mark.parametrize("chunksize", [37, 1_000_000])
+def test_streamed_route_risk_matches_in_memory(data_dir, in_memory, chunksize):
+    _, route_risk = in_memory
+    streamed = stream_metrics(data_dir, chunksize=chunksize)["route_risk"]
+    expected = route_risk.sort_values("Route").reset_index(drop=True)
+    got = streamed.sort_values("Route").reset_index(drop=True)
+    assert got["Route"].astype(str).tolist() == expected["Route"].astype(str).tolist()
+    np.testing.assert_allclose(got["Route_Risk"].to_numpy(dtype=float),
+                               expected["Route_Risk"].to_numpy(dtype=float), rtol=1e-4, atol=1e-6)
+
+def test_streamed_row_count(data_dir, data):
+    assert stream_metrics(data_dir, chunksize=50)["rows"] == len(data["orders"])
+
+def test_duplicate_side_rows_multiply_like_the_join(data_dir, tmp_path):
+    for name in FILES.values():
+        shutil.copy(os.path.join(data_dir, name), tmp_path / name)
+    # repeated delivery and feedback rows for a few orders, with different values
+    perf = pd.read_csv(tmp_path / FILES["delivery_performance"])
+    extra = perf.head(5).assign(Actual_Delivery_Days=perf.head(5)["Actual_Delivery_Days"] + 3)
+    pd.concat([perf, extra, extra.head(2)]).to_csv(tmp_path / FILES["delivery_performance"], index=False)
+    feedback = pd.read_csv(tmp_path / FILES["customer_feedback"])
+    both = feedback[feedback["Order_ID"].isin(extra["Order_ID"])].head(2).assign(Rating=1)
+    pd.concat([feedback, both]).to_csv(tmp_path / FILES["customer_feedback"], index=False)
+
+    tables = load_all_data(str(tmp_path), use_cache=False)
+    metrics = prepare_metrics(tables, use_cache=False)
+    assert len(metrics) > len(tables["orders"])
+    streamed = stream_metrics(str(tmp_path), chunksize=41)
+    assert streamed["rows"] == len(metrics)
+    for name, value in compute_kpis(metrics).items():
+        assert streamed["kpis"][name] == pytest.approx(value, rel=RTOL), name
+    expected = compute_route_risk(metrics).sort_values("Route").reset_index(drop=True)
+    got = streamed["route_risk"].sort_values("Route").reset_index(drop=True)
+    np.testing.assert_allclose(got["Route_Risk"].to_numpy(dtype=float),
+                               expected["Route_Risk"].to_numpy(dtype=float), rtol=1e-4, atol=1e-6)
+
+def _measures(rng, n):
+    values = rng.normal(5, 2, n).astype(np.float32)
+    values[rng.random(n) < 0.1] = np.nan
+    return {"delay": values, "cost": values * 10, "costpkm": values / 3, "rating": values,
+            "delayed": (values > 5).astype(np.float32)}
+
+def _accumulate(measures):
+    acc = KpiAccumulator()
+    acc.update(measures)
+    return acc
+
+def test_kpi_accumulator_merge_equals_single_pass():
+    rng = np.random.default_rng(0)
+    parts = [_measures(rng, n) for n in (100, 250, 3)]
+    merged = KpiAccumulator()
+    for part in parts:
+        merged.merge(_accumulate(part))
+    single = _accumulate({m: np.concatenate([p[m] for p in parts]) for m in parts[0]})
+    assert merged.rows == single.rows
+    for name, value in single.result().items():
+        assert merged.result()[name] == pytest.approx(value, rel=1e-12)
+
+def test_route_accumulator_merge_equals_single_pass():
+    rng = np.random.default_rng(1)
+    routes = pd.Series(rng.choice(["A-B", "B-C", "C-D", "D-A"], 400), dtype=object)
+    cols = [rng.normal(1, 0.3, 400) for _ in range(3)]
+    has_id = np.ones(400)
+    single = RouteAccumulator()
+    single.update(routes, *cols, has_id)
+    left, right = RouteAccumulator(), RouteAccumulator()
+    left.update(routes[:150], *(c[:150] for c in cols), has_id[:150])
+    right.update(routes[150:].reset_index(drop=True), *(c[150:] for c in cols), has_id[150:])
+    pd.testing.assert_frame_equal(left.merge(right).route_risk(), single.route_risk())
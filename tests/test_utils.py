@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from modules.data_analysis import prepare_metrics
+from modules.utils import estimate_co2, estimate_co2_per_order, co2_rollup, CO2_KG_PER_KM_BY_TYPE
+
+def _row_wise(df):
+    return df.apply(estimate_co2_per_order, axis=1).to_numpy(dtype=np.float64)
+
+def test_vectorized_co2_matches_row_wise_on_bundled_data(data):
+    metrics = prepare_metrics(data, use_cache=False)
+    np.testing.assert_allclose(estimate_co2(metrics), _row_wise(metrics))
+
+def test_vectorized_co2_matches_row_wise_fallbacks(data):
+    metrics = prepare_metrics(data, use_cache=False)
+    types = list(CO2_KG_PER_KM_BY_TYPE) + ["Unknown_Type"]
+    df = metrics[["Order_ID", "Distance_KM", "Fuel_Consumption_L"]].assign(
+        Vehicle_Type=[types[i % len(types)] for i in range(len(metrics))])
+    # no fuel on every third order: per-km factor by vehicle type, default for unknown types
+    df.loc[df.index % 3 == 0, "Fuel_Consumption_L"] = np.nan
+    known = df["Distance_KM"].notna().to_numpy()
+    np.testing.assert_allclose(estimate_co2(df)[known], _row_wise(df[known]))
+    # with neither fuel nor distance the row-wise version yields NaN; the vectorized one documents 0.0
+    unknown = ~known & df["Fuel_Consumption_L"].isna().to_numpy()
+    assert (estimate_co2(df)[unknown] == 0.0).all()
+
+def test_co2_rollup_totals(data):
+    metrics = prepare_metrics(data, use_cache=False)
+    co2 = _row_wise(metrics)
+    rollup = co2_rollup(metrics, by=("Route",))
+    expected = pd.Series(co2, index=metrics.index).groupby(metrics["Route"], observed=True).sum()
+    got = rollup.set_index("Route")["CO2_kg"]
+    np.testing.assert_allclose(got.sort_index().to_numpy(), expected.sort_index().to_numpy())
+    assert rollup["Orders"].sum() == metrics["Route"].notna().sum()